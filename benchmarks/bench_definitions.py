@@ -0,0 +1,92 @@
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from llm_context.excerpters.parser import AST, ASTFactory, Source, decode_range
+from llm_context.excerpters.tagger import Definition, Position
+
+
+@dataclass(frozen=True)
+class EagerTag:
+    """The pre-change Tag layout: decoded text plus Position objects."""
+
+    text: str
+    begin: Position
+    end: Position
+    start: int
+    finish: int
+
+    @staticmethod
+    def create(node: dict[str, Any], ast: AST) -> Optional["EagerTag"]:
+        return (
+            EagerTag(
+                decode_range(ast.code, node["start_byte"], node["end_byte"]),
+                Position(*node["start_point"]),
+                Position(*node["end_point"]),
+                node["start_byte"],
+                node["end_byte"],
+            )
+            if node
+            else None
+        )
+
+
+@dataclass(frozen=True)
+class EagerDefinition:
+    """The pre-change Definition layout, holding a copy of the definition's text."""
+
+    rel_path: str
+    name: EagerTag | None
+    text: str
+    begin: Position
+    end: Position
+    start: int
+    finish: int
+
+    @staticmethod
+    def create(node: dict[str, Any], ast: AST) -> "EagerDefinition":
+        return EagerDefinition(
+            ast.rel_path,
+            EagerTag.create(node["name"], ast),
+            decode_range(ast.code, node["start_byte"], node["end_byte"]),
+            Position(*node["start_point"]),
+            Position(*node["end_point"]),
+            node["start_byte"],
+            node["end_byte"],
+        )
+
+
+def large_source(classes: int) -> Source:
+    methods = "".join(
+        f"    def method_{m}(self, value):\n        return value + {m}\n\n" for m in range(20)
+    )
+    code = "".join(f"class Class{c}:\n{methods}\n" for c in range(classes))
+    return Source("large.py", code)
+
+
+def retained(build) -> tuple[int, object]:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return size, result
+
+
+def main() -> None:
+    factory = ASTFactory.create()
+    source = large_source(500)
+    ast = factory.create_from_code(source)
+    nodes = ast.definitions()
+    size = len(source.code)
+    baseline, _ = retained(lambda: [EagerDefinition.create(node, ast) for node in nodes])
+    lazy, _ = retained(lambda: [Definition.create(ast.rel_path, node, ast.code) for node in nodes])
+    print(f"source: {size / 1024:8.1f} KiB, {len(nodes)} definitions")
+    print(f"baseline (eager text): {baseline / 1024:8.1f} KiB ({baseline / size:5.2f}x source)")
+    print(f"lazy records         : {lazy / 1024:8.1f} KiB ({lazy / size:5.2f}x source)")
+    print(f"saving               : {(baseline - lazy) / 1024:8.1f} KiB ({baseline / lazy:5.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import timeit
+
+from fixtures import TEST_CASES, fixture_sources  # type: ignore
+
+from llm_context.excerpters.code_outliner import CodeOutliner
+from llm_context.excerpters.fast_outliner import SIGNATURES, FastOutliner, find_signatures
+from llm_context.excerpters.parser import ASTFactory, Source
+from llm_context.excerpters.tagger import ASTBasedTagger
+
+
+def recall(tagger: ASTBasedTagger) -> None:
+    found_total, expected_total = 0, 0
+    for language, extension, code, _ in TEST_CASES:
+        source = Source(f"test_file.{extension}", code)
+        expected = {
+            d.name.begin_ln if d.name else d.begin_ln for d in tagger.extract_definitions(source)
+        }
+        found = {line for line, _ in find_signatures(SIGNATURES[language], source.code)}
+        found_total += len(expected & found)
+        expected_total += len(expected)
+        print(
+            f"{language:10s}: recall {len(expected & found)}/{len(expected)}, "
+            f"extra {len(found - expected)}"
+        )
+    print(f"{'overall':10s}: recall {found_total / expected_total:.0%}")
+
+
+def main() -> None:
+    tagger = ASTBasedTagger.create("", ASTFactory.create())
+    sources = fixture_sources(20)
+    recall(tagger)
+    for label, excerpter in (
+        ("tree-sitter", CodeOutliner({"tagger": tagger})),
+        ("fast-outliner", FastOutliner({})),
+    ):
+        excerpter.excerpt(sources[: len(TEST_CASES)])
+        best = min(timeit.repeat(lambda: excerpter.excerpt(sources), number=1, repeat=3))
+        print(
+            f"{label:13s}: {len(sources)} files in {best * 1000:8.1f} ms "
+            f"({len(sources) / best:8.0f} files/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
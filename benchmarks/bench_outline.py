@@ -0,0 +1,30 @@
+import timeit
+
+from fixtures import TEST_CASES, fixture_sources  # type: ignore
+
+from llm_context.excerpters.code_outliner import CodeOutliner
+from llm_context.excerpters.parser import QUERY_CACHE, ASTFactory, Source
+from llm_context.excerpters.tagger import ASTBasedTagger
+
+
+def outline_each(outliner: CodeOutliner, sources: list[Source], cold: bool) -> None:
+    for source in sources:
+        if cold:
+            QUERY_CACHE.clear()
+        outliner.excerpt([source])
+
+
+def main() -> None:
+    outliner = CodeOutliner({"tagger": ASTBasedTagger.create("", ASTFactory.create())})
+    sources = fixture_sources(20)
+    outline_each(outliner, sources[: len(TEST_CASES)], cold=False)
+    for label, cold in (("compile per file", True), ("cached queries", False)):
+        best = min(timeit.repeat(lambda: outline_each(outliner, sources, cold), number=1, repeat=3))
+        print(
+            f"{label:16s}: {len(sources)} files in {best * 1000:8.1f} ms "
+            f"({len(sources) / best:8.0f} files/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import random
+import timeit
+from pathlib import Path
+
+import yaml
+from pathspec import GitIgnoreSpec  # type: ignore
+
+from llm_context.file_selector import CompiledPathspec
+
+RULES = Path(__file__).parents[1] / "src" / "llm_context" / "lc_resources" / "rules" / "lc"
+
+
+def base_patterns() -> list[str]:
+    frontmatter = (RULES / "flt-base.md").read_text().split("---")[1]
+    gitignores = yaml.safe_load(frontmatter)["gitignores"]
+    return sorted({pattern for patterns in gitignores.values() for pattern in patterns})
+
+
+def sample_paths(count: int) -> list[str]:
+    rng = random.Random(0)
+    dirs = ["src", "lib", "tests", "docs", "build", "node_modules", "pkg", "app", "vendor"]
+    exts = [".py", ".js", ".ts", ".md", ".log", ".json", ".pyc", ".png", ".rs", ".toml"]
+    return [
+        "/".join(rng.choices(dirs, k=rng.randint(1, 5))) + f"/file{i}" + rng.choice(exts)
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    patterns = base_patterns()
+    paths = sample_paths(20_000)
+    for scale in (1, 4, 16):
+        lines = [f"{pattern}{i or ''}" for i in range(scale) for pattern in patterns]
+        spec = GitIgnoreSpec.from_lines(lines)
+        compiled = CompiledPathspec.create(lines)
+        assert [spec.match_file(p) for p in paths] == [compiled.match_file(p) for p in paths]
+        loop = min(timeit.repeat(lambda: [spec.match_file(p) for p in paths], number=1, repeat=3))
+        fused = min(
+            timeit.repeat(lambda: [compiled.match_file(p) for p in paths], number=1, repeat=3)
+        )
+        print(
+            f"{len(spec.patterns):5d} patterns x {len(paths)} paths: "
+            f"per-pattern {loop * 1000:8.1f} ms  compiled {fused * 1000:8.1f} ms  "
+            f"speedup {loop / fused:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import importlib.util
+from pathlib import Path
+from typing import Any
+
+from llm_context.excerpters.parser import Source
+
+OUTLINE_CASES_PATH = Path(__file__).parents[1] / "tests" / "test_outline_languages.py"
+
+
+def _load_cases() -> list[tuple[str, str, str, Any]]:
+    spec = importlib.util.spec_from_file_location("outline_cases", OUTLINE_CASES_PATH)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.TEST_CASES
+
+
+TEST_CASES = _load_cases()
+
+
+def fixture_sources(copies: int) -> list[Source]:
+    return [
+        Source(f"fixture{i}/test_file.{extension}", code)
+        for i in range(copies)
+        for _, extension, code, _ in TEST_CASES
+    ]
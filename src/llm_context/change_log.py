@@ -0,0 +1,51 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class ChangeLog:
+    lock: threading.Lock
+    changes: dict[str, float]
+    watched: dict[str, float]
+    pending: set[str]
+
+    @staticmethod
+    def create() -> "ChangeLog":
+        return ChangeLog(threading.Lock(), {}, {}, set())
+
+    def record(self, abs_path: str, when: Optional[float] = None) -> None:
+        with self.lock:
+            self.changes[abs_path] = time.time() if when is None else when
+            self.pending.add(abs_path)
+
+    def watch(self, abs_dir: str) -> None:
+        with self.lock:
+            self.watched.setdefault(abs_dir, time.time())
+
+    def unwatch(self, abs_dir: str) -> None:
+        with self.lock:
+            self.watched.pop(abs_dir, None)
+            self.pending.add(abs_dir)
+
+    def reset(self, root_path: str) -> None:
+        now = time.time()
+        with self.lock:
+            self.changes.clear()
+            self.watched.update((abs_dir, now) for abs_dir in self.watched)
+            self.pending.add(root_path)
+
+    def take_pending(self) -> tuple[set[str], set[str]]:
+        with self.lock:
+            pending = set(self.pending)
+            self.pending.clear()
+            return pending, set(self.watched)
+
+    def modified(self, abs_path: str, timestamp: float) -> Optional[bool]:
+        with self.lock:
+            since = self.watched.get(os.path.dirname(abs_path))
+            if since is None or timestamp < since:
+                return None
+            return self.changes.get(abs_path, since) > timestamp
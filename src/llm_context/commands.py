@@ -4,11 +4,13 @@ from llm_context.context_spec import ContextSpec
 from llm_context.exec_env import ExecutionEnvironment
 from llm_context.file_selector import ContextSelector
 from llm_context.state import FileSelection
-from llm_context.utils import PathConverter, is_newer
+from llm_context.utils import PathConverter
 
 
 def get_prompt(env: ExecutionEnvironment, rule_name: str) -> str:
-    config = ContextSpec.create(env.state.project_layout.root_path, rule_name, env.constants)
+    config = ContextSpec.create(
+        env.state.project_layout.root_path, rule_name, env.constants, env.current_scan()
+    )
     settings = ContextSettings.create(False, False, False, False)
     file_selection = env.state.get_selection(rule_name)
     generator = ContextGenerator.create(config, file_selection, settings)
@@ -16,7 +18,9 @@ def get_prompt(env: ExecutionEnvironment, rule_name: str) -> str:
 
 
 def select_all_files(env: ExecutionEnvironment, rule_name: str) -> FileSelection:
-    config = ContextSpec.create(env.state.project_layout.root_path, rule_name, env.constants)
+    config = ContextSpec.create(
+        env.state.project_layout.root_path, rule_name, env.constants, env.current_scan()
+    )
     selector = ContextSelector.create(config)
     current_selection = env.state.get_selection(rule_name)
     file_sel_full = selector.select_full_files(current_selection)
@@ -31,7 +35,10 @@ def get_missing_files(env: ExecutionEnvironment, paths: list[str], timestamp: fl
             f"No context found with timestamp {timestamp}. Warn the user that the context is stale."
         )
     config = ContextSpec.create(
-        env.state.project_layout.root_path, matching_selection.rule_name, env.constants
+        env.state.project_layout.root_path,
+        matching_selection.rule_name,
+        env.constants,
+        env.current_scan(),
     )
     settings = ContextSettings.create(False, False, True, False)
     file_selection = env.state.get_selection(matching_selection.rule_name)
@@ -46,7 +53,10 @@ def list_modified_files(env: ExecutionEnvironment, timestamp: float) -> str:
             f"No context found with timestamp {timestamp}. The context may be stale or deleted."
         )
     config = ContextSpec.create(
-        env.state.project_layout.root_path, matching_selection.rule_name, env.constants
+        env.state.project_layout.root_path,
+        matching_selection.rule_name,
+        env.constants,
+        env.current_scan(),
     )
     selector = ContextSelector.create(config)
     file_sel_full = selector.select_full_files(matching_selection)
@@ -57,7 +67,7 @@ def list_modified_files(env: ExecutionEnvironment, timestamp: float) -> str:
     modified = {
         f
         for f in (current_files & original_files)
-        if is_newer(converter.to_absolute([f])[0], timestamp)
+        if config.scan.is_modified(converter.to_absolute([f])[0], timestamp)
     }
     added = current_files - original_files
     removed = original_files - current_files
@@ -75,7 +85,10 @@ def get_excluded(env: ExecutionEnvironment, paths: list[str], timestamp: float)
     if matching_selection is None:
         raise ValueError(f"No context found with timestamp {timestamp}...")
     config = ContextSpec.create(
-        env.state.project_layout.root_path, matching_selection.rule_name, env.constants
+        env.state.project_layout.root_path,
+        matching_selection.rule_name,
+        env.constants,
+        env.current_scan(),
     )
     settings = ContextSettings.create(False, False, True, False)
     file_selection = env.state.get_selection(matching_selection.rule_name)
@@ -95,7 +108,10 @@ def get_implementations(
             f"No context found with timestamp {timestamp}. Implementation queries must reference a valid context."
         )
     config = ContextSpec.create(
-        env.state.project_layout.root_path, matching_selection.rule_name, env.constants
+        env.state.project_layout.root_path,
+        matching_selection.rule_name,
+        env.constants,
+        env.current_scan(),
     )
     settings = ContextSettings.create(False, False, True, False)
     file_selection = env.state.get_selection(matching_selection.rule_name)
@@ -107,7 +123,10 @@ def get_implementations(
 def get_focus_help(env: ExecutionEnvironment) -> str:
     # Use current_rule for focus help
     config = ContextSpec.create(
-        env.state.project_layout.root_path, env.state.current_rule, env.constants
+        env.state.project_layout.root_path,
+        env.state.current_rule,
+        env.constants,
+        env.current_scan(),
     )
     settings = ContextSettings.create(False, False, True, False)
     file_selection = env.state.get_selection(env.state.current_rule)
@@ -118,14 +137,18 @@ def get_focus_help(env: ExecutionEnvironment) -> str:
 def generate_context(
     env: ExecutionEnvironment, rule_name: str, settings: ContextSettings
 ) -> tuple[str, float]:
-    config = ContextSpec.create(env.state.project_layout.root_path, rule_name, env.constants)
+    config = ContextSpec.create(
+        env.state.project_layout.root_path, rule_name, env.constants, env.current_scan()
+    )
     file_selection = env.state.get_selection(rule_name)
     generator = ContextGenerator.create(config, file_selection, settings, env.tagger)
     return generator.context()
 
 
 def get_outlines(env: ExecutionEnvironment, rule_name: str) -> str:
-    config = ContextSpec.create(env.state.project_layout.root_path, rule_name, env.constants)
+    config = ContextSpec.create(
+        env.state.project_layout.root_path, rule_name, env.constants, env.current_scan()
+    )
     settings = ContextSettings.create(False, False, False, False)
     selector = ContextSelector.create(config)
     file_selection = env.state.get_selection(rule_name)
@@ -134,13 +157,17 @@ def get_outlines(env: ExecutionEnvironment, rule_name: str) -> str:
 
 
 def preview_rule(env: ExecutionEnvironment, rule_name: str) -> str:
-    config = ContextSpec.create(env.state.project_layout.root_path, rule_name, env.constants)
+    config = ContextSpec.create(
+        env.state.project_layout.root_path, rule_name, env.constants, env.current_scan()
+    )
     result = ContextPreview.create(config, env.tagger)
     return result.format()
 
 
 def current_rule(env: ExecutionEnvironment, rule_name: str) -> str:
-    config = ContextSpec.create(env.state.project_layout.root_path, rule_name, env.constants)
+    config = ContextSpec.create(
+        env.state.project_layout.root_path, rule_name, env.constants, env.current_scan()
+    )
     if not config.has_rule(rule_name):
         raise ValueError(f"Rule '{rule_name}' does not exist.")
     return rule_name
@@ -0,0 +1,88 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from logging import ERROR
+from typing import NamedTuple, Optional
+
+from llm_context.utils import log
+
+READ_WORKERS = 8
+
+
+class FileContent(NamedTuple):
+    data: bytes
+    text: str
+
+    @property
+    def code(self) -> Optional[memoryview]:
+        return memoryview(self.data) if b"\r" not in self.data else None
+
+
+@dataclass(frozen=True)
+class ContentStore:
+    workers: int
+    contents: dict[str, Optional[FileContent]]
+    reads: Counter
+    lookups: Counter
+
+    @staticmethod
+    def create(workers: int = READ_WORKERS) -> "ContentStore":
+        return ContentStore(max(1, workers), {}, Counter(), Counter())
+
+    def get(self, abs_path: str) -> Optional[FileContent]:
+        self.lookups[abs_path] += 1
+        if abs_path not in self.contents:
+            self._store(abs_path, *_read(abs_path))
+        return self.contents[abs_path]
+
+    def get_all(self, abs_paths: list[str]) -> list[Optional[FileContent]]:
+        pending = [
+            abs_path for abs_path in dict.fromkeys(abs_paths) if abs_path not in self.contents
+        ]
+        if self.workers >= 2 and len(pending) >= 2:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(pending))) as executor:
+                loaded = list(executor.map(_read, pending))
+            for abs_path, (content, error) in zip(pending, loaded):
+                self._store(abs_path, content, error)
+        return [self.get(abs_path) for abs_path in abs_paths]
+
+    def texts(self, abs_paths: list[str]) -> list[Optional[str]]:
+        return [content.text if content else None for content in self.get_all(abs_paths)]
+
+    def text(self, abs_path: str) -> Optional[str]:
+        content = self.get(abs_path)
+        return content.text if content else None
+
+    def data(self, abs_path: str) -> Optional[bytes]:
+        content = self.get(abs_path)
+        return content.data if content else None
+
+    @property
+    def bytes_read(self) -> int:
+        return sum(len(content.data) for content in self.contents.values() if content)
+
+    def _store(self, abs_path: str, content: Optional[FileContent], error: Optional[str]) -> None:
+        self.reads[abs_path] += 1
+        self.contents[abs_path] = content
+        if error:
+            log(ERROR, error)
+
+
+def _read(abs_path: str) -> tuple[Optional[FileContent], Optional[str]]:
+    try:
+        with open(abs_path, "rb") as f:
+            data = f.read()
+        return FileContent(data, _decode(data)), None
+    except FileNotFoundError:
+        return None, f"File not found: {abs_path}"
+    except IsADirectoryError:
+        return None, f"Not a file: {abs_path}"
+    except PermissionError:
+        return None, f"Permission denied: {abs_path}"
+    except Exception as e:
+        return None, f"Error reading file {abs_path}: {str(e)}"
+
+
+def _decode(data: bytes) -> str:
+    text = data.decode("utf-8")
+    return text.replace("\r\n", "\n").replace("\r", "\n") if "\r" in text else text
@@ -7,17 +7,21 @@ from typing import Any, Optional, cast
 
 from jinja2 import Environment, FileSystemLoader  # type: ignore
 
+from llm_context.content_store import ContentStore
 from llm_context.context_spec import ContextSpec
+from llm_context.excerpt_cache import ExcerptCache
+from llm_context.excerpt_pool import ExcerptPool
 from llm_context.excerpters.base import Excerpts, Excluded
-from llm_context.excerpters.language_mapping import to_language
 from llm_context.excerpters.parser import Source
 from llm_context.excerpters.service import ExcerpterRegistry
 from llm_context.file_selector import FileSelector
 from llm_context.overviews import get_focused_overview, get_full_overview
+from llm_context.project_scan import ProjectScan
 from llm_context.rule import IGNORE_NOTHING, INCLUDE_ALL, Rule
 from llm_context.rule_parser import RuleLoader, RuleProvider
 from llm_context.state import FileSelection
-from llm_context.utils import PathConverter, ProjectLayout, is_newer, safe_read_file
+from llm_context.symbol_index import SymbolIndex, SymbolIndexConfig
+from llm_context.utils import PathConverter, ProjectLayout
 
 
 @dataclass(frozen=True)
@@ -42,24 +46,45 @@ class ContextCollector:
     converter: PathConverter
     project_layout: ProjectLayout
     rule_loader: RuleLoader
+    scan: ProjectScan
+    store: ContentStore
+    excerpt_cache: Optional[ExcerptCache]
+    excerpt_pool: Optional[ExcerptPool]
+    symbol_index: SymbolIndexConfig
 
-    @staticmethod
-    def get_excerpter() -> ExcerpterRegistry:
-        return ExcerpterRegistry.create()
+    def get_excerpter(self) -> ExcerpterRegistry:
+        return ExcerpterRegistry.create(self.excerpt_cache, self.excerpt_pool, self.scan.registry)
 
     @staticmethod
-    def create(root_path: Path) -> "ContextCollector":
+    def create(
+        root_path: Path,
+        scan: Optional[ProjectScan] = None,
+        store: Optional[ContentStore] = None,
+        excerpt_cache: Optional[ExcerptCache] = None,
+        excerpt_pool: Optional[ExcerptPool] = None,
+        symbol_index: Optional[SymbolIndexConfig] = None,
+    ) -> "ContextCollector":
         project_layout = ProjectLayout(root_path)
         rule_loader = RuleLoader.create(project_layout)
         return ContextCollector(
-            root_path, PathConverter.create(root_path), project_layout, rule_loader
+            root_path,
+            PathConverter.create(root_path),
+            project_layout,
+            rule_loader,
+            scan or ProjectScan.create(root_path),
+            store or ContentStore.create(),
+            excerpt_cache,
+            excerpt_pool,
+            symbol_index or SymbolIndexConfig.create_default(),
         )
 
     def split_excerpted(self, rel_paths: list[str], rule: Rule) -> tuple[list[str], list[str]]:
         outlined_files = []
         other_excerpted_files = []
-        for rel_path in rel_paths:
-            excerpt_mode = rule.get_excerpt_mode(rel_path)
+        for rel_path, abs_path in zip(rel_paths, self.converter.to_absolute(rel_paths)):
+            excerpt_mode = rule.get_excerpt_mode(
+                rel_path, self.scan.language(abs_path), self.scan.registry
+            )
             if excerpt_mode == "code-outliner":
                 outlined_files.append(rel_path)
             else:
@@ -68,7 +93,9 @@ class ContextCollector:
 
     def sample_file_abs(self, full_abs: list[str]) -> list[str]:
         all_abs = set(
-            FileSelector.create(self.root_path, IGNORE_NOTHING, INCLUDE_ALL, []).get_files()
+            FileSelector.create(
+                self.root_path, IGNORE_NOTHING, INCLUDE_ALL, [], scan=self.scan
+            ).get_files()
         )
         incomplete_files = sorted(list(all_abs - set(full_abs)))
         return random.sample(incomplete_files, min(2, len(incomplete_files)))
@@ -77,56 +104,55 @@ class ContextCollector:
         abs_paths = self.converter.to_absolute(rel_paths)
         return [
             {"path": rel_path, "content": content}
-            for rel_path, abs_path in zip(rel_paths, abs_paths)
-            if (content := safe_read_file(abs_path)) is not None
+            for rel_path, content in zip(rel_paths, self.store.texts(abs_paths))
+            if content is not None
         ]
 
-    def excerpts(self, tagger: Any, rel_paths: list[str], rule: Rule) -> list[Excerpts]:
+    def sources(self, rel_paths: list[str]) -> list[Source]:
         abs_paths = self.converter.to_absolute(rel_paths)
+        return [
+            Source(rel_path, content.text, content.code, self.scan.language(abs_path))
+            for rel_path, abs_path, content in zip(
+                rel_paths, abs_paths, self.store.get_all(abs_paths)
+            )
+            if content is not None
+        ]
+
+    def excerpts(self, tagger: Any, rel_paths: list[str], rule: Rule) -> list[Excerpts]:
         excerpter = self.get_excerpter()
         if rel_paths:
-            sources = [
-                Source(rel, content)
-                for rel, abs_path in zip(rel_paths, abs_paths)
-                if (content := safe_read_file(abs_path)) is not None
-            ]
-            return excerpter.excerpt(sources, rule, tagger)
+            return excerpter.excerpt(self.sources(rel_paths), rule, tagger)
         else:
             return excerpter.empty()
 
     def definitions(self, tagger: Any, requests: list[tuple[str, str]]) -> list[dict[str, Any]]:
-        if requests and ContextCollector.get_excerpter():
-            from llm_context.excerpters.parser import Source
-            from llm_context.excerpters.tagger import find_definition
-
-            rel_paths = list({path for path, _ in requests})
-            abs_paths = self.converter.to_absolute(rel_paths)
-            sources = [
-                Source(rel, content)
-                for rel, abs_path in zip(rel_paths, abs_paths)
-                if (content := safe_read_file(abs_path)) is not None
-            ]
-            all_defs = {source.rel_path: tagger.extract_definitions(source) for source in sources}
-            return [
-                {"path": path, "name": name, "code": find_definition(all_defs.get(path, []), name)}
+        if requests and self.get_excerpter():
+            index = SymbolIndex.from_config(self.symbol_index, self.project_layout.cache_path)
+            rel_paths = list(dict.fromkeys(path for path, _ in requests))
+            sources = {source.rel_path: source for source in self.sources(rel_paths)}
+            definitions = [
+                {
+                    "path": path,
+                    "name": name,
+                    "code": index.find(tagger, sources[path], name) if path in sources else [],
+                }
                 for path, name in requests
             ]
+            index.save()
+            return definitions
         else:
             return []
 
     def excluded(self, tagger: Any, rel_paths: list[str], rule: Rule) -> list[Excluded]:
-        abs_paths = self.converter.to_absolute(rel_paths)
         excerpter = self.get_excerpter()
         if not rel_paths:
             return []
-        sources = [
-            Source(rel, content)
-            for rel, abs_path in zip(rel_paths, abs_paths)
-            if (content := safe_read_file(abs_path)) is not None
-        ]
+        sources = self.sources(rel_paths)
         excluded_results = []
         for source in sources:
-            excerpt_mode = rule.get_excerpt_mode(source.rel_path)
+            excerpt_mode = rule.get_excerpt_mode(
+                source.rel_path, source.language, self.scan.registry
+            )
             if excerpt_mode and excerpt_mode != "code-outliner":
                 excerpt_config = rule.get_excerpt_config(excerpt_mode)
                 excerpt_config["tagger"] = tagger
@@ -145,19 +171,21 @@ class ContextCollector:
         diagram_ignores: list[str],
     ) -> tuple[str, list[str]]:
         return (
-            get_full_overview(self.root_path, full_abs, excerpted_abs, rule_abs, diagram_ignores)
+            get_full_overview(
+                self.root_path, full_abs, excerpted_abs, rule_abs, diagram_ignores, self.scan
+            )
             if overview_mode == "full"
             else get_focused_overview(
-                self.root_path, full_abs, excerpted_abs, rule_abs, diagram_ignores
+                self.root_path, full_abs, excerpted_abs, rule_abs, diagram_ignores, self.scan
             )
         )
 
     def file_stats(self, rel_paths: list[str]) -> list[tuple[str, int]]:
         abs_paths = self.converter.to_absolute(rel_paths)
         return [
-            (rel_path, Path(abs_path).stat().st_size)
+            (rel_path, file_stat.st_size)
             for rel_path, abs_path in zip(rel_paths, abs_paths)
-            if Path(abs_path).exists()
+            if (file_stat := self.scan.try_stat(abs_path)) is not None
         ]
 
     def excerpt_stats(
@@ -166,11 +194,9 @@ class ContextCollector:
         if not rel_paths:
             return []
         abs_paths = self.converter.to_absolute(rel_paths)
-        sources = [
-            Source(rel, content)
-            for rel, abs_path in zip(rel_paths, abs_paths)
-            if Path(abs_path).exists() and (content := safe_read_file(abs_path)) is not None
-        ]
+        sources = self.sources(
+            [rel for rel, abs_path in zip(rel_paths, abs_paths) if self.scan.exists(abs_path)]
+        )
         if not sources:
             return []
         try:
@@ -180,13 +206,9 @@ class ContextCollector:
                 for excerpt in excerpts.excerpts:
                     excerpt_sizes[excerpt.rel_path] = len(excerpt.content.encode("utf-8"))
             return [
-                (
-                    rel_path,
-                    Path(abs_path).stat().st_size,
-                    excerpt_sizes.get(rel_path, Path(abs_path).stat().st_size),
-                )
+                (rel_path, file_stat.st_size, excerpt_sizes.get(rel_path, file_stat.st_size))
                 for rel_path, abs_path in zip(rel_paths, abs_paths)
-                if Path(abs_path).exists()
+                if (file_stat := self.scan.try_stat(abs_path)) is not None
             ]
         except Exception:
             return [(rel_path, size, size) for rel_path, size in self.file_stats(rel_paths)]
@@ -227,13 +249,21 @@ class ContextGenerator:
         tagger: Optional[Any] = None,
     ) -> "ContextGenerator":
         project_root = spec.project_root_path
-        collector = ContextCollector.create(project_root)
+        collector = ContextCollector.create(
+            project_root,
+            spec.scan,
+            excerpt_cache=spec.excerpt_cache,
+            excerpt_pool=spec.excerpt_pool,
+            symbol_index=spec.symbol_index,
+        )
         converter = PathConverter.create(project_root)
         sel_files = file_selection
         full_rel = sel_files.full_files
-        excerpted_rel = [f for f in sel_files.excerpted_files if to_language(f)]
+        excerpted = zip(sel_files.excerpted_files, converter.to_absolute(sel_files.excerpted_files))
+        excerpted_pairs = [(rel, abs_) for rel, abs_ in excerpted if spec.scan.language(abs_)]
+        excerpted_rel = [rel for rel, _ in excerpted_pairs]
         full_abs = converter.to_absolute(full_rel)
-        excerpted_abs = converter.to_absolute(excerpted_rel)
+        excerpted_abs = [abs_ for _, abs_ in excerpted_pairs]
         return ContextGenerator(
             collector,
             spec,
@@ -296,40 +326,40 @@ class ContextGenerator:
         deleted_files = {
             r
             for r, a in zip(paths, abs_paths)
-            if (r in orig_full or r in orig_excerpted) and not Path(a).exists()
+            if (r in orig_full or r in orig_excerpted) and not self.spec.scan.exists(a)
         }
         missing_files = {
             r
             for r, a in zip(paths, abs_paths)
-            if r not in orig_full and r not in orig_excerpted and Path(a).exists()
+            if r not in orig_full and r not in orig_excerpted and self.spec.scan.exists(a)
         }
         modified_files = {
             r
             for r, a in zip(paths, abs_paths)
             if (r in orig_full or r in orig_excerpted)
-            and Path(a).exists()
-            and is_newer(a, timestamp)
+            and self.spec.scan.exists(a)
+            and self.spec.scan.is_modified(a, timestamp)
         }
         files_to_fetch = missing_files | modified_files
         already_excerpted_candidates = set(paths) & orig_excerpted
+        scan = self.spec.scan
         code_outlined = {
-            f
-            for f in already_excerpted_candidates
-            if self.spec.rule.get_excerpt_mode(f) == "code-outliner"
+            r
+            for r, a in zip(paths, abs_paths)
+            if r in already_excerpted_candidates
+            and self.spec.rule.get_excerpt_mode(r, scan.language(a), scan.registry)
+            == "code-outliner"
         }
         files_to_fetch = files_to_fetch | code_outlined
         already_excerpted = list(already_excerpted_candidates - files_to_fetch - deleted_files)
         already_included = list((set(paths) & orig_full) - files_to_fetch - deleted_files)
         excerpted_metadata = {}
         if orig_excerpted:
-            temp_sources = [
-                Source(rel, content)
-                for rel, abs_path in zip(
-                    orig_excerpted, self.converter.to_absolute(list(orig_excerpted))
-                )
-                if (content := safe_read_file(abs_path)) is not None
-            ]
-            if temp_sources:
+            readable = any(
+                self.collector.store.text(abs_path) is not None
+                for abs_path in self.converter.to_absolute(list(orig_excerpted))
+            )
+            if readable:
                 all_excerpts = self.collector.excerpts(
                     self.tagger, list(orig_excerpted), self.spec.rule
                 )
@@ -28,7 +28,12 @@ class ContextPreview:
     def create(config: ContextSpec, tagger) -> "ContextPreview":
         rule = config.rule
         selector = ContextSelector.create(config)
-        collector = ContextCollector.create(config.project_root_path)
+        collector = ContextCollector.create(
+            config.project_root_path,
+            config.scan,
+            excerpt_cache=config.excerpt_cache,
+            excerpt_pool=config.excerpt_pool,
+        )
         empty_selection = FileSelection.create(rule.name, [], [])
         file_selection = selector.select_full_files(empty_selection)
         file_selection = selector.select_excerpted_files(file_selection)
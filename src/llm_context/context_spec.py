@@ -1,10 +1,16 @@
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
 from llm_context.exceptions import LLMContextError
+from llm_context.excerpt_cache import ExcerptCache, ExcerptCacheConfig
+from llm_context.excerpt_pool import ExcerptPool, ExcerptPoolConfig
+from llm_context.excerpters.language_mapping import LANGUAGES
+from llm_context.project_scan import ProjectScan, ScanConfig
 from llm_context.project_setup import ProjectSetup
 from llm_context.rule import Rule, RuleResolver, ToolConstants
 from llm_context.state import StateStore
+from llm_context.symbol_index import SymbolIndexConfig
 from llm_context.utils import ProjectLayout, Yaml
 
 
@@ -14,16 +20,50 @@ class ContextSpec:
     templates: dict[str, str]
     rule: Rule
     state: ToolConstants
+    scan: ProjectScan
+    excerpt_cache: Optional[ExcerptCache]
+    excerpt_pool: ExcerptPool
+    symbol_index: SymbolIndexConfig
 
     @staticmethod
-    def create(project_root: Path, rule_name: str, state: ToolConstants) -> "ContextSpec":
+    def create(
+        project_root: Path,
+        rule_name: str,
+        state: ToolConstants,
+        live_scan: Optional[ProjectScan] = None,
+    ) -> "ContextSpec":
         ContextSpec.ensure_gitignore_exists(project_root)
         project_layout = ProjectLayout(project_root)
         ProjectSetup.create(project_layout).initialize()
         raw_config = Yaml.load(project_layout.config_path)
         resolver = RuleResolver.create(state, project_layout)
         rule = resolver.get_rule(rule_name)
-        return ContextSpec(project_layout, raw_config["templates"], rule, state)
+        scan_config = ScanConfig.from_config(raw_config.get("scan", {}))
+        registry = LANGUAGES.with_mappings(raw_config.get("languages") or {})
+        scan = (
+            live_scan
+            if live_scan and live_scan.config == scan_config and live_scan.registry == registry
+            else ProjectScan.create(project_root, scan_config, registry=registry)
+        )
+        excerpt_cache = ExcerptCache.from_config(
+            ExcerptCacheConfig.from_config(raw_config.get("excerpt-cache", {})),
+            project_root,
+            project_layout.cache_path,
+        )
+        excerpt_pool = ExcerptPool.create(
+            ExcerptPoolConfig.from_config(raw_config.get("excerpt-pool", {})), str(project_root)
+        )
+        symbol_index = SymbolIndexConfig.from_config(raw_config.get("symbol-index", {}))
+        return ContextSpec(
+            project_layout,
+            raw_config["templates"],
+            rule,
+            state,
+            scan,
+            excerpt_cache,
+            excerpt_pool,
+            symbol_index,
+        )
 
     @staticmethod
     def ensure_gitignore_exists(root_path: Path) -> None:
@@ -8,3 +8,10 @@ class LLMContextError(Exception):
 class RuleResolutionError(LLMContextError):
     def __init__(self, message: str):
         super().__init__(message, "RULE_RESOLUTION_ERROR")
+
+
+class ParseLimitExceeded(LLMContextError):
+    def __init__(self, rel_path: str, limit: str):
+        super().__init__(f"{rel_path} exceeds the {limit} parse limit", "PARSE_LIMIT_EXCEEDED")
+        self.rel_path = rel_path
+        self.limit = limit
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from logging import WARNING
+from pathlib import Path
+from typing import Any, Optional
+
+from llm_context.utils import log, package_version
+
+EXCERPT_CACHE_VERSION = 2
+EXCERPT_CACHE_DIR = "excerpts"
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ExcerptCacheConfig:
+    enabled: bool
+    max_size: int
+    path: Optional[str]
+
+    @staticmethod
+    def create_default() -> "ExcerptCacheConfig":
+        return ExcerptCacheConfig(False, DEFAULT_MAX_SIZE, None)
+
+    @staticmethod
+    def from_config(config: dict[str, Any]) -> "ExcerptCacheConfig":
+        return ExcerptCacheConfig(
+            bool(config.get("enabled", False)),
+            max(0, int(config.get("max-size", DEFAULT_MAX_SIZE))),
+            config.get("path"),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        result: dict[str, Any] = {"enabled": self.enabled, "max-size": self.max_size}
+        return {**result, "path": self.path} if self.path else result
+
+
+@dataclass(frozen=True)
+class ExcerptCache:
+    path: Path
+    max_size: int
+    version: str
+    hits: list[str]
+    writes: list[str]
+
+    @staticmethod
+    def create(
+        cache_dir: Path, max_size: int = DEFAULT_MAX_SIZE, version: Optional[str] = None
+    ) -> "ExcerptCache":
+        return ExcerptCache(
+            cache_dir / EXCERPT_CACHE_DIR, max_size, version or package_version(), [], []
+        )
+
+    @staticmethod
+    def from_config(
+        config: ExcerptCacheConfig, root_path: Path, cache_dir: Path
+    ) -> Optional["ExcerptCache"]:
+        if not config.enabled:
+            return None
+        cache_root = root_path / Path(config.path).expanduser() if config.path else cache_dir
+        return ExcerptCache.create(cache_root, config.max_size)
+
+    def key(self, excerpter: str, config: dict[str, Any], language: str, code: Any) -> str:
+        digest = hashlib.sha256()
+        header = [EXCERPT_CACHE_VERSION, self.version, excerpter, language, _config_key(config)]
+        digest.update(json.dumps(header, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(code)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        entry_path = self.path / f"{key}.json"
+        try:
+            entry = json.loads(entry_path.read_text())
+            os.utime(entry_path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            log(WARNING, f"Ignoring unreadable excerpt cache entry {entry_path}: {e}")
+            return None
+        self.hits.append(key)
+        return entry if isinstance(entry, dict) else None
+
+    def put(self, key: str, entry: dict[str, Any]) -> None:
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            marker = self.path.parent / ".gitignore"
+            if not marker.exists():
+                marker.write_text("*\n")
+            fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path / f"{key}.json")
+            self.writes.append(key)
+        except OSError as e:
+            log(WARNING, f"Could not write excerpt cache {self.path}: {e}")
+
+    def evict(self) -> None:
+        if not self.writes:
+            return
+        try:
+            with os.scandir(self.path) as it:
+                entries = [
+                    (stat.st_mtime_ns, stat.st_size, entry.path)
+                    for entry in it
+                    if entry.name.endswith(".json") and (stat := entry.stat())
+                ]
+        except OSError as e:
+            log(WARNING, f"Could not read excerpt cache {self.path}: {e}")
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.unlink(entry_path)
+            except OSError:
+                continue
+            total -= size
+
+
+def _config_key(config: dict[str, Any]) -> dict[str, Any]:
+    return {name: value for name, value in config.items() if name != "tagger"}
@@ -0,0 +1,120 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from llm_context.excerpters.parser import ASTFactory, Source
+from llm_context.excerpters.tagger import ASTBasedTagger
+
+DEFAULT_THRESHOLD = 500
+BATCHES_PER_WORKER = 4
+
+FileEntry = dict[str, Any]
+
+_worker_state: dict[str, Any] = {}
+_executors: dict[tuple[int, str], ProcessPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ExcerptPoolConfig:
+    enabled: bool
+    workers: int
+    threshold: int
+
+    @staticmethod
+    def create_default() -> "ExcerptPoolConfig":
+        return ExcerptPoolConfig(False, 0, DEFAULT_THRESHOLD)
+
+    @staticmethod
+    def from_config(config: dict[str, Any]) -> "ExcerptPoolConfig":
+        return ExcerptPoolConfig(
+            bool(config.get("enabled", False)),
+            max(0, int(config.get("workers", 0))),
+            max(1, int(config.get("threshold", DEFAULT_THRESHOLD))),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"enabled": self.enabled, "workers": self.workers, "threshold": self.threshold}
+
+    @property
+    def max_workers(self) -> int:
+        return self.workers or os.cpu_count() or 1
+
+    def engages(self, source_count: int) -> bool:
+        return self.enabled and self.max_workers > 1 and source_count >= self.threshold
+
+
+@dataclass(frozen=True)
+class ExcerptPool:
+    config: ExcerptPoolConfig
+    workspace_path: str
+
+    @staticmethod
+    def create(config: ExcerptPoolConfig, workspace_path: str) -> "ExcerptPool":
+        return ExcerptPool(config, workspace_path)
+
+    def excerpt(
+        self, excerpt_mode: str, config: dict[str, Any], sources: list[Source]
+    ) -> list[FileEntry]:
+        worker_config = {name: value for name, value in config.items() if name != "tagger"}
+        workers = self.config.max_workers
+        size = -(-len(sources) // (workers * BATCHES_PER_WORKER))
+        batches = [
+            (
+                excerpt_mode,
+                worker_config,
+                [Source(s.rel_path, s.content, None, s.lang) for s in batch],
+            )
+            for batch in (sources[i : i + size] for i in range(0, len(sources), size))
+        ]
+        executor = _executor(workers, self.workspace_path)
+        return [entry for entries in executor.map(_excerpt_batch, batches) for entry in entries]
+
+
+def shutdown() -> None:
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown(cancel_futures=True)
+        _executors.clear()
+
+
+def file_entry(excerpter: Any, source: Source) -> FileEntry:
+    excerpts = excerpter.excerpt([source])
+    return {
+        "excerpts": [[excerpt.content, excerpt.metadata] for excerpt in excerpts.excerpts],
+        "definitions": [name for _, name in excerpts.metadata.get("sample_definitions", [])],
+    }
+
+
+def _executor(workers: int, workspace_path: str) -> ProcessPoolExecutor:
+    key = (workers, workspace_path)
+    with _executors_lock:
+        if key not in _executors:
+            if not _executors:
+                atexit.register(shutdown)
+            _executors[key] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(workspace_path,),
+            )
+        return _executors[key]
+
+
+def _init_worker(workspace_path: str) -> None:
+    _worker_state["tagger"] = ASTBasedTagger.create(workspace_path, ASTFactory.create())
+
+
+def _excerpt_batch(batch: tuple[str, dict[str, Any], list[Source]]) -> list[FileEntry]:
+    from llm_context.excerpters.service import ExcerpterRegistry
+
+    excerpt_mode, config, sources = batch
+    excerpter = ExcerpterRegistry.create().get_excerpter(
+        excerpt_mode, {**config, "tagger": _worker_state["tagger"]}
+    )
+    assert excerpter is not None
+    return [file_entry(excerpter, source) for source in sources]
@@ -1,8 +1,40 @@
+import random
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from logging import WARNING
 from typing import Any
 
+from llm_context.exceptions import ParseLimitExceeded
+from llm_context.excerpters.line_index import LineIndex
 from llm_context.excerpters.parser import Source
+from llm_context.utils import log
+
+MAX_SAMPLE_DEFINITIONS = 2
+SAMPLE_DEFINITIONS = "sample-definitions"
+LIMITED_HEADER_LINES = 5
+LIMITED_HEADER_CHARS = 1000
+
+
+@dataclass
+class ReservoirSample:
+    size: int
+    items: list[tuple[str, str]]
+    seen: int
+
+    @staticmethod
+    def create(size: int = MAX_SAMPLE_DEFINITIONS) -> "ReservoirSample":
+        return ReservoirSample(size, [], 0)
+
+    @staticmethod
+    def from_config(config: dict[str, Any]) -> "ReservoirSample":
+        return ReservoirSample.create(int(config.get(SAMPLE_DEFINITIONS, MAX_SAMPLE_DEFINITIONS)))
+
+    def add(self, item: tuple[str, str]) -> None:
+        self.seen += 1
+        if len(self.items) < self.size:
+            self.items.append(item)
+        elif (slot := random.randrange(self.seen)) < self.size:
+            self.items[slot] = item
 
 
 @dataclass(frozen=True)
@@ -12,6 +44,14 @@ class Excerpt:
     metadata: dict[str, Any]
 
 
+def limited_excerpt(source: Source, error: ParseLimitExceeded, metadata: dict[str, Any]) -> Excerpt:
+    log(WARNING, f"{error.message}; excerpting only its header")
+    header = LineIndex.create(source.content[:LIMITED_HEADER_CHARS]).lines(0, LIMITED_HEADER_LINES)
+    return Excerpt(
+        source.rel_path, "\n".join([*header, "⋮..."]), {**metadata, "parse_limit": error.limit}
+    )
+
+
 @dataclass(frozen=True)
 class Excerpts:
     excerpts: list[Excerpt]
@@ -0,0 +1,113 @@
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from llm_context.excerpters.base import Excerpt, Excerpter, Excerpts, Excluded, ReservoirSample
+from llm_context.excerpters.code_outliner import render_outline
+from llm_context.excerpters.parser import Buffer, Source
+
+_JAVA_MODIFIERS = (
+    rb"(?:(?:public|private|protected|static|final|abstract|synchronized|native|default)[ \t]+)"
+)
+_CSHARP_MODIFIERS = (
+    rb"(?:(?:public|private|protected|internal|static|virtual|override|abstract|sealed|async"
+    rb"|partial|readonly|extern|unsafe|new)[ \t]+)"
+)
+_C_FUNCTION = (
+    rb"^(?!(?:if|else|for|while|do|switch|return|case|goto|typedef|struct|enum|union)\b)"
+    rb"[A-Za-z_][\w \t\*&:<>,]*?[ \t\*&]\**(?:\w+::)*(~?\w+)[ \t]*\([^;\n]*$"
+)
+_JS_DECLARATION = (
+    rb"^[ \t]*(?:export[ \t]+)?(?:default[ \t]+)?(?:async[ \t]+)?"
+    rb"(?:function\*?[ \t]*|class[ \t]+)([\w$]+)"
+    rb"|^[ \t]*(?:export[ \t]+)?(?:const|let|var)[ \t]+([\w$]+)[ \t]*=[ \t]*(?:async[ \t]*)?"
+    rb"(?:function\b|\([^)\n]*\)[ \t]*=>|[\w$]+[ \t]*=>)"
+    rb"|^[ \t]+(?:(?:static|async|get|set|public|private|protected|readonly)[ \t]+)*"
+    rb"(?!(?:if|for|while|switch|catch|return|function)\b)([\w$]+)[ \t]*\([^)\n]*\)[^;\n=]*\{"
+)
+
+_SIGNATURES: dict[str, bytes] = {
+    "c": rb"^(?:typedef[ \t]+)?(?:struct|enum|union)[ \t]+(\w+)|" + _C_FUNCTION,
+    "cpp": (
+        rb"^[ \t]*(?:template[ \t]*<[^>\n]*>[ \t]*)?(?:class|struct|namespace|enum|union)"
+        rb"(?:[ \t]+class)?[ \t]+(\w+)|" + _C_FUNCTION + rb"|^[ \t]+"
+        rb"(?![ \t]|(?:if|else|for|while|do|switch|return|catch|new|delete)\b)[\w:<>,*& \t]*?"
+        rb"(~?\w+)[ \t]*\([^;)\n]*\)[^;\n]*\{"
+    ),
+    "csharp": (
+        rb"^[ \t]*" + _CSHARP_MODIFIERS + rb"*(?:class|interface|struct|enum|record|namespace)"
+        rb"[ \t]+(\w+)|^[ \t]*" + _CSHARP_MODIFIERS + rb"+[\w<>\[\],.? \t]+?[ \t](\w+)[ \t]*[(<]"
+    ),
+    "elisp": rb"^[ \t]*\((?:cl-)?(?:defun|defmacro|defvar|defcustom|defconst|defsubst)[ \t]+([^\s()]+)",
+    "elixir": (
+        rb"^[ \t]*(?:def|defp|defmacro|defmacrop|defguard|defmodule|defprotocol|defimpl)"
+        rb"[ \t]+([\w.!?]+)"
+    ),
+    "elm": (
+        rb"^(?:port[ \t]+)?module[ \t]+([\w.]+)|^type[ \t]+(?:alias[ \t]+)?(\w+)"
+        rb"|^(?!(?:module|import|port|type|infix)\b)([a-z]\w*)"
+        rb"(?:[ \t]+(?:\w+|\([^)\n]*\)))*[ \t]*=(?!=)"
+    ),
+    "go": rb"^func[ \t]+(?:\([^)]*\)[ \t]*)?(\w+)|^type[ \t]+(\w+)",
+    "java": (
+        rb"^[ \t]*" + _JAVA_MODIFIERS + rb"*(?:class|interface|enum|record)[ \t]+(\w+)"
+        rb"|^[ \t]*" + _JAVA_MODIFIERS + rb"+[\w<>\[\],.? \t]+?[ \t](\w+)[ \t]*\("
+    ),
+    "javascript": _JS_DECLARATION,
+    "php": (
+        rb"^[ \t]*(?:(?:abstract|final|public|private|protected|static)[ \t]+)*"
+        rb"(?:function[ \t]+&?|class[ \t]+|interface[ \t]+|trait[ \t]+|enum[ \t]+)(\w+)"
+    ),
+    "python": rb"^[ \t]*(?:async[ \t]+)?(?:def|class)[ \t]+(\w+)",
+    "ruby": rb"^[ \t]*(?:def[ \t]+(?:self\.)?|class[ \t]+|module[ \t]+)([A-Za-z_][\w:]*[?!=]?)",
+    "rust": (
+        rb"^[ \t]*(?:pub(?:\([^)]*\))?[ \t]+)?(?:(?:async|const|unsafe|extern[ \t]+\"C\")[ \t]+)*"
+        rb"(?:fn|struct|enum|trait|mod|type|union|macro_rules!)[ \t]+(\w+)"
+    ),
+    "typescript": (
+        rb"^[ \t]*(?:export[ \t]+)?(?:declare[ \t]+)?(?:abstract[ \t]+)?"
+        rb"(?:interface|type|enum|namespace|module|class)[ \t]+([\w$]+)|" + _JS_DECLARATION
+    ),
+}
+
+SIGNATURES: dict[str, re.Pattern[bytes]] = {
+    language: re.compile(pattern, re.MULTILINE) for language, pattern in _SIGNATURES.items()
+}
+
+
+@dataclass(frozen=True)
+class FastOutliner(Excerpter):
+    config: dict[str, Any]
+
+    def excerpt(self, sources: list[Source]) -> Excerpts:
+        excerpts = []
+        samples = ReservoirSample.from_config(self.config)
+        for source in sources:
+            pattern = SIGNATURES.get(source.language or "")
+            if pattern is None:
+                continue
+            signatures = find_signatures(pattern, source.code)
+            if signatures:
+                content = render_outline(source.content, [line for line, _ in signatures])
+                excerpts.append(Excerpt(source.rel_path, content, self._create_metadata()))
+            for _, name in signatures:
+                samples.add((source.rel_path, name))
+        return Excerpts(excerpts, {"sample_definitions": samples.items})
+
+    def excluded(self, sources: list[Source]) -> list[Excluded]:
+        return []
+
+    def _create_metadata(self) -> dict[str, Any]:
+        return {"processor_type": "fast-outliner"}
+
+
+def find_signatures(pattern: re.Pattern[bytes], code: Buffer) -> list[tuple[int, str]]:
+    data = bytes(code)
+    signatures = []
+    line, offset = 0, 0
+    for match in pattern.finditer(data):
+        start = match.start(match.lastindex)
+        line += data.count(b"\n", offset, start)
+        offset = start
+        signatures.append((line, match[match.lastindex].decode("utf-8", "replace")))
+    return signatures
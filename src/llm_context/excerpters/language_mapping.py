@@ -1,32 +1,126 @@
+import os
+import re
 from dataclasses import dataclass
 from importlib import resources
-from typing import Optional
+from typing import Any, Callable, Optional
+
+from llm_context.exceptions import LLMContextError
+
+SHEBANG_BYTES = 256
+SHEBANG = re.compile(rb"#!\s*(\S+)[ \t]*([^\r\n]*)")
+INTERPRETER_VERSION = re.compile(r"[\d.]+$")
+
+_extensions = {
+    "c": "c",
+    "cc": "cpp",
+    "cs": "csharp",
+    "cpp": "cpp",
+    "d.cts": "typescript",
+    "d.mts": "typescript",
+    "d.ts": "typescript",
+    "el": "elisp",
+    "ex": "elixir",
+    "elm": "elm",
+    "go": "go",
+    "java": "java",
+    "js": "javascript",
+    "md": "markdown",
+    "mjs": "javascript",
+    "php": "php",
+    "py": "python",
+    "rb": "ruby",
+    "rs": "rust",
+    "svelte": "svelte",
+    "ts": "typescript",
+    "vue": "vue",
+}
+
+_filenames = {
+    "Gemfile": "ruby",
+    "Rakefile": "ruby",
+    "SConscript": "python",
+    "SConstruct": "python",
+}
+
+_interpreters = {
+    "elixir": "elixir",
+    "node": "javascript",
+    "nodejs": "javascript",
+    "php": "php",
+    "python": "python",
+    "ruby": "ruby",
+}
+
+
+@dataclass(frozen=True)
+class LanguageRegistry:
+    extensions: dict[str, str]
+    filenames: dict[str, str]
+    interpreters: dict[str, str]
+    max_suffix_parts: int
+
+    @staticmethod
+    def create(
+        extensions: dict[str, str], filenames: dict[str, str], interpreters: dict[str, str]
+    ) -> "LanguageRegistry":
+        max_suffix_parts = max((suffix.count(".") + 1 for suffix in extensions), default=1)
+        return LanguageRegistry(extensions, filenames, interpreters, max_suffix_parts)
+
+    def with_mappings(self, config: dict[str, Any]) -> "LanguageRegistry":
+        if not any(config.get(kind) for kind in ("extensions", "filenames", "interpreters")):
+            return self
+        known = {*_extensions.values(), *self.extensions.values()}
+        for kind in ("extensions", "filenames", "interpreters"):
+            for key, language in (config.get(kind) or {}).items():
+                if language not in known:
+                    raise LLMContextError(
+                        f"Unknown language '{language}' for {kind} entry '{key}'",
+                        "INVALID_CONFIG",
+                    )
+        return LanguageRegistry.create(
+            {**self.extensions, **_strip_dots(config.get("extensions") or {})},
+            {**self.filenames, **(config.get("filenames") or {})},
+            {**self.interpreters, **(config.get("interpreters") or {})},
+        )
+
+    def from_name(self, path: str) -> Optional[str]:
+        name = os.path.basename(path)
+        language = self.filenames.get(name)
+        if language:
+            return language
+        parts = name.split(".")
+        for i in range(max(1, len(parts) - self.max_suffix_parts), len(parts)):
+            language = self.extensions.get(".".join(parts[i:]))
+            if language:
+                return language
+        return None
+
+    def from_shebang(self, head: bytes) -> Optional[str]:
+        match = SHEBANG.match(head)
+        if not match:
+            return None
+        command = os.path.basename(match.group(1).decode("utf-8", "replace"))
+        if command == "env":
+            args = match.group(2).decode("utf-8", "replace").split()
+            command = next((arg for arg in args if not arg.startswith("-")), "")
+        return self.interpreters.get(INTERPRETER_VERSION.sub("", command))
+
+    def detect(self, path: str, read_head: Callable[[], bytes]) -> Optional[str]:
+        language = self.from_name(path)
+        if language is None and "." not in os.path.basename(path):
+            language = self.from_shebang(read_head())
+        return language
+
+
+def _strip_dots(extensions: dict[str, str]) -> dict[str, str]:
+    return {suffix.lstrip("."): language for suffix, language in extensions.items()}
+
+
+LANGUAGES = LanguageRegistry.create(_extensions, _filenames, _interpreters)
 
 
 def to_language(filename: str) -> Optional[str]:
-    ext_to_lang = {
-        "c": "c",
-        "cc": "cpp",
-        "cs": "csharp",
-        "cpp": "cpp",
-        "el": "elisp",
-        "ex": "elixir",
-        "elm": "elm",
-        "go": "go",
-        "java": "java",
-        "js": "javascript",
-        "md": "markdown",
-        "mjs": "javascript",
-        "php": "php",
-        "py": "python",
-        "rb": "ruby",
-        "rs": "rust",
-        "svelte": "svelte",
-        "ts": "typescript",
-        "vue": "vue",
-    }
-    extension = filename.split(".")[-1]
-    return ext_to_lang.get(extension)
+    return LANGUAGES.from_name(filename)
 
 
 _tag_languages = [
@@ -55,6 +149,8 @@ class LangQuery:
             return self._read_tag_query("javascript") + self._read_tag_query("typescript")
         return self._read_tag_query(language)
 
-    def _read_tag_query(self, language: str) -> str:
-        filename = f"{language}-tags.scm"
+    def get_query(self, filename: str) -> str:
         return resources.files("llm_context.excerpters.ts-qry").joinpath(filename).read_text()
+
+    def _read_tag_query(self, language: str) -> str:
+        return self.get_query(f"{language}-tags.scm")
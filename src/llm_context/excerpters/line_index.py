@@ -0,0 +1,53 @@
+import re
+from dataclasses import dataclass
+
+LINE_FEED = re.compile("\n")
+LINE_BREAKS = re.compile("\r\n|[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
+
+Interval = tuple[int, int]
+
+
+@dataclass(frozen=True)
+class LineIndex:
+    text: str
+    starts: list[int]
+    ends: list[int]
+
+    @staticmethod
+    def create(text: str) -> "LineIndex":
+        return LineIndex._index(text, LINE_FEED, True)
+
+    @staticmethod
+    def splitlines(text: str) -> "LineIndex":
+        return LineIndex._index(text, LINE_BREAKS, False)
+
+    @staticmethod
+    def _index(text: str, breaks: re.Pattern, keep_trailing: bool) -> "LineIndex":
+        starts, ends = [0], []
+        for match in breaks.finditer(text):
+            ends.append(match.start())
+            starts.append(match.end())
+        ends.append(len(text))
+        if not keep_trailing and starts[-1] == len(text):
+            starts.pop()
+            ends.pop()
+        return LineIndex(text, starts, ends)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def line(self, number: int) -> str:
+        return self.text[self.starts[number] : self.ends[number]]
+
+    def lines(self, start: int, end: int) -> list[str]:
+        return [self.text[s:e] for s, e in zip(self.starts[start:end], self.ends[start:end])]
+
+
+def merge_intervals(intervals: list[Interval]) -> list[Interval]:
+    merged: list[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
@@ -1,12 +1,10 @@
 from dataclasses import dataclass
-from importlib import resources
 from typing import Any, Optional, cast
 
-from tree_sitter import Node
-
-from llm_context.excerpters.base import Excerpt, Excerpter, Excerpts, Excluded
-from llm_context.excerpters.language_mapping import to_language
-from llm_context.excerpters.parser import ASTFactory, Source
+from llm_context.exceptions import ParseLimitExceeded
+from llm_context.excerpters.base import Excerpt, Excerpter, Excerpts, Excluded, limited_excerpt
+from llm_context.excerpters.line_index import Interval, LineIndex, merge_intervals
+from llm_context.excerpters.parser import AST, ASTFactory, ParseLimits, Source
 
 
 @dataclass(frozen=True)
@@ -23,21 +21,23 @@ class Markdown(Excerpter):
     def excerpt(self, sources: list[Source]) -> Excerpts:
         if not sources:
             return Excerpts([], {})
+        ast_factory = ASTFactory.from_config(self.config)
         excerpts = [
-            self._excerpt_source(source)
+            self._excerpt_source(source, ast_factory)
             for source in sources
-            if to_language(source.rel_path) == "markdown"
+            if source.language == "markdown"
         ]
         return Excerpts(excerpts, {"sample_definitions": []})
 
     def excluded(self, sources: list[Source]) -> list[Excluded]:
         if not sources:
             return []
+        ast_factory = ASTFactory.from_config(self.config)
         results = []
         for source in sources:
-            if to_language(source.rel_path) != "markdown":
+            if source.language != "markdown":
                 continue
-            excluded_content = self._collect_excluded(source)
+            excluded_content = self._collect_excluded(source, ast_factory)
             if excluded_content:
                 results.append(
                     Excluded(
@@ -47,57 +47,62 @@ class Markdown(Excerpter):
                 )
         return results
 
-    def _excerpt_source(self, source: Source) -> Excerpt:
-        ast = ASTFactory.create().create_from_code(source)
-        included_ranges = self._get_included_ranges(ast, source)
+    def _excerpt_source(self, source: Source, ast_factory: ASTFactory) -> Excerpt:
+        try:
+            ast = ast_factory.create_from_code(source, ParseLimits.from_config(self.config))
+            included_ranges = self._get_included_ranges(ast)
+        except ParseLimitExceeded as e:
+            return limited_excerpt(source, e, self._metadata())
         content = self._format_content(source.content, included_ranges)
         return Excerpt(source.rel_path, content, self._metadata())
 
-    def _get_included_ranges(self, ast: Any, source: Source) -> set[int]:
-        query_str = self._get_query()
-        matches = ast.match(query_str)
-        included_lines: set[int] = set()
+    def _get_included_ranges(self, ast: AST) -> list[Interval]:
+        matches = ast.match(self._get_query(ast))
+        included_ranges: list[Interval] = []
         for _, captures in matches:
             for capture_name, nodes in captures.items():
                 node_type = self._map_capture_to_type(capture_name)
                 if self._should_include(node_type):
                     for node in nodes:
-                        for line_num in range(node.start_point[0], node.end_point[0] + 1):
-                            included_lines.add(line_num)
-        return included_lines
+                        included_ranges.append((node.start_point[0], node.end_point[0]))
+        return merge_intervals(included_ranges)
 
-    def _format_content(self, content: str, included_line_set: set[int]) -> str:
-        lines = content.splitlines()
+    def _format_content(self, content: str, included_ranges: list[Interval]) -> str:
+        index = LineIndex.splitlines(content)
         result: list[str] = []
         last_included_index = -2
-        for i, line in enumerate(lines):
-            is_included = i in included_line_set
-            if is_included:
-                if i - last_included_index > 2 and result:
-                    result.append("⋮...")
-                result.append(line)
-                last_included_index = i
-        if result and last_included_index < len(lines) - 2:
+        for start, end in included_ranges:
+            end = min(end, len(index) - 1)
+            if start > end:
+                continue
+            if start - last_included_index > 2 and result:
+                result.append("⋮...")
+            result.extend(index.lines(start, end + 1))
+            last_included_index = end
+        if result and last_included_index < len(index) - 2:
             result.append("⋮...")
         return "\n".join(result)
 
-    def _collect_excluded(self, source: Source) -> str:
-        ast = ASTFactory.create().create_from_code(source)
-        matches = ast.match(self._get_query())
+    def _collect_excluded(self, source: Source, ast_factory: ASTFactory) -> str:
+        try:
+            ast = ast_factory.create_from_code(source, ParseLimits.from_config(self.config))
+            matches = ast.match(self._get_query(ast))
+        except ParseLimitExceeded:
+            return ""
         included_ranges: set[tuple[int, int]] = set()
-        for _, captures in matches.items():
+        for _, captures in matches:
             for capture_name, nodes in captures.items():
                 node_type = self._map_capture_to_type(capture_name)
                 if self._should_include(node_type):
                     for node in nodes:
                         included_ranges.add((node.start_point[0], node.end_point[0]))
         excluded_paras = []
-        for _, captures in matches.items():
+        for _, captures in matches:
             if "content.paragraph" in captures:
                 for node in captures["content.paragraph"]:
                     node_range = (node.start_point[0], node.end_point[0])
                     if node_range not in included_ranges:
-                        text = self._node_text(node, source.content)
+                        text = ast.node_text(node)
                         if text.strip():
                             excluded_paras.append(text)
         return "\n\n".join(excluded_paras[:3]) if excluded_paras else ""
@@ -128,11 +133,8 @@ class Markdown(Excerpter):
         }
         return config_map.get(node_type, False)
 
-    def _get_query(self) -> str:
-        return resources.files("llm_context.excerpters.ts-qry").joinpath("markdown.scm").read_text()
-
-    def _node_text(self, node: Node, content: str) -> str:
-        return content[node.start_byte : node.end_byte]
+    def _get_query(self, ast: AST) -> str:
+        return ast.lang_qry_factory.get_query("markdown.scm")
 
     def _metadata(self) -> dict[str, Any]:
         included = [
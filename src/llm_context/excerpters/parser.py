@@ -1,17 +1,70 @@
+import threading
+import time
 import warnings
 from dataclasses import dataclass
-from typing import Any, NamedTuple, cast
+from typing import Any, NamedTuple, Optional, Union, cast
 
 from tree_sitter import Language, Node, Parser, Query, QueryCursor, Tree  # type: ignore
 
+from llm_context.exceptions import ParseLimitExceeded
 from llm_context.excerpters.language_mapping import LangQuery, to_language
+from llm_context.excerpters.tree_cache import TreeCache
 
 warnings.filterwarnings("ignore", category=FutureWarning, module="tree_sitter")
 
+DEFAULT_MAX_FILE_BYTES = 2 * 1024 * 1024
+DEFAULT_PARSE_TIMEOUT_MS = 5000
+DEFAULT_MATCH_LIMIT = 10000
+UNLIMITED_MATCHES = 0xFFFFFFFF
+PARSE_CHUNK_BYTES = 4096
+
+
+Buffer = Union[bytes, memoryview]
+
 
 class Source(NamedTuple):
     rel_path: str
     content: str
+    data: Optional[Buffer] = None
+    lang: Optional[str] = None
+
+    @property
+    def code(self) -> Buffer:
+        return self.data if self.data is not None else self.content.encode("utf-8")
+
+    @property
+    def language(self) -> Optional[str]:
+        return self.lang or to_language(self.rel_path)
+
+
+def decode_range(code: Buffer, start_byte: int, end_byte: int) -> str:
+    return str(memoryview(code)[start_byte:end_byte], "utf-8")
+
+
+@dataclass(frozen=True)
+class ParseLimits:
+    max_file_bytes: int
+    parse_timeout_ms: int
+    match_limit: int
+
+    @staticmethod
+    def create_default() -> "ParseLimits":
+        return ParseLimits(DEFAULT_MAX_FILE_BYTES, DEFAULT_PARSE_TIMEOUT_MS, DEFAULT_MATCH_LIMIT)
+
+    @staticmethod
+    def from_config(config: dict[str, Any]) -> "ParseLimits":
+        return ParseLimits(
+            max(0, int(config.get("max-file-bytes", DEFAULT_MAX_FILE_BYTES))),
+            max(0, int(config.get("parse-timeout-ms", DEFAULT_PARSE_TIMEOUT_MS))),
+            max(0, int(config.get("match-limit", DEFAULT_MATCH_LIMIT))),
+        )
+
+    def check_size(self, rel_path: str, code: Buffer) -> None:
+        if self.max_file_bytes and len(code) > self.max_file_bytes:
+            raise ParseLimitExceeded(rel_path, "max-file-bytes")
+
+
+DEFAULT_PARSE_LIMITS = ParseLimits.create_default()
 
 
 @dataclass(frozen=True)
@@ -41,36 +94,137 @@ class ParserFactory:
         return self.get_tuple(language_name)[0]
 
 
+@dataclass(frozen=True)
+class QueryCache:
+    queries: dict[tuple[str, str], Query]
+    lock: threading.Lock
+
+    @staticmethod
+    def create() -> "QueryCache":
+        return QueryCache({}, threading.Lock())
+
+    def get(self, language_name: str, language: Language, query_scm: str) -> Query:
+        key = (language_name, query_scm)
+        query = self.queries.get(key)
+        if query is None:
+            with self.lock:
+                query = self.queries.get(key)
+                if query is None:
+                    query = self.queries[key] = Query(language, query_scm)
+        return query
+
+    def clear(self) -> None:
+        with self.lock:
+            self.queries.clear()
+
+
+QUERY_CACHE = QueryCache.create()
+
+
 @dataclass(frozen=True)
 class LangQueryFactory:
     tag_query_cache: dict[str, str]
+    query_cache: dict[str, str]
 
     @staticmethod
     def create() -> "LangQueryFactory":
-        return LangQueryFactory({})
+        return LangQueryFactory({}, {})
 
     def get_tag_query(self, language: str) -> str:
         if language not in self.tag_query_cache:
             self.tag_query_cache[language] = LangQuery().get_tag_query(language)
         return self.tag_query_cache[language]
 
+    def get_query(self, filename: str) -> str:
+        if filename not in self.query_cache:
+            self.query_cache[filename] = LangQuery().get_query(filename)
+        return self.query_cache[filename]
+
 
 @dataclass(frozen=True)
 class ASTFactory:
     parser_factory: ParserFactory
     lang_qry_factory: LangQueryFactory
+    tree_cache: Optional[TreeCache] = None
 
     @staticmethod
-    def create():
-        return ASTFactory(ParserFactory.create(), LangQueryFactory.create())
+    def create(tree_cache: Optional[TreeCache] = None):
+        return ASTFactory(ParserFactory.create(), LangQueryFactory.create(), tree_cache)
 
-    def create_from_code(self, source: Source) -> "AST":
-        language_name = to_language(source.rel_path)
+    @staticmethod
+    def from_config(config: dict[str, Any]) -> "ASTFactory":
+        tagger = config.get("tagger")
+        return cast(ASTFactory, tagger.ast_factory) if tagger else ASTFactory.create()
+
+    def create_from_code(self, source: Source, limits: ParseLimits = DEFAULT_PARSE_LIMITS) -> "AST":
+        language_name = source.language
         assert language_name, f"Unsupported language: {source.rel_path}"
         language = self.parser_factory.get_language(language_name)
         parser = self.parser_factory.get_parser(language_name)
-        tree = parser.parse(bytes(source.content, "utf-8"))
-        return AST(language_name, language, parser, tree, self.lang_qry_factory, source.rel_path)
+        code = source.code
+        limits.check_size(source.rel_path, code)
+        tree = self._parse(parser, source.rel_path, language_name, code, limits)
+        return AST(
+            language_name,
+            language,
+            parser,
+            tree,
+            self.lang_qry_factory,
+            source.rel_path,
+            code,
+            limits,
+        )
+
+    def _parse(
+        self, parser: Parser, rel_path: str, language_name: str, code: Buffer, limits: ParseLimits
+    ) -> Tree:
+        if not limits.parse_timeout_ms:
+            return self._parse_text(parser, rel_path, language_name, code, code)
+        reader = DeadlineReader.create(code, limits.parse_timeout_ms)
+        tree = self._parse_text(parser, rel_path, language_name, code, reader)
+        reader.deadline = None
+        if reader.expired:
+            if self.tree_cache:
+                self.tree_cache.discard(rel_path)
+            raise ParseLimitExceeded(rel_path, "parse-timeout-ms")
+        return tree
+
+    def _parse_text(
+        self,
+        parser: Parser,
+        rel_path: str,
+        language_name: str,
+        code: Buffer,
+        text: Union[Buffer, "DeadlineReader"],
+    ) -> Tree:
+        return (
+            self.tree_cache.parse(parser, rel_path, language_name, code, text)
+            if self.tree_cache
+            else parser.parse(text)
+        )
+
+
+@dataclass
+class DeadlineReader:
+    """Feeds the parser in chunks and ends its input once the parse deadline has passed.
+
+    Trees parsed from a reader read node text back through it, so the deadline is cleared
+    when parsing finishes.
+    """
+
+    code: bytes
+    deadline: Optional[float]
+    expired: bool
+
+    @staticmethod
+    def create(code: Buffer, timeout_ms: int) -> "DeadlineReader":
+        return DeadlineReader(bytes(code), time.monotonic() + timeout_ms / 1000, False)
+
+    def __call__(self, byte_offset: int, _point: Any) -> bytes:
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            self.expired = True
+            return b""
+        return self.code[byte_offset : byte_offset + PARSE_CHUNK_BYTES]
 
 
 @dataclass(frozen=True)
@@ -81,15 +235,26 @@ class AST:
     tree: Tree
     lang_qry_factory: LangQueryFactory
     rel_path: str
+    code: Buffer
+    limits: ParseLimits = DEFAULT_PARSE_LIMITS
 
     def match(self, query_scm: str) -> list[tuple[int, dict[str, list[Node]]]]:
-        query = Query(self.language, query_scm)
-        cursor = QueryCursor(query)
-        return cursor.matches(self.tree.root_node)
+        query = QUERY_CACHE.get(self.language_name, self.language, query_scm)
+        cursor = QueryCursor(query, match_limit=self.limits.match_limit or UNLIMITED_MATCHES)
+        matches = cursor.matches(self.tree.root_node)
+        if cursor.did_exceed_match_limit:
+            raise ParseLimitExceeded(self.rel_path, "match-limit")
+        return matches
 
     def tag_matches(self) -> list[tuple[int, dict[str, list[Node]]]]:
         return self.match(self._get_tag_query())
 
+    def definitions(self) -> list[dict[str, Any]]:
+        return [defn for match in self.tag_matches() if (defn := to_definition(match))]
+
+    def node_text(self, node: Node) -> str:
+        return decode_range(self.code, node.start_byte, node.end_byte)
+
     def _get_tag_query(self) -> str:
         return self.lang_qry_factory.get_tag_query(self.language_name)
 
@@ -103,11 +268,7 @@ class ASTNode:
         return ASTNode(node) if node else None
 
     def to_definition(self, name: "ASTNode") -> dict[str, Any]:
-        return {"type": self.node.type, "name": name.to_text(), **self.to_text()}
-
-    def to_text(self) -> dict[str, Any]:
-        text = self.node.text.decode("utf8") if self.node.text else ""
-        return {"text": text, **self.to_pos_info()} if self.node else {}
+        return {"type": self.node.type, "name": name.to_pos_info(), **self.to_pos_info()}
 
     def to_pos_info(self) -> dict[str, Any]:
         return {
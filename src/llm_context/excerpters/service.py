@@ -1,8 +1,19 @@
+import sys
 from dataclasses import dataclass
 from typing import Any, Optional, Type
 
-from llm_context.excerpters.base import Excerpter, Excerpts
+from llm_context.excerpt_cache import ExcerptCache
+from llm_context.excerpt_pool import ExcerptPool, FileEntry, file_entry
+from llm_context.excerpters.base import (
+    SAMPLE_DEFINITIONS,
+    Excerpt,
+    Excerpter,
+    Excerpts,
+    ReservoirSample,
+)
 from llm_context.excerpters.code_outliner import CodeOutliner
+from llm_context.excerpters.fast_outliner import FastOutliner
+from llm_context.excerpters.language_mapping import LANGUAGES, LanguageRegistry
 from llm_context.excerpters.markdown import Markdown
 from llm_context.excerpters.parser import Source
 from llm_context.excerpters.sfc import Sfc
@@ -12,15 +23,26 @@ from llm_context.rule import Rule  # Import for type
 @dataclass(frozen=True)
 class ExcerpterRegistry:
     excerpters: dict[str, Type[Excerpter]]
+    cache: Optional[ExcerptCache] = None
+    pool: Optional[ExcerptPool] = None
+    languages: LanguageRegistry = LANGUAGES
 
     @staticmethod
-    def create() -> "ExcerpterRegistry":
+    def create(
+        cache: Optional[ExcerptCache] = None,
+        pool: Optional[ExcerptPool] = None,
+        languages: LanguageRegistry = LANGUAGES,
+    ) -> "ExcerpterRegistry":
         return ExcerpterRegistry(
             {
                 "code-outliner": CodeOutliner,
+                "fast-outliner": FastOutliner,
                 "markdown": Markdown,
                 "sfc": Sfc,
-            }
+            },
+            cache,
+            pool,
+            languages,
         )
 
     def get_excerpter(self, excerpter_name: str, config: dict[str, Any]) -> Optional[Excerpter]:
@@ -34,7 +56,7 @@ class ExcerpterRegistry:
             )
         sources_by_mode: dict[str, list[Source]] = {}
         for source in sources:
-            excerpt_mode = rule.get_excerpt_mode(source.rel_path)
+            excerpt_mode = rule.get_excerpt_mode(source.rel_path, source.language, self.languages)
             if excerpt_mode:
                 if excerpt_mode not in sources_by_mode:
                     sources_by_mode[excerpt_mode] = []
@@ -45,9 +67,61 @@ class ExcerpterRegistry:
             excerpt_config["tagger"] = tagger
             excerpter = self.get_excerpter(excerpt_mode, excerpt_config)
             if excerpter:
-                excerpts = excerpter.excerpt(mode_sources)
+                excerpts = (
+                    self._excerpt_per_file(excerpt_mode, excerpt_config, mode_sources)
+                    if self.cache or self._parallel(mode_sources)
+                    else excerpter.excerpt(mode_sources)
+                )
                 all_excerpts.extend([excerpts])
+        if self.cache:
+            self.cache.evict()
         return all_excerpts
 
+    def _parallel(self, sources: list[Source]) -> bool:
+        return self.pool is not None and self.pool.config.engages(len(sources))
+
+    def _excerpt_per_file(
+        self, excerpt_mode: str, excerpt_config: dict[str, Any], sources: list[Source]
+    ) -> Excerpts:
+        config = {**excerpt_config, SAMPLE_DEFINITIONS: sys.maxsize}
+        excerpter = self.get_excerpter(excerpt_mode, config)
+        assert excerpter is not None
+        cache = self.cache
+        keys = [
+            cache.key(excerpt_mode, config, source.language or "", source.code) if cache else ""
+            for source in sources
+        ]
+        entries = [cache.get(key) if cache else None for key in keys]
+        missing = [i for i, entry in enumerate(entries) if entry is None]
+        computed = self._compute_entries(
+            excerpt_mode, config, excerpter, [sources[i] for i in missing]
+        )
+        for i, entry in zip(missing, computed):
+            entries[i] = entry
+            if cache and not _limited(entry):
+                cache.put(keys[i], entry)
+        excerpts: list[Excerpt] = []
+        samples = ReservoirSample.create()
+        for source, entry in zip(sources, entries):
+            assert entry is not None
+            excerpts.extend(
+                Excerpt(source.rel_path, content, metadata)
+                for content, metadata in entry["excerpts"]
+            )
+            for name in entry["definitions"]:
+                samples.add((source.rel_path, name))
+        return Excerpts(excerpts, {"sample_definitions": samples.items})
+
+    def _compute_entries(
+        self, excerpt_mode: str, config: dict[str, Any], excerpter: Excerpter, sources: list[Source]
+    ) -> list[FileEntry]:
+        if self.pool and self._parallel(sources):
+            return self.pool.excerpt(excerpt_mode, config, sources)
+        return [file_entry(excerpter, source) for source in sources]
+
     def empty(self) -> list[Excerpts]:
         return [Excerpts([], {"sample_definitions": []})]
+
+
+def _limited(entry: FileEntry) -> bool:
+    return any("parse_limit" in metadata for _, metadata in entry["excerpts"])
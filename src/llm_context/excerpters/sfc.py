@@ -1,12 +1,10 @@
 from dataclasses import dataclass
-from importlib import resources
 from typing import Any, Optional, cast
 
-from tree_sitter import Query, QueryCursor
-
-from llm_context.excerpters.base import Excerpt, Excerpter, Excerpts, Excluded
-from llm_context.excerpters.language_mapping import to_language
-from llm_context.excerpters.parser import ASTFactory, Source
+from llm_context.exceptions import ParseLimitExceeded
+from llm_context.excerpters.base import Excerpt, Excerpter, Excerpts, Excluded, limited_excerpt
+from llm_context.excerpters.line_index import LineIndex
+from llm_context.excerpters.parser import ASTFactory, ParseLimits, Source
 
 
 @dataclass(frozen=True)
@@ -25,33 +23,38 @@ class Sfc(Excerpter):
     def excerpt(self, sources: list[Source]) -> Excerpts:
         if not sources:
             return Excerpts([], {"sample_definitions": []})
+        ast_factory = ASTFactory.from_config(self.config)
         results = []
         for source in sources:
-            language = to_language(source.rel_path)
+            language = source.language
             if language not in ["svelte", "vue"]:
                 continue
-            sections = self._parse_sfc_sections(source, language)
+            metadata = {
+                "processor_type": "sfc-excerpter",
+                "sections_included": self._get_included_section_types(),
+                "language": language,
+            }
+            try:
+                sections = self._parse_sfc_sections(source, language, ast_factory)
+            except ParseLimitExceeded as e:
+                results.append(limited_excerpt(source, e, metadata))
+                continue
             excerpted_content = self._create_excerpt_content(source, sections)
             if excerpted_content:
-                result = Excerpt(
-                    source.rel_path,
-                    excerpted_content,
-                    {
-                        "processor_type": "sfc-excerpter",
-                        "sections_included": self._get_included_section_types(),
-                        "language": language,
-                    },
-                )
-                results.append(result)
+                results.append(Excerpt(source.rel_path, excerpted_content, metadata))
         return Excerpts(results, {"sample_definitions": []})
 
     def excluded(self, sources: list[Source]) -> list[Excluded]:
+        ast_factory = ASTFactory.from_config(self.config)
         excluded_results = []
         for source in sources:
-            language = to_language(source.rel_path)
+            language = source.language
             if language not in ["svelte", "vue"]:
                 continue
-            sections = self._parse_sfc_sections(source, language)
+            try:
+                sections = self._parse_sfc_sections(source, language, ast_factory)
+            except ParseLimitExceeded:
+                continue
             excluded_sections = {}
             for section in sections:
                 if not self._should_include_section(section.section_type):
@@ -62,13 +65,11 @@ class Sfc(Excerpter):
                 )
         return excluded_results
 
-    def _parse_sfc_sections(self, source: Source, language: str) -> list[SfcSection]:
-        ast_factory = ASTFactory.create()
-        ast = ast_factory.create_from_code(source)
-        queries = self._get_sfc_queries(language)
-        query = Query(ast.language, queries)
-        cursor = QueryCursor(query)
-        matches = cursor.matches(ast.tree.root_node)
+    def _parse_sfc_sections(
+        self, source: Source, language: str, ast_factory: ASTFactory
+    ) -> list[SfcSection]:
+        ast = ast_factory.create_from_code(source, ParseLimits.from_config(self.config))
+        matches = ast.match(ast.lang_qry_factory.get_query(f"{language}-injections.scm"))
         sections = []
         seen = set()
         for match_id, captures in matches:
@@ -90,7 +91,7 @@ class Sfc(Excerpter):
                                             section_type=section_type,
                                             start_line=parent_node.start_point[0],
                                             end_line=parent_node.end_point[0],
-                                            content=source.content[start_byte:end_byte],
+                                            content=ast.node_text(parent_node),
                                             attributes={},
                                         )
                                     )
@@ -106,35 +107,31 @@ class Sfc(Excerpter):
                 return "template"
         return None
 
-    def _get_sfc_queries(self, language: str) -> str:
-        query_file = f"{language}-injections.scm"
-        return resources.files("llm_context.excerpters.ts-qry").joinpath(query_file).read_text()
-
     def _create_excerpt_content(self, source: Source, sections: list[SfcSection]) -> str:
-        lines = source.content.split("\n")
+        index = LineIndex.create(source.content)
         result_lines = []
         last_included_line = -1
         for section in sections:
             if last_included_line >= 0 and section.start_line > last_included_line + 1:
                 if self.config.get("with-template", False):
-                    gap_lines = lines[last_included_line + 1 : section.start_line]
+                    gap_lines = index.lines(last_included_line + 1, section.start_line)
                     result_lines.extend(gap_lines)
                 else:
                     result_lines.append("⋮...")
             if self._should_include_section(section.section_type):
-                section_lines = lines[section.start_line : section.end_line + 1]
+                section_lines = index.lines(section.start_line, section.end_line + 1)
                 result_lines.extend(section_lines)
                 last_included_line = section.end_line
             else:
                 if section.start_line > last_included_line + 1:
-                    result_lines.append(lines[section.start_line])
+                    result_lines.append(index.line(section.start_line))
                 result_lines.append("⋮...")
-                if section.end_line < len(lines) - 1:
-                    result_lines.append(lines[section.end_line])
+                if section.end_line < len(index) - 1:
+                    result_lines.append(index.line(section.end_line))
                 last_included_line = section.end_line
-        if last_included_line < len(lines) - 1:
+        if last_included_line < len(index) - 1:
             if self.config.get("with-template", False):
-                result_lines.extend(lines[last_included_line + 1 :])
+                result_lines.extend(index.lines(last_included_line + 1, len(index)))
             else:
                 result_lines.append("⋮...")
         return "\n".join(result_lines)
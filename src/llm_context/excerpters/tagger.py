@@ -1,7 +1,14 @@
 from dataclasses import dataclass
 from typing import Any, NamedTuple, Optional, Protocol
 
-from llm_context.excerpters.parser import ASTFactory, Source, to_definition
+from llm_context.excerpters.parser import (
+    DEFAULT_PARSE_LIMITS,
+    ASTFactory,
+    Buffer,
+    ParseLimits,
+    Source,
+    decode_range,
+)
 
 
 class Position(NamedTuple):
@@ -9,56 +16,90 @@ class Position(NamedTuple):
     col: int
 
 
-@dataclass(frozen=True)
-class Tag:
-    text: str
-    begin: Position
-    end: Position
+class Tag(NamedTuple):
     start: int
     finish: int
+    begin_ln: int
+    begin_col: int
+    end_ln: int
+    end_col: int
+    code: Buffer
 
     @staticmethod
-    def create(node: dict[str, Any]) -> Optional["Tag"]:
+    def create(node: dict[str, Any], code: Buffer) -> Optional["Tag"]:
         return (
             Tag(
-                node["text"],
-                Position(node["start_point"][0], node["start_point"][1]),
-                Position(node["end_point"][0], node["end_point"][1]),
                 node["start_byte"],
                 node["end_byte"],
+                *node["start_point"],
+                *node["end_point"],
+                code,
             )
             if node
             else None
         )
 
+    @property
+    def text(self) -> str:
+        return decode_range(self.code, self.start, self.finish)
 
-@dataclass(frozen=True)
-class Definition:
+    def __repr__(self) -> str:
+        return f"Tag({self.text!r}, {self.begin}, {self.end})"
+
+    @property
+    def begin(self) -> Position:
+        return Position(self.begin_ln, self.begin_col)
+
+    @property
+    def end(self) -> Position:
+        return Position(self.end_ln, self.end_col)
+
+
+class Definition(NamedTuple):
     rel_path: str
     name: Tag | None
-    text: str
-    begin: Position
-    end: Position
     start: int
     finish: int
+    begin_ln: int
+    begin_col: int
+    end_ln: int
+    end_col: int
+    code: Buffer
 
     @staticmethod
-    def create(rel_path: str, node: dict[str, Any]) -> "Definition":
+    def create(rel_path: str, node: dict[str, Any], code: Buffer) -> "Definition":
         return Definition(
             rel_path,
-            Tag.create(node["name"]),
-            node["text"],
-            Position(node["start_point"][0], node["start_point"][1]),
-            Position(node["end_point"][0], node["end_point"][1]),
+            Tag.create(node["name"], code),
             node["start_byte"],
             node["end_byte"],
+            *node["start_point"],
+            *node["end_point"],
+            code,
         )
 
+    @property
+    def text(self) -> str:
+        return decode_range(self.code, self.start, self.finish)
+
+    def __repr__(self) -> str:
+        return f"Definition({self.rel_path!r}, {self.name!r}, {self.begin}, {self.end})"
+
+    @property
+    def begin(self) -> Position:
+        return Position(self.begin_ln, self.begin_col)
+
+    @property
+    def end(self) -> Position:
+        return Position(self.end_ln, self.end_col)
+
 
 class TagExtractor(Protocol):
     workspace_path: str
 
-    def extract_definitions(self, source: Source) -> list[Definition]: ...
+    def extract_definitions(
+        self, source: Source, limits: ParseLimits = DEFAULT_PARSE_LIMITS
+    ) -> list[Definition]: ...
 
 
 @dataclass(frozen=True)
@@ -70,13 +111,11 @@ class ASTBasedTagger(TagExtractor):
     def create(workspace_path: str, ast_factory: ASTFactory) -> "ASTBasedTagger":
         return ASTBasedTagger(workspace_path, ast_factory)
 
-    def extract_definitions(self, source: Source) -> list[Definition]:
-        ast = self.ast_factory.create_from_code(source)
-        return [
-            Definition.create(ast.rel_path, defn)
-            for defn in map(to_definition, ast.tag_matches())
-            if defn
-        ]
+    def extract_definitions(
+        self, source: Source, limits: ParseLimits = DEFAULT_PARSE_LIMITS
+    ) -> list[Definition]:
+        ast = self.ast_factory.create_from_code(source, limits)
+        return [Definition.create(ast.rel_path, defn, ast.code) for defn in ast.definitions()]
 
 
 @dataclass(frozen=True)
@@ -92,7 +131,3 @@ class FileTags:
     @staticmethod
     def create_each(extractor: TagExtractor, sources: list[Source]) -> list["FileTags"]:
         return [FileTags.create(extractor, source) for source in sources]
-
-
-def find_definition(definitions, name):
-    return [d.text for d in definitions if d.name and d.name.text == name]
@@ -0,0 +1,103 @@
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from tree_sitter import Parser, Point, Tree  # type: ignore
+
+MAX_RETAINED_BYTES = 64 * 1024 * 1024
+ESTIMATED_NODE_BYTES = 64
+
+
+@dataclass
+class TreeCache:
+    max_bytes: int
+    trees: OrderedDict[tuple[str, str], tuple[bytes, Tree, int]]
+    size: int
+    stats: Counter
+
+    @staticmethod
+    def create(max_bytes: int = MAX_RETAINED_BYTES) -> "TreeCache":
+        return TreeCache(max_bytes, OrderedDict(), 0, Counter())
+
+    def parse(
+        self,
+        parser: Parser,
+        rel_path: str,
+        language_name: str,
+        code: bytes | memoryview,
+        text: Optional[bytes | memoryview | Callable[[int, Any], Any]] = None,
+    ) -> Tree:
+        key = (rel_path, language_name)
+        retained = self.trees.pop(key, None)
+        if retained is not None:
+            self.size -= retained[2]
+        if retained is None:
+            self.stats["full"] += 1
+            tree = parser.parse(code if text is None else text)
+        elif retained[0] == code:
+            self.stats["reused"] += 1
+            code, tree = retained[0], retained[1]
+        else:
+            self.stats["incremental"] += 1
+            old_code, old_tree, _ = retained
+            code = bytes(code)
+            _apply_edit(old_tree, old_code, code)
+            tree = parser.parse(code if text is None else text, old_tree)
+        self._retain(key, code, tree)
+        return tree
+
+    def discard(self, rel_path: str) -> None:
+        for key in [key for key in self.trees if key[0] == rel_path]:
+            self.size -= self.trees.pop(key)[2]
+
+    def _retain(self, key: tuple[str, str], code: bytes | memoryview, tree: Tree) -> None:
+        size = len(code) + tree.root_node.descendant_count * ESTIMATED_NODE_BYTES
+        if size > self.max_bytes:
+            return
+        self.trees[key] = (bytes(code), tree, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, _, evicted) = self.trees.popitem(last=False)
+            self.size -= evicted
+
+
+def _apply_edit(tree: Tree, old: bytes, new: bytes) -> None:
+    start = _common_prefix(old, new)
+    suffix = _common_suffix(old[start:], new[start:])
+    old_end = len(old) - suffix
+    new_end = len(new) - suffix
+    tree.edit(
+        start_byte=start,
+        old_end_byte=old_end,
+        new_end_byte=new_end,
+        start_point=_point(old, start),
+        old_end_point=_point(old, old_end),
+        new_end_point=_point(new, new_end),
+    )
+
+
+def _common_prefix(a: bytes, b: bytes) -> int:
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[:mid] == b[:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _common_suffix(a: bytes, b: bytes) -> int:
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[len(a) - mid :] == b[len(b) - mid :]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _point(code: bytes, offset: int) -> Point:
+    row = code.count(b"\n", 0, offset)
+    return Point(row, offset - (code.rfind(b"\n", 0, offset) + 1))
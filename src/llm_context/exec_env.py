@@ -7,6 +7,7 @@ from typing import Any, ClassVar, Optional
 
 from llm_context.excerpters.parser import ASTFactory
 from llm_context.excerpters.tagger import ASTBasedTagger
+from llm_context.project_scan import ProjectScan
 from llm_context.rule import ToolConstants
 from llm_context.rule_parser import DEFAULT_CODE_RULE
 from llm_context.state import AllSelections, FileSelection, StateStore
@@ -90,6 +91,7 @@ class ExecutionEnvironment:
     state: ExecutionState
     constants: ToolConstants
     tagger: Optional[Any]
+    watcher: Optional[Any] = None
 
     @staticmethod
     def create_init(project_root: Path) -> "ExecutionEnvironment":
@@ -120,9 +122,22 @@ class ExecutionEnvironment:
 
     def with_state(self, new_state: ExecutionState) -> "ExecutionEnvironment":
         return ExecutionEnvironment(
-            self.project_layout, self.runtime, new_state, self.constants, self.tagger
+            self.project_layout, self.runtime, new_state, self.constants, self.tagger, self.watcher
         )
 
+    def with_tagger(self, tagger: Any) -> "ExecutionEnvironment":
+        return ExecutionEnvironment(
+            self.project_layout, self.runtime, self.state, self.constants, tagger, self.watcher
+        )
+
+    def with_watcher(self, watcher: Any) -> "ExecutionEnvironment":
+        return ExecutionEnvironment(
+            self.project_layout, self.runtime, self.state, self.constants, self.tagger, watcher
+        )
+
+    def current_scan(self) -> Optional[ProjectScan]:
+        return self.watcher.snapshot() if self.watcher else None
+
     @property
     def logger(self) -> logging.Logger:
         return self.runtime.logger
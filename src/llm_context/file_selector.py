@@ -1,24 +1,79 @@
+import fnmatch
+import functools
 import os
+import re
 from dataclasses import dataclass
 from logging import ERROR, WARNING
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 from pathspec import GitIgnoreSpec  # type: ignore
+from pathspec.util import normalize_file  # type: ignore
 
 from llm_context.context_spec import ContextSpec
+from llm_context.git_index import GitIndex
+from llm_context.project_scan import ProjectScan
 from llm_context.rule import IGNORE_NOTHING, INCLUDE_ALL, Rule
 from llm_context.state import FileSelection
-from llm_context.utils import PathConverter, log, safe_read_file
+from llm_context.utils import PathConverter, log
+
+_NAMED_GROUP = re.compile(r"\(\?P<[^>]+>")
+_ANY_DIRS = "^(?:.+/)?"
+
+
+@dataclass(frozen=True)
+class CompiledPathspec:
+    spec: GitIgnoreSpec
+    includes: Optional[re.Pattern[str]]
+    excludes: Optional[re.Pattern[str]]
+
+    @staticmethod
+    def create(patterns: list[str]) -> "CompiledPathspec":
+        return _compile_pathspec(tuple(patterns))
+
+    @staticmethod
+    def _combine(patterns: list[Any]) -> Optional[re.Pattern[str]]:
+        sources = [_NAMED_GROUP.sub("(?:", p.regex.pattern) for p in patterns]
+        if not sources:
+            return None
+        if not all(source.startswith("^") for source in sources):
+            return re.compile("|".join(f"(?:{source})" for source in sources))
+        floating = [s[len(_ANY_DIRS) :] for s in sources if s.startswith(_ANY_DIRS)]
+        anchored = [s[1:] for s in sources if not s.startswith(_ANY_DIRS)]
+        branches = [f"(?:.+/)?(?:{'|'.join(floating)})"] if floating else []
+        branches.extend(f"(?:{source})" for source in anchored)
+        return re.compile("^(?:" + "|".join(branches) + ")")
+
+    @property
+    def patterns(self) -> list[Any]:
+        return self.spec.patterns
+
+    def match_file(self, path: str) -> bool:
+        if self.includes is None:
+            return False
+        file = normalize_file(path)
+        if not self.includes.match(file):
+            return False
+        if self.excludes is None or not self.excludes.match(file):
+            return True
+        return self.spec.match_file(file)
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_pathspec(patterns: tuple[str, ...]) -> CompiledPathspec:
+    spec = GitIgnoreSpec.from_lines(patterns)
+    includes = CompiledPathspec._combine([p for p in spec.patterns if p.include is True])
+    excludes = CompiledPathspec._combine([p for p in spec.patterns if p.include is False])
+    return CompiledPathspec(spec, includes, excludes)
 
 
 @dataclass(frozen=True)
 class PathspecIgnorer:
-    pathspec: GitIgnoreSpec
+    pathspec: CompiledPathspec
 
     @staticmethod
     def create(ignore_patterns: list[str]) -> "PathspecIgnorer":
-        pathspec = GitIgnoreSpec.from_lines(ignore_patterns)
+        pathspec = CompiledPathspec.create(ignore_patterns)
         return PathspecIgnorer(pathspec)
 
     def ignore(self, path: str) -> bool:
@@ -26,69 +81,157 @@ class PathspecIgnorer:
         return self.pathspec.match_file(path)
 
 
+def _gitignore_order(item: tuple[str, PathspecIgnorer]) -> tuple[int, str]:
+    return (-item[0].count("/"), item[0])
+
+
+@dataclass(frozen=True)
+class IgnorerTrie:
+    ignorers: list[PathspecIgnorer]
+    children: dict[str, "IgnorerTrie"]
+
+    @staticmethod
+    def create() -> "IgnorerTrie":
+        return IgnorerTrie([], {})
+
+    def insert(self, prefix: str, ignorer: PathspecIgnorer) -> None:
+        node = self
+        for part in [p for p in prefix.split("/") if p]:
+            node = node.children.setdefault(part, IgnorerTrie.create())
+        node.ignorers.append(ignorer)
+
+    def items(self, prefix: str = "") -> list[tuple[str, PathspecIgnorer]]:
+        own = [(prefix or "/", ignorer) for ignorer in self.ignorers]
+        return own + [
+            item
+            for name, child in self.children.items()
+            for item in child.items(f"{prefix}/{name}")
+        ]
+
+    def ignore(self, path: str) -> bool:
+        node: Optional[IgnorerTrie] = self
+        start = 1
+        while node is not None:
+            test_path = path[start:]
+            if test_path and any(ignorer.ignore(test_path) for ignorer in node.ignorers):
+                return True
+            end = path.find("/", start)
+            if end < 0:
+                return False
+            node = node.children.get(path[start:end])
+            start = end + 1
+        return False
+
+
 @dataclass(frozen=True)
 class GitIgnorer:
-    ignorer_data: list[tuple[str, PathspecIgnorer]]
+    xtra_data: list[tuple[str, PathspecIgnorer]]
+    gitignore_trie: IgnorerTrie
+    loaded_dirs: set[str]
 
     @staticmethod
-    def from_git_root(root_dir: str, xtra_root_patterns: list[str] = []) -> "GitIgnorer":
-        ignorer_data = []
-        if xtra_root_patterns:
-            ignorer_data.append(("/", PathspecIgnorer.create(xtra_root_patterns)))
-        gitignores = GitIgnorer._collect_gitignores(root_dir)
-        for relative_path, patterns in gitignores:
-            ignorer_data.append((relative_path, PathspecIgnorer.create(patterns)))
-        start_idx = 1 if xtra_root_patterns else 0
-        if len(ignorer_data) > start_idx:
-            prefix_data = ignorer_data[:start_idx]
-            gitignore_data = ignorer_data[start_idx:]
-            gitignore_data.sort(key=lambda x: (-x[0].count("/"), x[0]))
-            ignorer_data = prefix_data + gitignore_data
-        return GitIgnorer(ignorer_data)
+    def create(xtra_root_patterns: list[str] = []) -> "GitIgnorer":
+        xtra_data = (
+            [("/", PathspecIgnorer.create(xtra_root_patterns))] if xtra_root_patterns else []
+        )
+        return GitIgnorer(xtra_data, IgnorerTrie.create(), set())
 
     @staticmethod
-    def _collect_gitignores(top: str) -> list[tuple[str, list[str]]]:
-        gitignores = []
-        for root, _, files in os.walk(top):
-            if ".gitignore" in files:
-                content = safe_read_file(os.path.join(root, ".gitignore"))
-                if content:
-                    patterns = content.splitlines()
-                    relpath = os.path.relpath(root, top)
-                    fixpath = "/" if relpath == "." else f"/{relpath}"
-                    gitignores.append((fixpath, patterns))
-        return gitignores
+    def from_git_root(
+        root_dir: str, xtra_root_patterns: list[str] = [], scan: Optional[ProjectScan] = None
+    ) -> "GitIgnorer":
+        ignorer = GitIgnorer.create(xtra_root_patterns)
+        ignorer.discover(scan or ProjectScan.create(root_dir), root_dir)
+        return ignorer
+
+    @property
+    def ignorer_data(self) -> list[tuple[str, PathspecIgnorer]]:
+        return self.xtra_data + sorted(self.gitignore_trie.items(), key=_gitignore_order)
+
+    def discover(self, scan: ProjectScan, abs_dir: str) -> list[str]:
+        return scan.collect(
+            abs_dir, lambda current_dir: ([current_dir], self._discover_dirs(scan, current_dir))
+        )
+
+    def _discover_dirs(self, scan: ProjectScan, abs_dir: str) -> list[str]:
+        self.load_gitignore(scan, abs_dir)
+        relative_dir = os.path.relpath(abs_dir, scan.root_path)
+        return [
+            entry.path
+            for entry in scan.listdir(abs_dir)
+            if entry.is_dir
+            and not entry.is_symlink
+            and not self.ignore(f"/{os.path.normpath(os.path.join(relative_dir, entry.name))}/")
+        ]
+
+    def load_gitignore(self, scan: ProjectScan, abs_dir: str) -> None:
+        if abs_dir in self.loaded_dirs:
+            return
+        self.loaded_dirs.add(abs_dir)
+        patterns = scan.gitignore_patterns(abs_dir)
+        if patterns:
+            relpath = os.path.relpath(abs_dir, scan.root_path)
+            prefix = "/" if relpath == "." else f"/{relpath}"
+            self.gitignore_trie.insert(prefix, PathspecIgnorer.create(patterns))
 
     def ignore(self, path: str) -> bool:
         assert path not in ("/", ""), "Root directory cannot be an input for ignore method"
-        for prefix, ignorer in self.ignorer_data:
-            if path.startswith(prefix):
-                if prefix == "/":
-                    test_path = path[1:]
-                else:
-                    test_path = path[len(prefix) :].lstrip("/")
-                if test_path and ignorer.ignore(test_path):
-                    return True
-        return False
+        return self.ignore_tracked(path) or self.gitignore_trie.ignore(path)
+
+    def ignore_tracked(self, path: str) -> bool:
+        root_path = path[1:]
+        return bool(root_path) and any(ignorer.ignore(root_path) for _, ignorer in self.xtra_data)
 
 
 @dataclass(frozen=True)
 class IncludeFilter:
-    pathspec: GitIgnoreSpec
+    pathspec: CompiledPathspec
+    dir_patterns: Optional[list[tuple[str, ...]]]
 
     @staticmethod
     def create(include_patterns: list[str]) -> "IncludeFilter":
-        pathspec = GitIgnoreSpec.from_lines(include_patterns)
-        return IncludeFilter(pathspec)
+        pathspec = CompiledPathspec.create(include_patterns)
+        return IncludeFilter(pathspec, IncludeFilter._anchored_parts(include_patterns))
+
+    @staticmethod
+    def _anchored_parts(include_patterns: list[str]) -> Optional[list[tuple[str, ...]]]:
+        dir_patterns = []
+        for line in include_patterns:
+            pattern = line.strip()
+            if not pattern or pattern.startswith(("#", "!")):
+                continue
+            pattern = pattern.rstrip("/")
+            if pattern.startswith(("\\", "**/")) or "/" not in pattern:
+                return None
+            dir_patterns.append(tuple(pattern.lstrip("/").split("/")))
+        return dir_patterns
 
     def include(self, path: str) -> bool:
         assert path not in ("/", ""), "Root directory cannot be an input for include method"
         return self.pathspec.match_file(path)
 
+    def may_include_below(self, dir_path: str) -> bool:
+        assert dir_path not in ("/", ""), "Root directory cannot be an input for pruning"
+        if self.dir_patterns is None:
+            return True
+        dir_parts = dir_path.strip("/").split("/")
+        return any(_may_match_below(parts, dir_parts) for parts in self.dir_patterns)
+
+
+def _may_match_below(pattern_parts: tuple[str, ...], dir_parts: list[str]) -> bool:
+    for i, dir_part in enumerate(dir_parts):
+        if i >= len(pattern_parts) or pattern_parts[i] == "**":
+            return True
+        pattern_part = pattern_parts[i]
+        if "\\" not in pattern_part and not fnmatch.fnmatchcase(dir_part, pattern_part):
+            return False
+    return True
+
 
 @dataclass(frozen=True)
 class FileSelector:
     root_path: str
+    scan: ProjectScan
     ignorer: GitIgnorer
     converter: PathConverter
     limit_filter: IncludeFilter
@@ -96,12 +239,14 @@ class FileSelector:
     since: Optional[float]
 
     @staticmethod
-    def create_universal(root_path: Path) -> "FileSelector":
-        return FileSelector.create_ignorer(root_path, IGNORE_NOTHING)
+    def create_universal(root_path: Path, scan: Optional[ProjectScan] = None) -> "FileSelector":
+        return FileSelector.create_ignorer(root_path, IGNORE_NOTHING, scan)
 
     @staticmethod
-    def create_ignorer(root_path: Path, pathspecs: list[str]) -> "FileSelector":
-        return FileSelector.create(root_path, pathspecs, INCLUDE_ALL, [])
+    def create_ignorer(
+        root_path: Path, pathspecs: list[str], scan: Optional[ProjectScan] = None
+    ) -> "FileSelector":
+        return FileSelector.create(root_path, pathspecs, INCLUDE_ALL, [], scan=scan)
 
     @staticmethod
     def create(
@@ -110,41 +255,112 @@ class FileSelector:
         limit_to_pathspecs: list[str],
         also_include_pathspecs: list[str],
         since: Optional[float] = None,
+        scan: Optional[ProjectScan] = None,
     ) -> "FileSelector":
-        ignorer = GitIgnorer.from_git_root(str(root_path), ignore_pathspecs)
+        scan = scan or ProjectScan.create(root_path)
+        ignorer = GitIgnorer.create(ignore_pathspecs)
         converter = PathConverter.create(root_path)
         limit_filter = IncludeFilter.create(limit_to_pathspecs)
         also_include_filter = IncludeFilter.create(also_include_pathspecs)
         return FileSelector(
-            str(root_path), ignorer, converter, limit_filter, also_include_filter, since
+            str(root_path), scan, ignorer, converter, limit_filter, also_include_filter, since
         )
 
     def get_files(self) -> list[str]:
-        files = list(set(self.traverse(self.root_path) + self.also_traverse(self.root_path)))
-        return [f for f in files if Path(f).stat().st_mtime > self.since] if self.since else files
+        files = list(set(self.enumerate_files()))
+        self.scan.save_cache()
+        since = self.since
+        return [f for f in files if self.scan.is_newer(f, since)] if since else files
+
+    def enumerate_files(self) -> list[str]:
+        git_index = self.scan.git_index
+        if git_index is None:
+            return self.walk_files()
+        tracked = self.select_tracked(git_index.file_paths)
+        untracked = self.select_untracked(git_index) if self.scan.config.untracked else []
+        return tracked + untracked + self.also_traverse(self.root_path)
+
+    def walk_files(self) -> list[str]:
+        return self.traverse(self.root_path) + self.also_traverse(self.root_path)
+
+    def select_tracked(self, tracked_paths: list[str]) -> list[str]:
+        entered_dirs: dict[str, bool] = {}
+        selected = []
+        for tracked_path in tracked_paths:
+            path = f"/{tracked_path}"
+            included = self._should_enter_tracked_dir(
+                path.rsplit("/", 1)[0], entered_dirs
+            ) and self._should_include_tracked_file(path)
+            if included or self.also_include_filter.include(path):
+                abs_path = os.path.join(self.root_path, *tracked_path.split("/"))
+                if self.scan.is_file(abs_path):
+                    selected.append(abs_path)
+        return selected
+
+    def select_untracked(self, git_index: GitIndex) -> list[str]:
+        tracked_files = set(git_index.abs_file_paths(self.root_path))
+        tracked_dirs = {self.root_path}
+        for abs_path in tracked_files:
+            abs_dir = os.path.dirname(abs_path)
+            while abs_dir not in tracked_dirs:
+                tracked_dirs.add(abs_dir)
+                abs_dir = os.path.dirname(abs_dir)
+        entered = {self.root_path}
+        selected = []
+        for abs_dir in sorted(tracked_dirs, key=lambda path: (path.count(os.sep), path)):
+            if abs_dir not in entered:
+                continue
+            files, dirs = self._select_entries(abs_dir)
+            selected.extend(f for f in files if f not in tracked_files)
+            for sub_dir in dirs:
+                if sub_dir in tracked_dirs:
+                    entered.add(sub_dir)
+                else:
+                    selected.extend(self.traverse(sub_dir))
+        return selected
+
+    def _should_enter_tracked_dir(self, path: str, entered_dirs: dict[str, bool]) -> bool:
+        if not path:
+            return True
+        if path not in entered_dirs:
+            entered_dirs[path] = (
+                self._should_enter_tracked_dir(path.rsplit("/", 1)[0], entered_dirs)
+                and not self.ignorer.ignore_tracked(f"{path}/")
+                and self.limit_filter.may_include_below(path)
+            )
+        return entered_dirs[path]
+
+    def _should_include_tracked_file(self, path: str) -> bool:
+        return not self.ignorer.ignore_tracked(path) and self.limit_filter.include(path)
 
     def get_relative_files(self) -> list[str]:
         return sorted(self.converter.to_relative(self.get_files()))
 
     def traverse(self, current_dir: str) -> list[str]:
-        entries = os.listdir(current_dir)
+        return self.scan.collect(current_dir, self._select_entries)
+
+    def _select_entries(self, current_dir: str) -> tuple[list[str], list[str]]:
+        self.ignorer.load_gitignore(self.scan, current_dir)
+        entries = self.scan.listdir(current_dir)
         relative_current_dir = os.path.relpath(current_dir, self.root_path)
         dirs = [
-            e_path
+            e.path
             for e in entries
-            if (e_path := os.path.join(current_dir, e))
-            and os.path.isdir(e_path)
-            and (not self.ignorer.ignore(self._relative_path(relative_current_dir, e)))
+            if e.is_dir
+            and self._should_enter_dir(self._relative_path(relative_current_dir, e.name))
         ]
         files = [
-            e_path
+            e.path
             for e in entries
-            if (e_path := os.path.join(current_dir, e))
-            and not os.path.isdir(e_path)
-            and self._should_include_file(self._relative_path(relative_current_dir, e))
+            if not e.is_dir
+            and self._should_include_file(self._relative_path(relative_current_dir, e.name))
         ]
-        subdir_files = [file for d in dirs for file in self.traverse(d)]
-        return files + subdir_files
+        return files, dirs
+
+    def _should_enter_dir(self, path: str) -> bool:
+        if self.ignorer.ignore(f"{path}/"):
+            return False
+        return self.limit_filter.may_include_below(path)
 
     def _should_include_file(self, path: str) -> bool:
         assert path not in ("/", ""), "Root directory cannot be an input for filtering"
@@ -155,22 +371,26 @@ class FileSelector:
     def also_traverse(self, current_dir: str) -> list[str]:
         if not self.also_include_filter.pathspec.patterns:
             return []
-        entries = os.listdir(current_dir)
+        return self.scan.collect(current_dir, self._select_also_included)
+
+    def _select_also_included(self, current_dir: str) -> tuple[list[str], list[str]]:
+        entries = self.scan.listdir(current_dir)
         relative_current_dir = os.path.relpath(current_dir, self.root_path)
         dirs = [
-            e_path
+            e.path
             for e in entries
-            if (e_path := os.path.join(current_dir, e)) and os.path.isdir(e_path)
+            if e.is_dir
+            and self.also_include_filter.may_include_below(
+                self._relative_path(relative_current_dir, e.name)
+            )
         ]
         files = [
-            e_path
+            e.path
             for e in entries
-            if (e_path := os.path.join(current_dir, e))
-            and not os.path.isdir(e_path)
-            and self.also_include_filter.include(self._relative_path(relative_current_dir, e))
+            if not e.is_dir
+            and self.also_include_filter.include(self._relative_path(relative_current_dir, e.name))
         ]
-        subdir_files = [file for d in dirs for file in self.also_traverse(d)]
-        return files + subdir_files
+        return files, dirs
 
     def _relative_path(self, dir: str, filename: str) -> str:
         return f"/{os.path.normpath(os.path.join(dir, filename))}"
@@ -198,6 +418,7 @@ class ContextSelector:
             full_limit_to_pathspecs,
             full_also_include_pathspecs,
             since,
+            spec.scan,
         )
         excerpted_selector = FileSelector.create(
             root_path,
@@ -205,6 +426,7 @@ class ContextSelector:
             excerpted_limit_to_pathspecs,
             excerpted_also_include_pathspecs,
             since,
+            spec.scan,
         )
         return ContextSelector(full_selector, excerpted_selector, rule)
 
@@ -235,8 +457,15 @@ class ContextSelector:
         )
 
     def select_excerpted_only(self, file_selection: FileSelection) -> "FileSelection":
-        all_excerpted_files = self.excerpted_selector.get_relative_files()
-        supported_excerpted = [f for f in all_excerpted_files if self.rule.get_excerpt_mode(f)]
+        selector = self.excerpted_selector
+        abs_files = selector.get_files()
+        supported_excerpted = sorted(
+            rel_path
+            for rel_path, abs_path in zip(selector.converter.to_relative(abs_files), abs_files)
+            if self.rule.get_excerpt_mode(
+                rel_path, selector.scan.language(abs_path), selector.scan.registry
+            )
+        )
         return FileSelection._create(
             file_selection.rule_name, [], supported_excerpted, file_selection.timestamp
         )
@@ -0,0 +1,118 @@
+import os
+import struct
+from dataclasses import dataclass
+from logging import WARNING
+from pathlib import Path
+from typing import Optional
+
+from llm_context.utils import log
+
+_HEADER = struct.Struct(">4sLL")
+_ENTRY = struct.Struct(">LLLLLLLLLL20sH")
+
+_EXTENDED_FLAG = 0x4000
+_NAME_MASK = 0x0FFF
+
+_MODE_TYPE_MASK = 0o170000
+_MODE_REGULAR = 0o100000
+_MODE_SYMLINK = 0o120000
+
+
+@dataclass(frozen=True)
+class GitIndexEntry:
+    path: str
+    mode: int
+
+    @property
+    def is_file(self) -> bool:
+        return self.mode & _MODE_TYPE_MASK in (_MODE_REGULAR, _MODE_SYMLINK)
+
+
+@dataclass(frozen=True)
+class GitIndex:
+    version: int
+    entries: list[GitIndexEntry]
+
+    @staticmethod
+    def load(root_path: Path | str) -> Optional["GitIndex"]:
+        index_path = GitIndex.index_path(root_path)
+        if index_path is None:
+            return None
+        try:
+            return GitIndex.parse(index_path.read_bytes())
+        except (OSError, ValueError, struct.error) as e:
+            log(WARNING, f"Could not read git index {index_path}, walking the filesystem: {e}")
+            return None
+
+    @staticmethod
+    def index_path(root_path: Path | str) -> Optional[Path]:
+        dot_git = Path(root_path) / ".git"
+        if dot_git.is_file():
+            try:
+                content = dot_git.read_text().strip()
+            except (OSError, UnicodeDecodeError) as e:
+                log(WARNING, f"Could not read {dot_git}, walking the filesystem: {e}")
+                return None
+            if not content.startswith("gitdir:"):
+                return None
+            git_dir = Path(root_path) / content[len("gitdir:") :].strip()
+        else:
+            git_dir = dot_git
+        index_path = git_dir / "index"
+        return index_path if index_path.is_file() else None
+
+    @staticmethod
+    def parse(data: bytes) -> "GitIndex":
+        signature, version, count = _HEADER.unpack_from(data, 0)
+        if signature != b"DIRC" or version not in (2, 3, 4):
+            raise ValueError(f"unsupported index signature {signature!r} version {version}")
+        offset = _HEADER.size
+        entries: list[GitIndexEntry] = []
+        seen: set[str] = set()
+        previous = b""
+        for _ in range(count):
+            start = offset
+            fields = _ENTRY.unpack_from(data, offset)
+            mode, flags = fields[6], fields[11]
+            offset += _ENTRY.size
+            if flags & _EXTENDED_FLAG and version >= 3:
+                offset += 2
+            if version == 4:
+                strip, offset = _read_varint(data, offset)
+                end = data.index(b"\0", offset)
+                name = previous[: len(previous) - strip] + data[offset:end]
+                offset = end + 1
+            else:
+                name_length = flags & _NAME_MASK
+                end = (
+                    offset + name_length
+                    if name_length < _NAME_MASK
+                    else data.index(b"\0", offset + _NAME_MASK)
+                )
+                name = data[offset:end]
+                offset = start + ((end - start) // 8 + 1) * 8
+            previous = name
+            path = name.decode("utf-8", errors="surrogateescape")
+            if path in seen:
+                continue
+            seen.add(path)
+            entries.append(GitIndexEntry(path, mode))
+        return GitIndex(version, entries)
+
+    @property
+    def file_paths(self) -> list[str]:
+        return [entry.path for entry in self.entries if entry.is_file]
+
+    def abs_file_paths(self, root_path: str) -> list[str]:
+        return [os.path.join(root_path, *path.split("/")) for path in self.file_paths]
+
+
+def _read_varint(data: bytes, offset: int) -> tuple[int, int]:
+    byte = data[offset]
+    offset += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[offset]
+        offset += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, offset
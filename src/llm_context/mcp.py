@@ -1,13 +1,95 @@
 import ast
+import os
+import threading
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Callable, Iterator, Optional
 
 from mcp.server.fastmcp import FastMCP
 
 from llm_context import commands
+from llm_context.excerpters.parser import ASTFactory
+from llm_context.excerpters.tagger import ASTBasedTagger
+from llm_context.excerpters.tree_cache import TreeCache
 from llm_context.exec_env import ExecutionEnvironment
+from llm_context.project_scan import ScanConfig
+from llm_context.utils import PathConverter, Yaml
+from llm_context.watcher import ProjectWatcher
 
 mcp = FastMCP("llm-context")
 
+_scan_configs: dict[str, tuple[Optional[int], ScanConfig]] = {}
+_watchers: dict[str, tuple[ScanConfig, ProjectWatcher]] = {}
+# A root's tagger shares its tree-sitter parsers and retained trees across tool calls, and
+# neither is thread-safe, so the paired lock serializes calls on that root. Calls on
+# different roots still run concurrently.
+_taggers: dict[str, tuple[threading.Lock, ASTBasedTagger]] = {}
+_taggers_lock = threading.Lock()
+
+
+def _tagger(env: ExecutionEnvironment) -> tuple[threading.Lock, ASTBasedTagger]:
+    root = str(env.project_layout.root_path)
+    with _taggers_lock:
+        if root not in _taggers:
+            ast_factory = ASTFactory.create(TreeCache.create())
+            _taggers[root] = (threading.Lock(), ASTBasedTagger.create(root, ast_factory))
+        return _taggers[root]
+
+
+def _scan_config(env: ExecutionEnvironment) -> ScanConfig:
+    config_path = env.project_layout.config_path
+    root = str(env.project_layout.root_path)
+    try:
+        mtime: Optional[int] = config_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    if root not in _scan_configs or _scan_configs[root][0] != mtime:
+        raw_config = Yaml.load(config_path) if mtime is not None else {}
+        scan_config = ScanConfig.from_config((raw_config or {}).get("scan", {}))
+        _scan_configs[root] = (mtime, scan_config)
+    return _scan_configs[root][1]
+
+
+def _discard_removed(
+    env: ExecutionEnvironment, tree_cache: TreeCache
+) -> Callable[[set[str]], None]:
+    converter = PathConverter.create(env.project_layout.root_path)
+
+    def listener(changed: set[str]) -> None:
+        for rel_path in converter.to_relative([p for p in changed if not os.path.exists(p)]):
+            tree_cache.discard(rel_path)
+
+    return listener
+
+
+def _watcher(env: ExecutionEnvironment, tagger: ASTBasedTagger) -> Optional[ProjectWatcher]:
+    scan_config = _scan_config(env)
+    root = str(env.project_layout.root_path)
+    if root in _watchers and _watchers[root][0] != scan_config:
+        _watchers.pop(root)[1].stop()
+    if not scan_config.watch:
+        return None
+    if root not in _watchers:
+        watcher = ProjectWatcher.start(root, scan_config)
+        if tagger.ast_factory.tree_cache:
+            watcher.add_listener(_discard_removed(env, tagger.ast_factory.tree_cache))
+        _watchers[root] = (scan_config, watcher)
+    return _watchers[root][1]
+
+
+@contextmanager
+def project_env(root_path: str) -> Iterator[ExecutionEnvironment]:
+    env = ExecutionEnvironment.create(Path(root_path))
+    parse_lock, tagger = _tagger(env)
+    env = env.with_tagger(tagger)
+    watcher = _watcher(env, tagger)
+    if watcher is None:
+        with parse_lock, env.activate():
+            yield env
+        return
+    with watcher.session, parse_lock, env.with_watcher(watcher).activate() as live_env:
+        yield live_env
+
 
 @mcp.tool()
 def lc_changed(root_path: str, timestamp: float) -> str:
@@ -16,8 +98,7 @@ def lc_changed(root_path: str, timestamp: float) -> str:
         root_path: Root directory path (e.g. '/home/user/projects/myproject')
         timestamp: Unix timestamp to check modifications since
     """
-    env = ExecutionEnvironment.create(Path(root_path))
-    with env.activate():
+    with project_env(root_path) as env:
         return commands.list_modified_files(env, timestamp)
 
 
@@ -28,8 +109,7 @@ def lc_outlines(root_path: str, rule_name: str) -> str:
         root_path: Root directory path
         rule_name: Rule to use for file selection rules
     """
-    env = ExecutionEnvironment.create(Path(root_path))
-    with env.activate():
+    with project_env(root_path) as env:
         return commands.get_outlines(env, rule_name)
 
 
@@ -39,8 +119,7 @@ def lc_rule_instructions(root_path: str) -> str:
     Args:
         root_path: Root directory path
     """
-    env = ExecutionEnvironment.create(Path(root_path))
-    with env.activate():
+    with project_env(root_path) as env:
         return commands.get_focus_help(env)
 
 
@@ -51,8 +130,7 @@ def lc_preview(root_path: str, rule_name: str) -> str:
         root_path: Root directory path (e.g. '/home/user/projects/myproject')
         rule_name: Name of the rule to preview (e.g. 'prm-code', 'tmp-prm-auth-jwt')
     """
-    env = ExecutionEnvironment.create(Path(root_path))
-    with env.activate():
+    with project_env(root_path) as env:
         return commands.preview_rule(env, rule_name)
 
 
@@ -65,8 +143,7 @@ def lc_missing(root_path: str, param_type: str, data: str, timestamp: float) ->
         data: JSON string containing the data (file paths in /{project-name}/ format or implementation queries)
         timestamp: Context generation timestamp
     """
-    env = ExecutionEnvironment.create(Path(root_path))
-    with env.activate():
+    with project_env(root_path) as env:
         if param_type == "f":
             file_list = ast.literal_eval(data)
             return commands.get_missing_files(env, file_list, timestamp)
@@ -83,4 +160,8 @@ def lc_missing(root_path: str, param_type: str, data: str, timestamp: float) ->
 
 
 def run_server():
-    mcp.run(transport="stdio")
+    try:
+        mcp.run(transport="stdio")
+    finally:
+        for _, watcher in _watchers.values():
+            watcher.stop()
@@ -1,9 +1,10 @@
-import os
 import random
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
 from llm_context.file_selector import FileSelector
+from llm_context.project_scan import ProjectScan
 from llm_context.utils import PathConverter, _format_size, format_age
 
 STATUS_DESCRIPTIONS = {
@@ -20,6 +21,7 @@ class OverviewHelper:
     full_files: set[str]
     excerpted_files: set[str]
     outlined_files: set[str]
+    scan: ProjectScan
 
     def get_status(self, path: str) -> str:
         if self.full_files and path in self.full_files:
@@ -40,12 +42,13 @@ class OverviewHelper:
         return f"Status: {', '.join(legends)}\nFormat: status path bytes (size) age\n\n"
 
     def get_file_info(self, abs_path: str) -> tuple[str, str]:
+        file_stat = self.scan.stat(abs_path)
         return (
             self.get_status(abs_path),
             f"/{Path(self.root_dir).name}/{Path(abs_path).relative_to(self.root_dir)} "
-            f"{os.path.getsize(abs_path)}"
-            f"({_format_size(os.path.getsize(abs_path))})"
-            f"{format_age(os.path.getmtime(abs_path))}",
+            f"{file_stat.st_size}"
+            f"({_format_size(file_stat.st_size)})"
+            f"{format_age(file_stat.st_mtime)}",
         )
 
     def sample_excluded_files(self, abs_paths: list[str]) -> list[str]:
@@ -63,9 +66,13 @@ class FullOverview:
 
     @staticmethod
     def create(
-        root_dir: str, full_files: set[str], excerpted_files: set[str], outlined_files: set[str]
+        root_dir: str,
+        full_files: set[str],
+        excerpted_files: set[str],
+        outlined_files: set[str],
+        scan: ProjectScan,
     ) -> "FullOverview":
-        helper = OverviewHelper(root_dir, full_files, excerpted_files, outlined_files)
+        helper = OverviewHelper(root_dir, full_files, excerpted_files, outlined_files, scan)
         return FullOverview(helper)
 
     def generate(self, abs_paths: list[str]) -> tuple[str, list[str]]:
@@ -85,9 +92,13 @@ class FocusedOverview:
 
     @staticmethod
     def create(
-        root_dir: str, full_files: set[str], excerpted_files: set[str], outlined_files: set[str]
+        root_dir: str,
+        full_files: set[str],
+        excerpted_files: set[str],
+        outlined_files: set[str],
+        scan: ProjectScan,
     ) -> "FocusedOverview":
-        helper = OverviewHelper(root_dir, full_files, excerpted_files, outlined_files)
+        helper = OverviewHelper(root_dir, full_files, excerpted_files, outlined_files, scan)
         return FocusedOverview(helper)
 
     def _group_files_by_immediate_parent(self, abs_paths: list[str]) -> dict[str, list[str]]:
@@ -112,8 +123,9 @@ class FocusedOverview:
         for file_path in sorted(files_in_folder):
             status = self.helper.get_status(file_path)
             filename = Path(file_path).name
-            file_size = os.path.getsize(file_path)
-            file_age = format_age(os.path.getmtime(file_path))
+            file_stat = self.helper.scan.stat(file_path)
+            file_size = file_stat.st_size
+            file_age = format_age(file_stat.st_mtime)
             indented_line = f"  {status} {filename} {_format_size(file_size)} {file_age}"
             lines.append(indented_line)
         return "\n".join(lines)
@@ -124,7 +136,7 @@ class FocusedOverview:
         folder_display = (
             f"/{root_name}/{folder_relative}/" if str(folder_relative) != "." else f"/{root_name}/"
         )
-        total_size = sum(os.path.getsize(f) for f in files_in_folder)
+        total_size = sum(self.helper.scan.size(f) for f in files_in_folder)
         return f"{folder_display} ({len(files_in_folder)} files, {_format_size(total_size)})"
 
     def generate(self, abs_paths: list[str]) -> tuple[str, list[str]]:
@@ -150,11 +162,13 @@ def get_full_overview(
     excerpted_files: list[str],
     outlined_files: list[str],
     overview_ignores: list[str] = [],
+    scan: Optional[ProjectScan] = None,
 ) -> tuple[str, list[str]]:
-    overview_ignorer = FileSelector.create_ignorer(project_root, overview_ignores)
+    scan = scan or ProjectScan.create(project_root)
+    overview_ignorer = FileSelector.create_ignorer(project_root, overview_ignores, scan)
     abs_paths = overview_ignorer.get_files()
     overview = FullOverview.create(
-        str(project_root), set(full_files), set(excerpted_files), set(outlined_files)
+        str(project_root), set(full_files), set(excerpted_files), set(outlined_files), scan
     )
     return overview.generate(abs_paths)
 
@@ -165,10 +179,12 @@ def get_focused_overview(
     excerpted_files: list[str],
     outlined_files: list[str],
     overview_ignores: list[str] = [],
+    scan: Optional[ProjectScan] = None,
 ) -> tuple[str, list[str]]:
-    overview_ignorer = FileSelector.create_ignorer(project_root, overview_ignores)
+    scan = scan or ProjectScan.create(project_root)
+    overview_ignorer = FileSelector.create_ignorer(project_root, overview_ignores, scan)
     abs_paths = overview_ignorer.get_files()
     overview = FocusedOverview.create(
-        str(project_root), set(full_files), set(excerpted_files), set(outlined_files)
+        str(project_root), set(full_files), set(excerpted_files), set(outlined_files), scan
     )
     return overview.generate(abs_paths)
@@ -0,0 +1,272 @@
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from logging import ERROR
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from llm_context.change_log import ChangeLog
+from llm_context.exceptions import LLMContextError
+from llm_context.excerpters.language_mapping import LANGUAGES, SHEBANG_BYTES, LanguageRegistry
+from llm_context.git_index import GitIndex
+from llm_context.scan_cache import CachedEntry, ScanCache
+from llm_context.utils import ProjectLayout, log
+
+
+@dataclass(frozen=True)
+class ScanEntry:
+    name: str
+    path: str
+    is_dir: bool
+    is_symlink: bool
+    dir_entry: Optional[os.DirEntry]
+
+    @staticmethod
+    def from_dir_entry(entry: os.DirEntry) -> "ScanEntry":
+        return ScanEntry(entry.name, entry.path, entry.is_dir(), entry.is_symlink(), entry)
+
+    @staticmethod
+    def from_cached(abs_dir: str, cached: CachedEntry) -> "ScanEntry":
+        name, is_dir, is_symlink = cached
+        return ScanEntry(name, os.path.join(abs_dir, name), is_dir, is_symlink, None)
+
+    def to_cached(self) -> CachedEntry:
+        return (self.name, self.is_dir, self.is_symlink)
+
+
+WALK_BACKEND = "walk"
+GIT_INDEX_BACKEND = "git-index"
+DEFAULT_POLL_INTERVAL = 5.0
+MIN_POLL_INTERVAL = 0.1
+
+
+@dataclass(frozen=True)
+class ScanConfig:
+    workers: int
+    backend: str
+    untracked: bool
+    cache: bool
+    watch: bool
+    poll_interval: float
+
+    @staticmethod
+    def create_default() -> "ScanConfig":
+        return ScanConfig(1, WALK_BACKEND, False, False, False, DEFAULT_POLL_INTERVAL)
+
+    @staticmethod
+    def from_config(config: dict[str, Any]) -> "ScanConfig":
+        backend = config.get("backend", WALK_BACKEND)
+        if backend not in (WALK_BACKEND, GIT_INDEX_BACKEND):
+            raise LLMContextError(
+                f"Unknown scan backend '{backend}', expected '{WALK_BACKEND}' or '{GIT_INDEX_BACKEND}'",
+                "INVALID_CONFIG",
+            )
+        return ScanConfig(
+            max(1, int(config.get("workers", 1))),
+            backend,
+            bool(config.get("untracked", False)),
+            bool(config.get("cache", False)),
+            bool(config.get("watch", False)),
+            max(MIN_POLL_INTERVAL, float(config.get("poll-interval", DEFAULT_POLL_INTERVAL))),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "backend": self.backend,
+            "untracked": self.untracked,
+            "cache": self.cache,
+            "watch": self.watch,
+            "poll-interval": self.poll_interval,
+        }
+
+
+@dataclass(frozen=True)
+class ProjectScan:
+    root_path: str
+    config: ScanConfig
+    git_index: Optional[GitIndex]
+    cache: Optional[ScanCache]
+    changes: Optional[ChangeLog]
+    listings: dict[str, list[ScanEntry]]
+    entries: dict[str, ScanEntry]
+    gitignores: dict[str, list[str]]
+    stats: dict[str, os.stat_result]
+    registry: LanguageRegistry
+    languages: dict[str, Optional[str]]
+
+    @staticmethod
+    def create(
+        root_path: Path | str,
+        config: Optional[ScanConfig] = None,
+        changes: Optional[ChangeLog] = None,
+        registry: LanguageRegistry = LANGUAGES,
+    ) -> "ProjectScan":
+        config = config or ScanConfig.create_default()
+        git_index = GitIndex.load(root_path) if config.backend == GIT_INDEX_BACKEND else None
+        cache = (
+            ScanCache.load(ProjectLayout(Path(root_path)).cache_path, str(root_path))
+            if config.cache
+            else None
+        )
+        return ProjectScan(
+            str(root_path), config, git_index, cache, changes, {}, {}, {}, {}, registry, {}
+        )
+
+    def listdir(self, abs_dir: str) -> list[ScanEntry]:
+        if abs_dir not in self.listings:
+            self._store(abs_dir, *self._read_dir(abs_dir))
+        return self.listings[abs_dir]
+
+    def prefetch(self, abs_dirs: list[str]) -> None:
+        pending = [abs_dir for abs_dir in abs_dirs if abs_dir not in self.listings]
+        if self.config.workers < 2 or len(pending) < 2:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.config.workers, len(pending))) as executor:
+            loaded = list(executor.map(self._load_dir, pending))
+        for abs_dir, (listing, mtime_ns, gitignore) in zip(pending, loaded):
+            self._store(abs_dir, listing, mtime_ns)
+            if gitignore is not None:
+                self.gitignores.setdefault(abs_dir, gitignore)
+
+    def save_cache(self) -> None:
+        if self.cache:
+            self.cache.save()
+
+    def _store(self, abs_dir: str, listing: list[ScanEntry], mtime_ns: Optional[int]) -> None:
+        self.entries.update((entry.path, entry) for entry in listing)
+        self.listings[abs_dir] = listing
+        if self.cache and mtime_ns is not None:
+            self.cache.put(abs_dir, mtime_ns, [entry.to_cached() for entry in listing])
+
+    def _load_dir(self, abs_dir: str) -> tuple[list[ScanEntry], Optional[int], Optional[list[str]]]:
+        listing, mtime_ns = self._read_dir(abs_dir)
+        gitignore = (
+            self._read_gitignore(abs_dir, listing) if abs_dir not in self.gitignores else None
+        )
+        return listing, mtime_ns, gitignore
+
+    def _read_dir(self, abs_dir: str) -> tuple[list[ScanEntry], Optional[int]]:
+        if self.cache is None:
+            return self._scan_dir(abs_dir), None
+        mtime_ns = os.stat(abs_dir).st_mtime_ns
+        cached = self.cache.get(abs_dir, mtime_ns)
+        if cached is not None:
+            return [ScanEntry.from_cached(abs_dir, entry) for entry in cached], None
+        return self._scan_dir(abs_dir), mtime_ns
+
+    def _scan_dir(self, abs_dir: str) -> list[ScanEntry]:
+        with os.scandir(abs_dir) as it:
+            listing = [ScanEntry.from_dir_entry(entry) for entry in it]
+        return sorted(listing, key=lambda entry: entry.name)
+
+    def walk(self, top: str) -> Iterator[tuple[str, list[ScanEntry]]]:
+        frontier = [top]
+        while frontier:
+            self.prefetch(frontier)
+            next_frontier = []
+            for abs_dir in frontier:
+                listing = self.listdir(abs_dir)
+                yield abs_dir, listing
+                next_frontier.extend(
+                    entry.path for entry in listing if entry.is_dir and not entry.is_symlink
+                )
+            frontier = next_frontier
+
+    def collect(self, top: str, select: Callable[[str], tuple[list[str], list[str]]]) -> list[str]:
+        files: list[str] = []
+        frontier = [top]
+        while frontier:
+            self.prefetch(frontier)
+            selections = [select(abs_dir) for abs_dir in frontier]
+            files.extend(file for dir_files, _ in selections for file in dir_files)
+            frontier = [subdir for _, subdirs in selections for subdir in subdirs]
+        return files
+
+    def gitignore_patterns(self, abs_dir: str) -> list[str]:
+        if abs_dir not in self.gitignores:
+            self.gitignores[abs_dir] = self._read_gitignore(abs_dir, self.listdir(abs_dir))
+        return self.gitignores[abs_dir]
+
+    def _read_gitignore(self, abs_dir: str, listing: list[ScanEntry]) -> list[str]:
+        if not any(entry.name == ".gitignore" and not entry.is_dir for entry in listing):
+            return []
+        gitignore_path = Path(abs_dir) / ".gitignore"
+        try:
+            return gitignore_path.read_text().splitlines()
+        except (OSError, UnicodeDecodeError) as e:
+            log(ERROR, f"Error reading file {gitignore_path}: {str(e)}")
+            return []
+
+    def stat(self, abs_path: str) -> os.stat_result:
+        entry = self.entries.get(abs_path)
+        if entry and entry.dir_entry:
+            return entry.dir_entry.stat()
+        if abs_path not in self.stats:
+            self.stats[abs_path] = os.stat(abs_path)
+        return self.stats[abs_path]
+
+    def language(self, abs_path: str) -> Optional[str]:
+        if abs_path not in self.languages:
+            self.languages[abs_path] = self.registry.detect(abs_path, lambda: _head(abs_path))
+        return self.languages[abs_path]
+
+    def try_stat(self, abs_path: str) -> Optional[os.stat_result]:
+        try:
+            return self.stat(abs_path)
+        except OSError:
+            return None
+
+    def exists(self, abs_path: str) -> bool:
+        return self.try_stat(abs_path) is not None
+
+    def is_file(self, abs_path: str) -> bool:
+        file_stat = self.try_stat(abs_path)
+        return file_stat is not None and stat.S_ISREG(file_stat.st_mode)
+
+    def mtime(self, abs_path: str) -> float:
+        return self.stat(abs_path).st_mtime
+
+    def size(self, abs_path: str) -> int:
+        return self.stat(abs_path).st_size
+
+    def is_newer(self, abs_path: str, timestamp: float) -> bool:
+        file_stat = self.try_stat(abs_path)
+        return file_stat is not None and file_stat.st_mtime > timestamp
+
+    def is_modified(self, abs_path: str, timestamp: float) -> bool:
+        known = self.changes.modified(abs_path, timestamp) if self.changes else None
+        return self.is_newer(abs_path, timestamp) if known is None else known
+
+    def invalidate(self, abs_path: str) -> None:
+        parent = os.path.dirname(abs_path)
+        stale = [parent, abs_path]
+        if abs_path in self.listings:
+            prefix = os.path.join(abs_path, "")
+            stale.extend(abs_dir for abs_dir in self.listings if abs_dir.startswith(prefix))
+        for abs_dir in stale:
+            self._forget_dir(abs_dir)
+        self.stats.pop(abs_path, None)
+        self.languages.pop(abs_path, None)
+
+    def retain(self, abs_dirs: set[str]) -> None:
+        for abs_dir in [abs_dir for abs_dir in self.listings if abs_dir not in abs_dirs]:
+            self._forget_dir(abs_dir)
+        for abs_path in [p for p in self.stats if os.path.dirname(p) not in abs_dirs]:
+            del self.stats[abs_path]
+        for abs_path in [p for p in self.languages if os.path.dirname(p) not in abs_dirs]:
+            del self.languages[abs_path]
+
+    def _forget_dir(self, abs_dir: str) -> None:
+        for entry in self.listings.pop(abs_dir, []):
+            self.entries.pop(entry.path, None)
+        self.gitignores.pop(abs_dir, None)
+
+
+def _head(abs_path: str) -> bytes:
+    try:
+        with open(abs_path, "rb") as f:
+            return f.read(SHEBANG_BYTES)
+    except OSError:
+        return b""
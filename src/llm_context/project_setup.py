@@ -7,9 +7,13 @@ from pathlib import Path
 from typing import Any
 
 from llm_context import lc_resources
+from llm_context.excerpt_cache import ExcerptCacheConfig
+from llm_context.excerpt_pool import ExcerptPoolConfig
 from llm_context.lc_resources import rules, templates
+from llm_context.project_scan import ScanConfig
 from llm_context.rule import ToolConstants
 from llm_context.state import StateStore
+from llm_context.symbol_index import SymbolIndexConfig
 from llm_context.utils import ProjectLayout, Yaml, log
 
 PROJECT_INFO: str = (
@@ -35,10 +39,17 @@ SYSTEM_RULES = [
     "lc/sty-python.md",
 ]
 
+USER_CONFIG_SECTIONS = ["scan", "excerpt-cache", "excerpt-pool", "symbol-index", "languages"]
+
 
 @dataclass(frozen=True)
 class Config:
     templates: dict[str, str]
+    scan: ScanConfig
+    excerpt_cache: ExcerptCacheConfig
+    excerpt_pool: ExcerptPoolConfig
+    symbol_index: SymbolIndexConfig
+    languages: dict[str, dict[str, str]]
     __info__: str = PROJECT_INFO
 
     @staticmethod
@@ -57,12 +68,22 @@ class Config:
                 "preview": "lc/preview.j2",
                 "prompt": "lc/prompt.j2",
             },
+            scan=ScanConfig.create_default(),
+            excerpt_cache=ExcerptCacheConfig.create_default(),
+            excerpt_pool=ExcerptPoolConfig.create_default(),
+            symbol_index=SymbolIndexConfig.create_default(),
+            languages={"extensions": {}, "filenames": {}, "interpreters": {}},
         )
 
     def to_dict(self) -> dict[str, Any]:
         return {
             "__info__": self.__info__,
             "templates": self.templates,
+            "scan": self.scan.to_dict(),
+            "excerpt-cache": self.excerpt_cache.to_dict(),
+            "excerpt-pool": self.excerpt_pool.to_dict(),
+            "symbol-index": self.symbol_index.to_dict(),
+            "languages": self.languages,
         }
 
 
@@ -144,6 +165,10 @@ class ProjectSetup:
 
     def _update_config_file(self):
         new_config = Config.create_default().to_dict()
+        old_config = Yaml.load(self.project_layout.config_path) or {}
+        for section in USER_CONFIG_SECTIONS:
+            if isinstance(old_config.get(section), dict):
+                new_config[section] = _merge_config(new_config[section], old_config[section])
         Yaml.save(self.project_layout.config_path, new_config)
 
     def _create_config_file(self):
@@ -263,3 +288,15 @@ class ProjectSetup:
                     f.write(fpath_line)
                 log(INFO, f"Added {layout.user_completions_zsh_dir} to fpath in ~/.zshrc")
         log(INFO, "Restart your shell or run: source ~/.zshrc")
+
+
+def _merge_config(defaults: dict[str, Any], values: dict[str, Any]) -> dict[str, Any]:
+    merged = dict(defaults)
+    for name, value in values.items():
+        default = defaults.get(name)
+        merged[name] = (
+            _merge_config(default, value)
+            if isinstance(default, dict) and isinstance(value, dict)
+            else value
+        )
+    return merged
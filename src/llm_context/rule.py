@@ -1,3 +1,4 @@
+import os
 from dataclasses import dataclass
 from logging import WARNING
 from pathlib import Path
@@ -6,6 +7,7 @@ from typing import Any, Optional, cast
 from packaging import version
 
 from llm_context.exceptions import RuleResolutionError
+from llm_context.excerpters.language_mapping import LANGUAGES, LanguageRegistry
 from llm_context.rule_parser import DEFAULT_CODE_RULE, RuleLoader, RuleParser
 from llm_context.utils import ProjectLayout, Yaml, log, safe_read_file
 
@@ -88,12 +90,26 @@ class Rule:
             excerpt_config,
         )
 
-    def get_excerpt_mode(self, rel_path: str) -> Optional[str]:
+    def get_excerpt_mode(
+        self,
+        rel_path: str,
+        language: Optional[str] = None,
+        registry: LanguageRegistry = LANGUAGES,
+    ) -> Optional[str]:
         import fnmatch
 
         for pattern, mode in self.excerpt_modes.items():
             if fnmatch.fnmatch(rel_path, pattern):
                 return mode
+        name = os.path.basename(rel_path)
+        if language and ("." not in name or name in registry.filenames):
+            for pattern, mode in self.excerpt_modes.items():
+                if (
+                    pattern.startswith("*.")
+                    and "/" not in pattern
+                    and registry.from_name(pattern) == language
+                ):
+                    return mode
         return None
 
     def get_excerpt_config(self, excerpter_name: str) -> dict[str, Any]:
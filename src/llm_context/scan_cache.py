@@ -0,0 +1,100 @@
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from logging import WARNING
+from pathlib import Path
+from typing import Optional
+
+from llm_context.utils import log
+
+SCAN_CACHE_VERSION = 1
+SCAN_CACHE_FILE = "scan.json"
+RACY_WINDOW_NS = 2_000_000_000
+
+CachedEntry = tuple[str, bool, bool]  # (name, is_dir, is_symlink)
+
+
+@dataclass(frozen=True)
+class ScanCache:
+    path: Path
+    root_path: str
+    dirs: dict[str, tuple[int, list[CachedEntry]]]
+    seen: set[str]
+    changed: set[str]
+
+    @staticmethod
+    def load(cache_dir: Path, root_path: str) -> "ScanCache":
+        path = cache_dir / SCAN_CACHE_FILE
+        return ScanCache(path, root_path, ScanCache._read(path), set(), set())
+
+    @staticmethod
+    def _read(path: Path) -> dict[str, tuple[int, list[CachedEntry]]]:
+        try:
+            data = json.loads(path.read_text())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            log(WARNING, f"Ignoring unreadable scan cache {path}: {e}")
+            return {}
+        if not isinstance(data, dict) or data.get("version") != SCAN_CACHE_VERSION:
+            return {}
+        return {
+            key: (mtime_ns, [(name, is_dir, is_symlink) for name, is_dir, is_symlink in entries])
+            for key, (mtime_ns, entries) in data.get("dirs", {}).items()
+        }
+
+    def key(self, abs_dir: str) -> str:
+        return "." if abs_dir == self.root_path else os.path.relpath(abs_dir, self.root_path)
+
+    def get(self, abs_dir: str, mtime_ns: int) -> Optional[list[CachedEntry]]:
+        key = self.key(abs_dir)
+        cached = self.dirs.get(key)
+        if cached is None or cached[0] != mtime_ns:
+            return None
+        self.seen.add(key)
+        return cached[1]
+
+    def put(self, abs_dir: str, mtime_ns: int, entries: list[CachedEntry]) -> None:
+        key = self.key(abs_dir)
+        self.seen.add(key)
+        if time.time_ns() - mtime_ns < RACY_WINDOW_NS:
+            self.dirs.pop(key, None)
+            return
+        self.dirs[key] = (mtime_ns, entries)
+        self.changed.add(key)
+
+    def save(self) -> None:
+        if not self.changed:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            marker = self.path.parent / ".gitignore"
+            if not marker.exists():
+                marker.write_text("*\n")
+            self._drop_removed_dirs()
+            data = {"version": SCAN_CACHE_VERSION, "dirs": self.dirs}
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+            self.changed.clear()
+        except OSError as e:
+            log(WARNING, f"Could not write scan cache {self.path}: {e}")
+
+    def _drop_removed_dirs(self) -> None:
+        subdirs = {
+            key: {name for name, is_dir, _ in self.dirs[key][1] if is_dir}
+            for key in self.seen
+            if key in self.dirs
+        }
+        removed = [
+            key
+            for key in self.dirs
+            if key not in self.seen
+            and (parent := os.path.dirname(key) or ".") in subdirs
+            and os.path.basename(key) not in subdirs[parent]
+        ]
+        for key in removed:
+            del self.dirs[key]
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from logging import WARNING
+from pathlib import Path
+from typing import Any, Optional
+
+from llm_context.exceptions import ParseLimitExceeded
+from llm_context.excerpters.parser import Source, decode_range
+from llm_context.utils import log, package_version
+
+SYMBOL_INDEX_VERSION = 1
+SYMBOL_INDEX_FILE = "symbols.json"
+
+ByteRange = tuple[int, int]
+
+
+@dataclass(frozen=True)
+class SymbolIndexConfig:
+    enabled: bool
+
+    @staticmethod
+    def create_default() -> "SymbolIndexConfig":
+        return SymbolIndexConfig(False)
+
+    @staticmethod
+    def from_config(config: dict[str, Any]) -> "SymbolIndexConfig":
+        return SymbolIndexConfig(bool(config.get("enabled", False)))
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"enabled": self.enabled}
+
+
+@dataclass(frozen=True)
+class SymbolIndex:
+    path: Optional[Path]
+    version: str
+    paths: dict[str, str]
+    files: dict[str, dict[str, list[ByteRange]]]
+    parsed: list[str]
+    saved: dict[str, str]
+
+    @staticmethod
+    def create(path: Optional[Path] = None) -> "SymbolIndex":
+        return SymbolIndex(path, package_version(), {}, {}, [], {})
+
+    @staticmethod
+    def load(cache_dir: Path) -> "SymbolIndex":
+        path = cache_dir / SYMBOL_INDEX_FILE
+        version = package_version()
+        paths, files = SymbolIndex._read(path, version)
+        return SymbolIndex(path, version, paths, files, [], dict(paths))
+
+    @staticmethod
+    def from_config(config: SymbolIndexConfig, cache_dir: Path) -> "SymbolIndex":
+        return SymbolIndex.load(cache_dir) if config.enabled else SymbolIndex.create()
+
+    @staticmethod
+    def _read(
+        path: Path, version: str
+    ) -> tuple[dict[str, str], dict[str, dict[str, list[ByteRange]]]]:
+        try:
+            data = json.loads(path.read_text())
+        except FileNotFoundError:
+            return {}, {}
+        except (OSError, ValueError) as e:
+            log(WARNING, f"Ignoring unreadable symbol index {path}: {e}")
+            return {}, {}
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != SYMBOL_INDEX_VERSION
+            or data.get("package") != version
+        ):
+            return {}, {}
+        files = {
+            digest: {
+                name: [(start, end) for start, end in ranges] for name, ranges in names.items()
+            }
+            for digest, names in data.get("files", {}).items()
+        }
+        return dict(data.get("paths", {})), files
+
+    def find(self, tagger: Any, source: Source, name: str) -> list[str]:
+        code = source.code
+        language = source.language or ""
+        digest = hashlib.sha256(language.encode("utf-8") + b"\0" + code).hexdigest()
+        if digest not in self.files:
+            try:
+                self.files[digest] = self._index(tagger, source)
+            except ParseLimitExceeded as e:
+                log(WARNING, f"Skipping definition lookup: {e.message}")
+                return []
+            self.parsed.append(source.rel_path)
+        self.paths[source.rel_path] = digest
+        return [decode_range(code, start, end) for start, end in self.files[digest].get(name, [])]
+
+    def save(self) -> None:
+        if self.path is None or self.paths == self.saved:
+            return
+        live = set(self.paths.values())
+        for digest in [digest for digest in self.files if digest not in live]:
+            del self.files[digest]
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            marker = self.path.parent / ".gitignore"
+            if not marker.exists():
+                marker.write_text("*\n")
+            data = {
+                "version": SYMBOL_INDEX_VERSION,
+                "package": self.version,
+                "paths": self.paths,
+                "files": self.files,
+            }
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+            self.saved.clear()
+            self.saved.update(self.paths)
+        except OSError as e:
+            log(WARNING, f"Could not write symbol index {self.path}: {e}")
+
+    def _index(self, tagger: Any, source: Source) -> dict[str, list[ByteRange]]:
+        names: dict[str, list[ByteRange]] = {}
+        for definition in tagger.extract_definitions(source):
+            if definition.name:
+                names.setdefault(definition.name.text, []).append(
+                    (definition.start, definition.finish)
+                )
+        return names
@@ -1,6 +1,8 @@
 import sys
 from dataclasses import dataclass
 from datetime import datetime as dt
+from importlib.metadata import PackageNotFoundError
+from importlib.metadata import version as pkg_ver
 from logging import CRITICAL, DEBUG, ERROR, INFO, WARNING, getLogger
 from pathlib import Path
 from typing import Any, Optional, Union, cast
@@ -79,6 +81,10 @@ class ProjectLayout:
     def state_store_path(self) -> Path:
         return self.project_config_path / "curr_ctx.yaml"
 
+    @property
+    def cache_path(self) -> Path:
+        return self.project_config_path / "cache"
+
     @property
     def templates_path(self) -> Path:
         return self.project_config_path / "templates"
@@ -208,5 +214,8 @@ def log(level: int, msg: str) -> None:
         logger.critical(msg)
 
 
-def is_newer(abs_path: str, timestamp: float) -> bool:
-    return Path(abs_path).exists() and Path(abs_path).stat().st_mtime > timestamp
+def package_version() -> str:
+    try:
+        return pkg_ver("llm-context")
+    except PackageNotFoundError:
+        return "unknown"
@@ -0,0 +1,311 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass, replace
+from logging import INFO, WARNING
+from typing import Any, Callable, Optional, Union
+
+from llm_context.change_log import ChangeLog
+from llm_context.file_selector import GitIgnorer
+from llm_context.git_index import GitIndex
+from llm_context.project_scan import (
+    DEFAULT_POLL_INTERVAL,
+    GIT_INDEX_BACKEND,
+    ProjectScan,
+    ScanConfig,
+)
+from llm_context.rule import IGNORE_NOTHING
+from llm_context.utils import log
+
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_IN_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_ONLYDIR
+)
+_EVENT = struct.Struct("iIII")
+
+
+def _load_libc() -> Optional[Any]:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+def _relative_dir(root_path: str, abs_dir: str) -> str:
+    return f"/{os.path.relpath(abs_dir, root_path)}/"
+
+
+@dataclass(frozen=True)
+class InotifyBackend:
+    root_path: str
+    changes: ChangeLog
+    libc: Any
+    fd: int
+    wake_fds: tuple[int, int]
+    ignorer: GitIgnorer
+    paths: dict[int, str]
+    lock: threading.Lock
+    stopped: threading.Event
+
+    @staticmethod
+    def available() -> bool:
+        libc = _load_libc()
+        fd = libc.inotify_init1(os.O_CLOEXEC) if libc else -1
+        if fd >= 0:
+            os.close(fd)
+        return fd >= 0
+
+    @staticmethod
+    def start(root_path: str, changes: ChangeLog) -> Optional["InotifyBackend"]:
+        libc = _load_libc()
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC) if libc else -1
+        if fd < 0:
+            return None
+        ignorer = GitIgnorer.create(IGNORE_NOTHING)
+        backend = InotifyBackend(
+            root_path,
+            changes,
+            libc,
+            fd,
+            os.pipe(),
+            ignorer,
+            {},
+            threading.Lock(),
+            threading.Event(),
+        )
+        with backend.lock:
+            backend._watch_tree(root_path)
+        threading.Thread(target=backend._run, name="lc-inotify", daemon=True).start()
+        return backend
+
+    def drain(self) -> None:
+        with self.lock:
+            while True:
+                try:
+                    data = os.read(self.fd, 64 * 1024)
+                except (BlockingIOError, OSError):
+                    return
+                self._handle(data)
+
+    def stop(self) -> None:
+        with self.lock:
+            if self.stopped.is_set():
+                return
+            self.stopped.set()
+        os.write(self.wake_fds[1], b"x")
+
+    def _run(self) -> None:
+        wake = self.wake_fds[0]
+        while True:
+            ready, _, _ = select.select([self.fd, wake], [], [])
+            if wake in ready:
+                break
+            self.drain()
+        with self.lock:
+            os.close(self.fd)
+        for wake_fd in self.wake_fds:
+            os.close(wake_fd)
+
+    def _handle(self, data: bytes) -> None:
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size : offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+            if mask & _IN_Q_OVERFLOW:
+                log(WARNING, "Filesystem watcher queue overflowed, invalidating all listings")
+                self.changes.reset(self.root_path)
+                continue
+            abs_dir = self.paths.get(wd)
+            if abs_dir is None:
+                continue
+            if mask & _IN_IGNORED:
+                self._forget(wd)
+                continue
+            abs_path = os.path.join(abs_dir, os.fsdecode(name)) if name else abs_dir
+            self.changes.record(abs_path)
+            if mask & _IN_ISDIR and mask & _IN_MOVED_FROM:
+                self._unwatch_tree(abs_path)
+            if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                self._watch_tree(abs_path)
+
+    def _watch_tree(self, abs_dir: str) -> None:
+        if abs_dir != self.root_path and self.ignorer.ignore(
+            _relative_dir(self.root_path, abs_dir)
+        ):
+            return
+        try:
+            abs_dirs = self.ignorer.discover(ProjectScan.create(self.root_path), abs_dir)
+        except OSError:
+            return
+        for watched_dir in abs_dirs:
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(watched_dir), _IN_WATCH_MASK)
+            if wd < 0:
+                log(WARNING, f"Cannot watch {watched_dir}: {os.strerror(ctypes.get_errno())}")
+                continue
+            self.paths[wd] = watched_dir
+            self.changes.watch(watched_dir)
+            if watched_dir != self.root_path:
+                self.changes.record(watched_dir)
+
+    def _unwatch_tree(self, abs_dir: str) -> None:
+        prefix = os.path.join(abs_dir, "")
+        for wd, path in list(self.paths.items()):
+            if path == abs_dir or path.startswith(prefix):
+                self.libc.inotify_rm_watch(self.fd, wd)
+                self._forget(wd)
+
+    def _forget(self, wd: int) -> None:
+        abs_dir = self.paths.pop(wd, None)
+        if abs_dir is not None:
+            self.changes.unwatch(abs_dir)
+
+
+@dataclass(frozen=True)
+class PollingBackend:
+    root_path: str
+    changes: ChangeLog
+    interval: float
+    files: dict[str, tuple[int, int]]
+    dirs: set[str]
+    stopped: threading.Event
+
+    @staticmethod
+    def start(
+        root_path: str, changes: ChangeLog, interval: float = DEFAULT_POLL_INTERVAL
+    ) -> "PollingBackend":
+        backend = PollingBackend(root_path, changes, interval, {}, set(), threading.Event())
+        backend.poll()
+        threading.Thread(target=backend._run, name="lc-poll", daemon=True).start()
+        return backend
+
+    def drain(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        self.stopped.set()
+
+    def _run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            try:
+                self.poll()
+            except OSError as e:
+                log(WARNING, f"Polling watcher failed: {e}")
+
+    def poll(self) -> None:
+        scan = ProjectScan.create(self.root_path)
+        abs_dirs = set(GitIgnorer.create(IGNORE_NOTHING).discover(scan, self.root_path))
+        files = {
+            entry.path: signature
+            for abs_dir in abs_dirs
+            for entry in scan.listdir(abs_dir)
+            if not entry.is_dir and (signature := _signature(entry.dir_entry)) is not None
+        }
+        initial = not self.dirs
+        for abs_dir in abs_dirs - self.dirs:
+            self.changes.watch(abs_dir)
+            if not initial:
+                self.changes.record(abs_dir)
+        for abs_dir in self.dirs - abs_dirs:
+            self.changes.unwatch(abs_dir)
+        if not initial:
+            now = time.time()
+            for abs_path in files.keys() | self.files.keys():
+                signature = files.get(abs_path)
+                if signature != self.files.get(abs_path):
+                    self.changes.record(abs_path, signature[0] / 1e9 if signature else now)
+        self.dirs.clear()
+        self.dirs.update(abs_dirs)
+        self.files.clear()
+        self.files.update(files)
+
+
+def _signature(dir_entry: Optional[os.DirEntry]) -> Optional[tuple[int, int]]:
+    try:
+        stat = dir_entry.stat() if dir_entry else None
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size) if stat else None
+
+
+WatchBackend = Union[InotifyBackend, PollingBackend]
+
+
+@dataclass(frozen=True)
+class ProjectWatcher:
+    scan: ProjectScan
+    backend: WatchBackend
+    session: threading.RLock
+    listeners: list[Callable[[set[str]], None]]
+    index_state: dict[str, Any]
+
+    @staticmethod
+    def start(root_path: str, config: ScanConfig) -> "ProjectWatcher":
+        changes = ChangeLog.create()
+        backend: WatchBackend
+        inotify = InotifyBackend.start(root_path, changes)
+        if inotify is None:
+            log(INFO, f"inotify unavailable, polling {root_path} every {config.poll_interval}s")
+            backend = PollingBackend.start(root_path, changes, config.poll_interval)
+        else:
+            backend = inotify
+        scan = ProjectScan.create(root_path, config, changes)
+        return ProjectWatcher(scan, backend, threading.RLock(), [], {})
+
+    def add_listener(self, listener: Callable[[set[str]], None]) -> None:
+        self.listeners.append(listener)
+
+    def snapshot(self) -> ProjectScan:
+        self.backend.drain()
+        assert self.scan.changes is not None
+        changed, watched = self.scan.changes.take_pending()
+        for abs_path in changed:
+            self.scan.invalidate(abs_path)
+        self.scan.retain(watched)
+        if changed:
+            for listener in self.listeners:
+                listener(changed)
+        return self._with_current_index()
+
+    def stop(self) -> None:
+        self.backend.stop()
+
+    def _with_current_index(self) -> ProjectScan:
+        if self.scan.config.backend != GIT_INDEX_BACKEND:
+            return self.scan
+        index_path = GitIndex.index_path(self.scan.root_path)
+        index_mtime = os.stat(index_path).st_mtime_ns if index_path else None
+        if "scan" not in self.index_state or self.index_state["mtime"] != index_mtime:
+            git_index = GitIndex.load(self.scan.root_path)
+            self.index_state.update(mtime=index_mtime, scan=replace(self.scan, git_index=git_index))
+        return self.index_state["scan"]
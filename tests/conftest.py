@@ -0,0 +1,35 @@
+import os
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture
+def temp_project():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(tmp_dir)
+        (root / "src" / "pkg").mkdir(parents=True)
+        (root / "docs").mkdir()
+        (root / "build").mkdir()
+        (root / ".gitignore").write_text("build/\n*.log\n")
+        (root / "src" / "main.py").write_text("print('main')\n")
+        (root / "src" / "pkg" / "util.py").write_text("def util(): pass\n")
+        (root / "docs" / "guide.md").write_text("# Guide\n")
+        (root / "build" / "out.js").write_text("out\n")
+        (root / "debug.log").write_text("log\n")
+        yield root
+
+
+@pytest.fixture
+def scandir_calls(monkeypatch):
+    calls: Counter = Counter()
+    original = os.scandir
+
+    def counting_scandir(path):
+        calls[str(path)] += 1
+        return original(path)
+
+    monkeypatch.setattr(os, "scandir", counting_scandir)
+    return calls
@@ -0,0 +1,85 @@
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from llm_context.content_store import ContentStore
+from llm_context.context_generator import ContextCollector
+from llm_context.excerpters.parser import ASTFactory
+from llm_context.excerpters.tagger import ASTBasedTagger
+from llm_context.rule import Rule
+
+
+@pytest.fixture
+def temp_project():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(tmp_dir)
+        (root / "src").mkdir()
+        (root / "src" / "main.py").write_text("class Main:\n    def run(self):\n        pass\n")
+        (root / "src" / "util.py").write_text("def helper():\n    return 1\n")
+        (root / "README.md").write_text("# Title\n\nSome text\n")
+        yield root
+
+
+def test_reads_each_path_once_and_keeps_bytes_and_text(temp_project):
+    store = ContentStore.create()
+    path = str(temp_project / "src" / "util.py")
+    assert store.text(path) == "def helper():\n    return 1\n"
+    assert store.data(path) == b"def helper():\n    return 1\n"
+    assert store.text(path) == store.text(path)
+    assert store.reads[path] == 1
+    assert store.lookups[path] == 4
+    assert store.bytes_read == len(b"def helper():\n    return 1\n")
+
+
+def test_text_matches_read_text_newline_handling(temp_project):
+    path = temp_project / "crlf.txt"
+    path.write_bytes(b"a\r\nb\rc\n")
+    store = ContentStore.create()
+    assert store.text(str(path)) == path.read_text()
+    assert store.data(str(path)) == b"a\r\nb\rc\n"
+
+
+def test_unreadable_paths_are_remembered(temp_project):
+    store = ContentStore.create()
+    missing = str(temp_project / "missing.py")
+    folder = str(temp_project / "src")
+    assert store.text(missing) is None
+    assert store.text(missing) is None
+    assert store.text(folder) is None
+    assert store.reads[missing] == 1
+    assert store.reads[folder] == 1
+
+
+def test_collector_methods_share_one_read_per_file(temp_project):
+    tagger = ASTBasedTagger.create(str(temp_project), ASTFactory.create())
+    rule = Rule.from_config({"name": "test", "excerpt-modes": {"*.py": "code-outliner"}})
+    collector = ContextCollector.create(temp_project)
+    name = temp_project.name
+    rel_paths = [f"/{name}/src/main.py", f"/{name}/src/util.py"]
+    collector.excerpts(tagger, rel_paths, rule)
+    collector.excerpt_stats(tagger, rel_paths, rule)
+    collector.definitions(tagger, [(f"/{name}/src/util.py", "helper")])
+    collector.files(rel_paths + [f"/{name}/README.md"])
+    assert set(collector.store.reads.values()) == {1}
+    assert len(collector.store.reads) == 3
+
+
+def test_bulk_read_keeps_order_and_reports_errors_in_order(temp_project, caplog):
+    paths = [str(temp_project / f"f{i}.txt") for i in range(40)]
+    for i, path in enumerate(paths):
+        if i % 7:
+            Path(path).write_text(f"file {i}\n")
+    store = ContentStore.create(workers=8)
+    with caplog.at_level("ERROR", logger="llm-context"):
+        texts = store.texts(paths + paths[:3])
+    assert texts == [f"file {i}\n" if i % 7 else None for i in list(range(40)) + list(range(3))]
+    assert set(store.reads.values()) == {1}
+    missing = [path for i, path in enumerate(paths) if not i % 7]
+    assert [r.getMessage() for r in caplog.records] == [f"File not found: {p}" for p in missing]
+
+
+def test_bulk_read_matches_serial_read(temp_project):
+    paths = [str(p) for p in sorted(temp_project.rglob("*"))]
+    serial = ContentStore.create(workers=1).get_all(paths)
+    assert ContentStore.create(workers=4).get_all(paths) == serial
@@ -0,0 +1,114 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from llm_context.excerpt_cache import ExcerptCache, ExcerptCacheConfig
+from llm_context.excerpters.parser import ASTFactory, Source
+from llm_context.excerpters.service import ExcerpterRegistry
+from llm_context.excerpters.tagger import ASTBasedTagger
+from llm_context.rule import Rule
+
+CODE = "def foo():\n    return 1\n\nclass Bar:\n    def baz(self):\n        pass\n"
+MARKDOWN = "# Title\n\nSome para.\n\n## Sub\n\n- item\n"
+
+
+@pytest.fixture
+def cache_dir():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        yield Path(tmp_dir)
+
+
+@pytest.fixture
+def tagger():
+    return ASTBasedTagger.create("/fake/workspace/path", ASTFactory.create())
+
+
+def rule(config=None) -> Rule:
+    return Rule.from_config(
+        {
+            "name": "test",
+            "excerpt-modes": {"*.py": "code-outliner", "*.md": "markdown"},
+            "excerpt-config": config or {},
+        }
+    )
+
+
+def excerpt(cache, tagger, sources, rule_=None):
+    return ExcerpterRegistry.create(cache).excerpt(sources, rule_ or rule(), tagger)
+
+
+def contents(results):
+    return [(e.rel_path, e.content, e.metadata) for result in results for e in result.excerpts]
+
+
+def test_cached_output_matches_uncached(cache_dir, tagger):
+    sources = [Source("a.py", CODE), Source("guide.md", MARKDOWN)]
+    uncached = excerpt(None, tagger, sources)
+    cache = ExcerptCache.create(cache_dir)
+    first = excerpt(cache, tagger, sources)
+    assert cache.hits == [] and len(cache.writes) == 2
+    second_cache = ExcerptCache.create(cache_dir)
+    second = excerpt(second_cache, tagger, sources)
+    assert len(second_cache.hits) == 2 and second_cache.writes == []
+    assert contents(first) == contents(second) == contents(uncached)
+    samples = second[0].metadata["sample_definitions"]
+    assert len(samples) == 2 and all(path == "a.py" for path, _ in samples)
+
+
+def test_entries_keep_every_definition_for_sampling(cache_dir, tagger):
+    code = "".join(f"def f{i}():\n    pass\n\n" for i in range(5))
+    cache = ExcerptCache.create(cache_dir)
+    excerpt(cache, tagger, [Source("a.py", code)])
+    entry = json.loads((cache.path / f"{cache.writes[0]}.json").read_text())
+    assert entry["definitions"] == [f"f{i}" for i in range(5)]
+    sampled = set()
+    for _ in range(50):
+        result = excerpt(ExcerptCache.create(cache_dir), tagger, [Source("a.py", code)])
+        sampled.update(name for _, name in result[0].metadata["sample_definitions"])
+    assert len(sampled) > 2
+
+
+def test_key_is_content_addressed(cache_dir, tagger):
+    excerpt(ExcerptCache.create(cache_dir), tagger, [Source("a.py", CODE)])
+    cache = ExcerptCache.create(cache_dir)
+    result = excerpt(cache, tagger, [Source("other/b.py", CODE)])
+    assert len(cache.hits) == 1
+    assert [e.rel_path for e in result[0].excerpts] == ["other/b.py"]
+
+
+def test_config_and_version_change_the_key(cache_dir, tagger):
+    sources = [Source("guide.md", MARKDOWN)]
+    excerpt(ExcerptCache.create(cache_dir, version="1"), tagger, sources)
+    other_config = ExcerptCache.create(cache_dir, version="1")
+    excerpt(other_config, tagger, sources, rule({"markdown": {"with-lists": False}}))
+    assert other_config.hits == []
+    other_version = ExcerptCache.create(cache_dir, version="2")
+    excerpt(other_version, tagger, sources)
+    assert other_version.hits == []
+
+
+def test_eviction_drops_least_recently_used(cache_dir, tagger):
+    cache = ExcerptCache.create(cache_dir)
+    sources = [Source(f"m{i}.py", f"def f{i}():\n    pass\n") for i in range(3)]
+    excerpt(cache, tagger, sources)
+    paths = [cache.path / f"{key}.json" for key in cache.writes]
+    for age, path in enumerate(paths):
+        os.utime(path, (1_000_000 + age, 1_000_000 + age))
+    excerpt(ExcerptCache.create(cache_dir), tagger, sources[:1])
+    bounded = ExcerptCache.create(cache_dir, max_size=sum(p.stat().st_size for p in paths))
+    excerpt(bounded, tagger, [Source("new.py", "def g():\n    pass\n")])
+    assert [path.exists() for path in paths] == [True, False, True]
+
+
+def test_config_round_trip():
+    assert not ExcerptCacheConfig.create_default().enabled
+    config = ExcerptCacheConfig.from_config(
+        {"enabled": True, "max-size": 1024, "path": "~/.cache/lc"}
+    )
+    assert ExcerptCacheConfig.from_config(config.to_dict()) == config
+    assert (
+        ExcerptCache.from_config(ExcerptCacheConfig(False, 0, None), Path("/p"), Path("/c")) is None
+    )
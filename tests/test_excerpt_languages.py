@@ -1,8 +1,10 @@
 import pytest
 
+from llm_context.excerpters.language_mapping import LangQuery
 from llm_context.excerpters.markdown import Markdown
-from llm_context.excerpters.parser import Source
+from llm_context.excerpters.parser import ASTFactory, Source
 from llm_context.excerpters.sfc import Sfc
+from llm_context.excerpters.tagger import ASTBasedTagger
 
 # Test cases: (test_name, extension, code, config, expected_output)
 TEST_CASES = [
@@ -790,3 +792,30 @@ def test_markdown_metadata():
     metadata = result.excerpts[0].metadata
     assert metadata["processor_type"] == "markdown"
     assert "included_elements" in metadata
+
+
+def test_markdown_excluded_returns_unincluded_paragraphs():
+    """Test that excluded paragraphs are collected for markdown files."""
+    source = Source("test.md", "# Title\n\nFirst paragraph.\n\n## Next\n\nSecond paragraph.\n")
+    excluded = Markdown({}).excluded([source])
+    assert len(excluded) == 1
+    assert excluded[0].sections["omitted_content"] == "First paragraph.\n\n\nSecond paragraph.\n"
+    assert excluded[0].metadata == {"file": "test.md"}
+
+
+def test_excerpters_share_the_tagger_ast_factory(monkeypatch):
+    """Test that many files cost one language load and one query read per excerpter."""
+    query_reads = []
+    get_query = LangQuery.get_query
+    monkeypatch.setattr(
+        LangQuery, "get_query", lambda self, name: query_reads.append(name) or get_query(self, name)
+    )
+    ast_factory = ASTFactory.create()
+    tagger = ASTBasedTagger.create("", ast_factory)
+    markdown = [Source(f"doc{i}.md", f"# Doc {i}\n\nText {i}.\n") for i in range(50)]
+    components = [Source(f"C{i}.svelte", f"<script>let n = {i};</script>") for i in range(50)]
+    Markdown({"tagger": tagger}).excerpt(markdown)
+    Markdown({"tagger": tagger}).excluded(markdown)
+    Sfc({"tagger": tagger}).excerpt(components)
+    assert sorted(ast_factory.parser_factory.parser_cache) == ["markdown", "svelte"]
+    assert query_reads == ["markdown.scm", "svelte-injections.scm"]
@@ -0,0 +1,47 @@
+from llm_context import excerpt_pool
+from llm_context.excerpt_pool import ExcerptPool, ExcerptPoolConfig
+from llm_context.excerpters.parser import ASTFactory, Source
+from llm_context.excerpters.service import ExcerpterRegistry
+from llm_context.excerpters.tagger import ASTBasedTagger
+from llm_context.rule import Rule
+
+RULE = Rule.from_config(
+    {"name": "test", "excerpt-modes": {"*.py": "code-outliner", "*.md": "markdown"}}
+)
+
+
+def sources() -> list[Source]:
+    code = [
+        Source(f"pkg{i}/mod.py", f"def f{i}():\n    pass\n\nclass C{i}:\n    pass\n")
+        for i in range(9)
+    ]
+    docs = [Source(f"doc{i}.md", f"# Doc {i}\n\nText.\n\n- item {i}\n") for i in range(5)]
+    return code + docs
+
+
+def contents(results):
+    return [[(e.rel_path, e.content, e.metadata) for e in result.excerpts] for result in results]
+
+
+def test_config_engages_above_threshold():
+    config = ExcerptPoolConfig.from_config({"enabled": True, "workers": 4, "threshold": 10})
+    assert ExcerptPoolConfig.from_config(config.to_dict()) == config
+    assert not config.engages(9) and config.engages(10)
+    assert not ExcerptPoolConfig(True, 1, 1).engages(1000)
+    assert not ExcerptPoolConfig.create_default().engages(100_000)
+
+
+def test_parallel_excerpts_match_serial_in_order():
+    tagger = ASTBasedTagger.create("", ASTFactory.create())
+    serial = ExcerpterRegistry.create().excerpt(sources(), RULE, tagger)
+    pool = ExcerptPool.create(ExcerptPoolConfig(True, 2, 3), "")
+    registry = ExcerpterRegistry.create(pool=pool)
+    parallel = registry.excerpt(sources(), RULE, tagger)
+    assert contents(parallel) == contents(serial)
+    assert contents(registry.excerpt(sources(), RULE, tagger)) == contents(serial)
+    assert len(excerpt_pool._executors) == 1
+    excerpt_pool.shutdown()
+    assert not excerpt_pool._executors
+    samples = parallel[0].metadata["sample_definitions"]
+    assert len(samples) == 2
+    assert all(name in (f"f{path[3]}", f"C{path[3]}") for path, name in samples)
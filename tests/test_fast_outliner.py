@@ -0,0 +1,64 @@
+import pytest
+from test_outline_languages import TEST_CASES
+
+from llm_context.excerpters.code_outliner import CodeOutliner
+from llm_context.excerpters.fast_outliner import SIGNATURES, FastOutliner, find_signatures
+from llm_context.excerpters.parser import ASTFactory, Source
+from llm_context.excerpters.service import ExcerpterRegistry
+from llm_context.excerpters.tagger import ASTBasedTagger
+from llm_context.rule import Rule
+
+CODE = "import os\n\nclass Bar:\n    def baz(self):\n        pass\n\nasync def qux():\n    pass\n"
+
+
+@pytest.fixture
+def tagger():
+    return ASTBasedTagger.create("/fake/workspace/path", ASTFactory.create())
+
+
+def test_fast_outline_matches_code_outliner_format(tagger):
+    source = Source("a.py", CODE)
+    (fast,) = FastOutliner({}).excerpt([source]).excerpts
+    (full,) = CodeOutliner({"tagger": tagger}).excerpt([source]).excerpts
+    assert fast.content == full.content
+    assert fast.content == "⋮...\n█class Bar:\n█    def baz(self):\n⋮...\n█async def qux():\n⋮..."
+    assert fast.metadata == {"processor_type": "fast-outliner"}
+
+
+def test_signature_lines_and_names():
+    assert find_signatures(SIGNATURES["python"], CODE.encode()) == [
+        (2, "Bar"),
+        (3, "baz"),
+        (6, "qux"),
+    ]
+
+
+def test_unsupported_files_are_skipped():
+    result = FastOutliner({}).excerpt([Source("notes.txt", "def nope():\n")])
+    assert result.excerpts == [] and result.metadata["sample_definitions"] == []
+
+
+def test_registry_dispatches_fast_outliner(tagger):
+    rule = Rule.from_config({"name": "test", "excerpt-modes": {"*.py": "fast-outliner"}})
+    (excerpts,) = ExcerpterRegistry.create().excerpt([Source("a.py", CODE)], rule, tagger)
+    assert excerpts.excerpts[0].metadata["processor_type"] == "fast-outliner"
+    assert len(excerpts.metadata["sample_definitions"]) == 2
+
+
+def test_recall_against_tree_sitter_on_fixtures(tagger):
+    found, expected = 0, 0
+    for language, extension, code, _ in TEST_CASES:
+        source = Source(f"test_file.{extension}", code)
+        reference = {
+            d.name.begin_ln if d.name else d.begin_ln for d in tagger.extract_definitions(source)
+        }
+        lines = {line for line, _ in find_signatures(SIGNATURES[language], source.code)}
+        found += len(reference & lines)
+        expected += len(reference)
+    assert found / expected >= 0.9
+
+
+def test_consecutive_c_functions_are_all_found():
+    code = b"static int a(int x)\n{\n  if (x) {\n  }\n}\n\nint b(void)\n{ return 0; }\n"
+    assert find_signatures(SIGNATURES["c"], code) == [(0, "a"), (6, "b")]
+    assert find_signatures(SIGNATURES["cpp"], code) == [(0, "a"), (6, "b")]
@@ -0,0 +1,138 @@
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from llm_context.file_selector import FileSelector
+from llm_context.git_index import GitIndex
+from llm_context.project_scan import ProjectScan, ScanConfig
+from llm_context.rule import INCLUDE_ALL
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+
+def git(root: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=root, check=True, capture_output=True, text=True
+    ).stdout
+
+
+@pytest.fixture
+def git_project():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(tmp_dir)
+        (root / "src" / "pkg").mkdir(parents=True)
+        (root / "docs").mkdir()
+        (root / ".gitignore").write_text("*.log\nbuild/\n")
+        (root / "src" / "main.py").write_text("print('main')\n")
+        (root / "src" / "pkg" / "util.py").write_text("def util(): pass\n")
+        (root / "src" / "pkg" / "a-very-long-module-name-shares-a-prefix.py").write_text("\n")
+        (root / "docs" / "guide.md").write_text("# Guide\n")
+        git(root, "init", "-q")
+        git(root, "add", ".")
+        (root / "src" / "new.py").write_text("print('new')\n")
+        (root / "debug.log").write_text("log\n")
+        yield root
+
+
+def select(root: Path, ignore=[".git"], limit=INCLUDE_ALL, also=[], **scan) -> list[str]:
+    config = ScanConfig.from_config(scan)
+    selector = FileSelector.create(root, ignore, limit, also, scan=ProjectScan.create(root, config))
+    return selector.get_relative_files()
+
+
+@pytest.mark.parametrize("version", ["2", "3", "4"])
+def test_parse_matches_git_ls_files(git_project, version):
+    git(git_project, "update-index", "--index-version", version)
+    index = GitIndex.load(git_project)
+    assert index is not None
+    assert index.version in (2, int(version))
+    assert index.file_paths == git(git_project, "ls-files").splitlines()
+    assert all(entry.is_file for entry in index.entries)
+
+
+def test_index_backend_matches_filesystem_walk(git_project):
+    walked = select(git_project)
+    assert select(git_project, backend="git-index", untracked=True) == walked
+    assert f"/{git_project.name}/src/new.py" in walked
+    assert f"/{git_project.name}/debug.log" not in walked
+
+
+def test_rule_patterns_apply_to_tracked_files(git_project):
+    name = git_project.name
+    files = select(
+        git_project,
+        [".git", "docs/"],
+        ["src/**"],
+        ["/docs/*.md"],
+        backend="git-index",
+        untracked=True,
+    )
+    assert files == [
+        f"/{name}/docs/guide.md",
+        f"/{name}/src/main.py",
+        f"/{name}/src/new.py",
+        f"/{name}/src/pkg/a-very-long-module-name-shares-a-prefix.py",
+        f"/{name}/src/pkg/util.py",
+    ]
+
+
+def test_untracked_files_are_skipped_by_default(git_project):
+    files = select(git_project, backend="git-index")
+    assert f"/{git_project.name}/src/new.py" not in files
+    assert f"/{git_project.name}/src/main.py" in files
+
+
+def test_deleted_tracked_files_are_not_selected(git_project):
+    (git_project / "src" / "main.py").unlink()
+    files = select(git_project, backend="git-index", untracked=False)
+    assert f"/{git_project.name}/src/main.py" not in files
+
+
+def test_falls_back_to_walk_without_index():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(tmp_dir)
+        (root / ".gitignore").write_text("")
+        (root / "main.py").write_text("pass\n")
+        scan = ProjectScan.create(root, ScanConfig.from_config({"backend": "git-index"}))
+        assert scan.git_index is None
+        assert select(root, backend="git-index") == select(root)
+
+
+def test_unreadable_gitdir_file_falls_back_to_walk():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(tmp_dir)
+        (root / ".git").write_bytes(b"gitdir: \xff\xfe\n")
+        assert GitIndex.load(root) is None
+
+
+def test_also_include_reaches_untracked_and_ignored_files(git_project):
+    name = git_project.name
+    also = ["/debug.log", "/src/new.py"]
+    files = select(git_project, also=also, backend="git-index")
+    assert f"/{name}/debug.log" in files
+    assert f"/{name}/src/new.py" in files
+    assert files == select(git_project, also=also)
+
+
+def test_untracked_discovery_skips_ignored_directories(git_project, monkeypatch):
+    (git_project / "build").mkdir()
+    (git_project / "build" / "out.js").write_text("out\n")
+    (git_project / "extra").mkdir()
+    (git_project / "extra" / "notes.md").write_text("notes\n")
+    scanned = []
+    monkeypatch.setattr(ProjectScan, "_scan_dir", record_scans(ProjectScan._scan_dir, scanned))
+    files = select(git_project, backend="git-index", untracked=True)
+    assert f"/{git_project.name}/extra/notes.md" in files
+    assert str(git_project / "build") not in scanned
+    assert files == select(git_project)
+
+
+def record_scans(scan_dir, scanned):
+    def recording(self, abs_dir):
+        scanned.append(abs_dir)
+        return scan_dir(self, abs_dir)
+
+    return recording
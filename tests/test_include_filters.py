@@ -67,6 +67,37 @@ class TestIncludeFilterBasics(unittest.TestCase):
         self.assertTrue(filter_with_slash.include("/src/file.py"))
 
 
+class TestIncludeFilterDirectoryPruning(unittest.TestCase):
+    """Test which directories can still contain a match"""
+
+    def test_unanchored_patterns_never_prune(self):
+        """Patterns without a directory part can match at any depth"""
+        self.assertTrue(IncludeFilter.create(["*.py"]).may_include_below("/any/dir"))
+        self.assertTrue(IncludeFilter.create(["**/*"]).may_include_below("/any/dir"))
+        self.assertTrue(IncludeFilter.create(["**/api/*.py"]).may_include_below("/any"))
+
+    def test_anchored_patterns_prune_other_directories(self):
+        """Anchored patterns only descend along their directory prefix"""
+        filter = IncludeFilter.create(["src/api/**", "/docs/*.md"])
+        self.assertTrue(filter.may_include_below("/src"))
+        self.assertTrue(filter.may_include_below("/src/api"))
+        self.assertTrue(filter.may_include_below("/src/api/v1/handlers"))
+        self.assertTrue(filter.may_include_below("/docs"))
+        self.assertFalse(filter.may_include_below("/src/web"))
+        self.assertFalse(filter.may_include_below("/docs/images"))
+        self.assertFalse(filter.may_include_below("/node_modules"))
+
+    def test_glob_components_and_negations(self):
+        """Glob components are matched per level and negations never widen"""
+        filter = IncludeFilter.create(["/*/api/*.py", "!/lib/**"])
+        self.assertTrue(filter.may_include_below("/lib/api"))
+        self.assertFalse(filter.may_include_below("/lib/web"))
+
+    def test_empty_patterns_prune_everything(self):
+        """Nothing can match below any directory without patterns"""
+        self.assertFalse(IncludeFilter.create([]).may_include_below("/src"))
+
+
 class TestFileSelectorWithIncludeFilters(unittest.TestCase):
     """Test FileSelector with real file system and include filters"""
 
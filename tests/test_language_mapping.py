@@ -0,0 +1,109 @@
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from llm_context.exceptions import LLMContextError
+from llm_context.excerpters.language_mapping import LANGUAGES, to_language
+from llm_context.excerpters.parser import ASTFactory, Source
+from llm_context.excerpters.service import ExcerpterRegistry
+from llm_context.excerpters.tagger import ASTBasedTagger
+from llm_context.project_scan import ProjectScan
+from llm_context.rule import Rule
+
+
+@pytest.mark.parametrize(
+    "path, language",
+    [
+        ("src/main.py", "python"),
+        ("types/index.d.ts", "typescript"),
+        ("types/index.d.mts", "typescript"),
+        ("src/index.mts", None),
+        ("config/.eslintrc.js", "javascript"),
+        ("docs/v1.2/README", None),
+        ("Rakefile", "ruby"),
+        ("notes.txt", None),
+        ("py", None),
+    ],
+)
+def test_to_language_from_name(path, language):
+    assert to_language(path) == language
+
+
+@pytest.mark.parametrize(
+    "head, language",
+    [
+        (b"#!/usr/bin/env python3\nprint(1)\n", "python"),
+        (b"#!/usr/bin/python3.12 -u\n", "python"),
+        (b"#! /usr/bin/env -S node --no-warnings\n", "javascript"),
+        (b"#!/bin/bash\n", None),
+        (b"print(1)\n", None),
+    ],
+)
+def test_from_shebang(head, language):
+    assert LANGUAGES.from_shebang(head) == language
+
+
+def test_config_mappings_extend_defaults():
+    registry = LANGUAGES.with_mappings(
+        {"extensions": {".test.tsx": "typescript", "h": "c"}, "filenames": {"BUILD": "python"}}
+    )
+    assert registry.from_name("ui/button.test.tsx") == "typescript"
+    assert registry.from_name("ui/button.tsx") is None
+    assert registry.from_name("include/lib.h") == "c"
+    assert registry.from_name("pkg/BUILD") == "python"
+    assert registry.from_name("main.py") == "python"
+    assert LANGUAGES.with_mappings({}) is LANGUAGES
+
+
+def test_config_mappings_reject_unknown_languages():
+    with pytest.raises(LLMContextError):
+        LANGUAGES.with_mappings({"filenames": {"Dockerfile": "dockerfile"}})
+
+
+def test_scan_resolves_each_path_once():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        script = Path(tmp_dir) / "tool"
+        script.write_text("#!/usr/bin/env python3\nprint(1)\n")
+        scan = ProjectScan.create(tmp_dir)
+        assert scan.language(str(script)) == "python"
+        script.write_text("#!/bin/sh\n")
+        assert scan.language(str(script)) == "python"
+        scan.invalidate(str(script))
+        assert scan.language(str(script)) is None
+
+
+def test_source_language_prefers_resolved_language():
+    assert Source("bin/tool", "print(1)\n").language is None
+    assert Source("bin/tool", "print(1)\n", None, "python").language == "python"
+
+
+def test_default_multi_part_extensions_use_longest_suffix():
+    assert LANGUAGES.max_suffix_parts == 2
+    assert LANGUAGES.from_name("lib/index.d.cts") == "typescript"
+    assert LANGUAGES.from_name("lib/index.cts") is None
+
+
+def test_shebang_languages_get_an_excerpt_mode():
+    rule = Rule.from_config({"name": "test", "excerpt-modes": {"*.py": "code-outliner"}})
+    assert rule.get_excerpt_mode("/p/bin/tool") is None
+    assert rule.get_excerpt_mode("/p/bin/tool", "python") == "code-outliner"
+    assert rule.get_excerpt_mode("/p/bin/tool", "ruby") is None
+    assert rule.get_excerpt_mode("/p/src/app.mjs", "javascript") is None
+    tagger = ASTBasedTagger.create("", ASTFactory.create())
+    source = Source(
+        "/p/bin/tool", "#!/usr/bin/env python3\ndef main():\n    pass\n", None, "python"
+    )
+    [excerpts] = ExcerpterRegistry.create().excerpt([source], rule, tagger)
+    assert [excerpt.rel_path for excerpt in excerpts.excerpts] == ["/p/bin/tool"]
+
+
+def test_language_fallback_respects_pattern_scope_and_project_registry():
+    rule = Rule.from_config(
+        {"name": "test", "excerpt-modes": {"/vendor/**/*.js": "code-outliner", "*.h": "sfc"}}
+    )
+    assert rule.get_excerpt_mode("/src/app.js", "javascript") is None
+    assert rule.get_excerpt_mode("/bin/tool", "javascript") is None
+    assert rule.get_excerpt_mode("/bin/tool", "c") is None
+    registry = LANGUAGES.with_mappings({"extensions": {"h": "c"}})
+    assert rule.get_excerpt_mode("/bin/tool", "c", registry) == "sfc"
@@ -0,0 +1,30 @@
+import pytest
+
+from llm_context.excerpters.line_index import LineIndex, merge_intervals
+
+TEXTS = ["", "a", "a\n", "\n\n", "a\n\nb", "a\r\nb\rc\x0cd e\n", "x\r\n", "tail\nno newline"]
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_create_matches_split_on_line_feed(text):
+    index = LineIndex.create(text)
+    assert index.lines(0, len(index)) == text.split("\n")
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_splitlines_matches_str_splitlines(text):
+    index = LineIndex.splitlines(text)
+    assert index.lines(0, len(index)) == text.splitlines()
+
+
+def test_lines_slice_like_lists():
+    index = LineIndex.create("zero\none\ntwo\nthree")
+    assert index.line(2) == "two"
+    assert index.lines(1, 3) == ["one", "two"]
+    assert index.lines(3, 10) == ["three"]
+    assert index.lines(3, 1) == []
+
+
+def test_merge_intervals_joins_overlapping_and_adjacent_ranges():
+    assert merge_intervals([(5, 6), (0, 1), (2, 3), (1, 1), (9, 9)]) == [(0, 3), (5, 6), (9, 9)]
+    assert merge_intervals([]) == []
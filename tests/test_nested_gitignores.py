@@ -103,3 +103,17 @@ temp/
         (temp_project / "build").mkdir()
         (temp_project / "build" / "output.txt").touch()
         assert ignorer.ignore("/build/output.txt")
+
+    def test_sibling_with_shared_name_prefix_is_unaffected(self, temp_project):
+        (temp_project / "src" / "utils2").mkdir()
+        (temp_project / "src" / "utils2" / "data.tmp").touch()
+        ignorer = GitIgnorer.from_git_root(str(temp_project))
+        assert ignorer.ignore("/src/utils/data.tmp")
+        assert not ignorer.ignore("/src/utils2/data.tmp")
+
+    def test_only_ancestor_gitignores_are_consulted(self, temp_project):
+        ignorer = GitIgnorer.from_git_root(str(temp_project))
+        node = ignorer.gitignore_trie
+        assert set(node.children) == {"src", "tests"}
+        assert not node.children["src"].ignorers
+        assert len(node.children["src"].children["utils"].ignorers) == 1
@@ -1,5 +1,9 @@
+import random
+from collections import Counter
+
 import pytest
 
+from llm_context.excerpters.base import ReservoirSample
 from llm_context.excerpters.code_outliner import CodeOutliner
 from llm_context.excerpters.parser import ASTFactory, Source
 from llm_context.excerpters.tagger import ASTBasedTagger
@@ -77,3 +81,34 @@ def test_code_outliner_no_definitions(tagger):
     result = excerpter.excerpt([source])
     assert isinstance(result.excerpts, list)
     assert result.metadata["sample_definitions"] == []
+
+
+def test_code_outliner_parses_each_source_once(tagger):
+    """Test that outlines and sample definitions come from one extraction per file."""
+    calls = []
+
+    class CountingTagger:
+        def extract_definitions(self, source, limits):
+            calls.append(source.rel_path)
+            return tagger.extract_definitions(source, limits)
+
+    sources = [
+        Source("file1.py", "def func1():\n    pass"),
+        Source("file2.py", "class Class2:\n    def method2(self):\n        pass"),
+    ]
+    result = CodeOutliner({"tagger": CountingTagger()}).excerpt(sources)
+    assert calls == ["file1.py", "file2.py"]
+    assert len(result.metadata["sample_definitions"]) == 2
+
+
+def test_reservoir_sample_is_uniform():
+    """Test that every offered definition is equally likely to be sampled."""
+    random.seed(0)
+    counts = Counter()
+    for _ in range(3000):
+        sample = ReservoirSample.create(2)
+        for i in range(6):
+            sample.add(("file.py", f"def{i}"))
+        counts.update(name for _, name in sample.items)
+    assert set(counts) == {f"def{i}" for i in range(6)}
+    assert all(800 < count < 1200 for count in counts.values())
@@ -0,0 +1,86 @@
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from llm_context.exceptions import ParseLimitExceeded
+from llm_context.excerpt_cache import ExcerptCache
+from llm_context.excerpters.code_outliner import CodeOutliner
+from llm_context.excerpters.markdown import Markdown
+from llm_context.excerpters.parser import ASTFactory, ParseLimits, Source
+from llm_context.excerpters.service import ExcerpterRegistry
+from llm_context.excerpters.tagger import ASTBasedTagger
+from llm_context.excerpters.tree_cache import TreeCache
+from llm_context.rule import Rule
+
+CODE = "def foo():\n    return 1\n\nclass Bar:\n    def baz(self):\n        pass\n"
+
+
+def outliner(**config):
+    tagger = ASTBasedTagger.create("/fake/workspace/path", ASTFactory.create())
+    return CodeOutliner({"tagger": tagger, **config})
+
+
+def test_limits_default_and_parse_from_excerpt_config():
+    assert ParseLimits.from_config({}) == ParseLimits.create_default()
+    limits = ParseLimits.from_config(
+        {"max-file-bytes": 10, "parse-timeout-ms": 0, "match-limit": 5}
+    )
+    assert limits == ParseLimits(10, 0, 5)
+
+
+def test_oversized_file_falls_back_to_header():
+    result = outliner(**{"max-file-bytes": 10}).excerpt([Source("a.py", CODE)])
+    (excerpt,) = result.excerpts
+    assert excerpt.content == "def foo():\n    return 1\n\nclass Bar:\n    def baz(self):\n⋮..."
+    assert excerpt.metadata == {"processor_type": "code-outliner", "parse_limit": "max-file-bytes"}
+    assert result.metadata["sample_definitions"] == []
+
+
+def test_match_limit_falls_back_to_header():
+    source = Source("a.js", "class A { m() {} }\nfunction f() {}\nconst x = () => 1;\n")
+    (excerpt,) = outliner(**{"match-limit": 1}).excerpt([source]).excerpts
+    assert excerpt.metadata["parse_limit"] == "match-limit"
+
+
+def test_parse_timeout_falls_back_and_parser_recovers():
+    generated = "".join(f"def f{i}(x):\n    return x + {i}\n" for i in range(50000))
+    limited = outliner(**{"parse-timeout-ms": 1, "max-file-bytes": 0})
+    (excerpt,) = limited.excerpt([Source("big.py", generated)]).excerpts
+    assert excerpt.metadata["parse_limit"] == "parse-timeout-ms"
+    (excerpt,) = limited.excerpt([Source("a.py", CODE)]).excerpts
+    assert "parse_limit" not in excerpt.metadata
+
+
+def test_timed_out_parse_is_not_retained_by_tree_cache():
+    generated = "".join(f"def f{i}(x):\n    return x + {i}\n" for i in range(50000))
+    cache = TreeCache.create()
+    factory = ASTFactory.create(cache)
+    with pytest.raises(ParseLimitExceeded):
+        factory.create_from_code(Source("big.py", generated), ParseLimits(0, 1, 0))
+    assert cache.trees == {}
+    ast = factory.create_from_code(Source("big.py", generated), ParseLimits(0, 60000, 0))
+    assert len(ast.definitions()) == 50000
+
+
+def test_markdown_limits_excerpt_and_exclusion():
+    markdown = Markdown({"max-file-bytes": 10})
+    source = Source("guide.md", "# Title\n\nSome paragraph.\n")
+    (excerpt,) = markdown.excerpt([source]).excerpts
+    assert excerpt.metadata["parse_limit"] == "max-file-bytes"
+    assert markdown.excluded([source]) == []
+
+
+def test_limited_entries_are_not_cached():
+    tagger = ASTBasedTagger.create("/fake/workspace/path", ASTFactory.create())
+    rule = Rule.from_config(
+        {
+            "name": "test",
+            "excerpt-modes": {"*.py": "code-outliner"},
+            "excerpt-config": {"code-outliner": {"max-file-bytes": 10}},
+        }
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = ExcerptCache.create(Path(tmp_dir))
+        ExcerpterRegistry.create(cache).excerpt([Source("a.py", CODE)], rule, tagger)
+        assert cache.writes == []
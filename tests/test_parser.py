@@ -1,6 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
-from llm_context.excerpters.parser import AST, ASTFactory, Source
+from llm_context.excerpters.parser import AST, ASTFactory, QueryCache, Source
 from llm_context.excerpters.tagger import ASTBasedTagger, Definition, FileTags, Position, Tag
 
 
@@ -78,3 +80,42 @@ def test_defref_positions(sample_defref):
         assert defn.end.ln >= defn.begin.ln
         assert defn.start >= 0
         assert defn.finish > defn.start
+
+
+def test_definitions_from_buffer_match_text_source():
+    code = 'def grüße():\n    return "héllo"\n\nclass Ünicode:\n    pass\n'
+    tagger = ASTBasedTagger.create("/fake/workspace/path", ASTFactory.create())
+    from_text = tagger.extract_definitions(Source("test.py", code))
+    data = code.encode("utf-8")
+    from_buffer = tagger.extract_definitions(Source("test.py", code, memoryview(data)))
+    assert from_buffer == from_text
+    assert [d.name.text for d in from_buffer if d.name] == ["grüße", "Ünicode"]
+    assert from_buffer[0].text == 'def grüße():\n    return "héllo"'
+
+
+def test_node_text_slices_bytes_not_characters():
+    source = Source("test.md", "# Überschrift\n\nÄrger über Öl.\n")
+    ast = ASTFactory.create().create_from_code(source)
+    paragraph = next(node for _, captures in ast.match("(paragraph) @p") for node in captures["p"])
+    assert ast.node_text(paragraph) == "Ärger über Öl.\n"
+
+
+def test_query_cache_compiles_each_query_once_across_threads():
+    cache = QueryCache.create()
+    language = ASTFactory.create().parser_factory.get_language("python")
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        queries = list(
+            executor.map(lambda _: cache.get("python", language, "(identifier) @id"), range(32))
+        )
+    assert len(cache.queries) == 1
+    assert all(query is queries[0] for query in queries)
+
+
+def test_definitions_share_source_buffer():
+    data = b"class A:\n    def b(self):\n        pass\n"
+    tagger = ASTBasedTagger.create("/fake/workspace/path", ASTFactory.create())
+    defs = tagger.extract_definitions(Source("test.py", data.decode(), memoryview(data)))
+    assert all(d.code.obj is data and d.name and d.name.code is d.code for d in defs)
+    assert not hasattr(defs[0], "__dict__")
+    assert defs[1].text == "def b(self):\n        pass"
+    assert (defs[1].begin, defs[1].end) == (Position(1, 4), Position(2, 12))
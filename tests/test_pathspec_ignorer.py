@@ -1,6 +1,6 @@
 import unittest
 
-from llm_context.file_selector import PathspecIgnorer
+from llm_context.file_selector import CompiledPathspec, PathspecIgnorer
 
 
 class TestPathspecIgnorerBasicFunctionality(unittest.TestCase):
@@ -144,5 +144,59 @@ class TestPathspecIgnorer(unittest.TestCase):
         self.assertFalse(ignorer.ignore("logs.txt"))
 
 
+class TestCompiledPathspec(unittest.TestCase):
+    PATTERNS = [
+        "*.log",
+        "!keep.log",
+        "build/",
+        "/dist",
+        "**/node_modules/",
+        "docs/**/*.md",
+        "!docs/api/*.md",
+        "src/[abc]*.py",
+        "# comment",
+        "",
+    ]
+    PATHS = [
+        "app.log",
+        "keep.log",
+        "sub/keep.log",
+        "sub/app.log",
+        "build/",
+        "build/out.js",
+        "x/build/out.js",
+        "dist",
+        "x/dist",
+        "a/node_modules/pkg/index.js",
+        "docs/guide.md",
+        "docs/api/ref.md",
+        "docs/deep/api/ref.md",
+        "src/app.py",
+        "src/main.py",
+        "README.md",
+    ]
+
+    def test_matches_gitignore_spec(self):
+        compiled = CompiledPathspec.create(self.PATTERNS)
+        for path in self.PATHS:
+            with self.subTest(path=path):
+                self.assertEqual(compiled.match_file(path), compiled.spec.match_file(path))
+
+    def test_unanchored_patterns_match_gitignore_spec(self):
+        for patterns in (["*", "!*.py"], ["**", "!docs/"], ["*.log", "*"], ["!keep.log", "**"]):
+            compiled = CompiledPathspec.create(patterns)
+            self.assertFalse(all(p.regex.pattern.startswith("^") for p in compiled.patterns))
+            for path in self.PATHS:
+                with self.subTest(patterns=patterns, path=path):
+                    self.assertEqual(compiled.match_file(path), compiled.spec.match_file(path))
+
+    def test_empty_and_negation_only_specs_match_nothing(self):
+        self.assertFalse(CompiledPathspec.create([]).match_file("a.py"))
+        self.assertFalse(CompiledPathspec.create(["!a.py"]).match_file("a.py"))
+
+    def test_identical_pattern_lists_share_compilation(self):
+        self.assertIs(CompiledPathspec.create(["*.py"]), CompiledPathspec.create(["*.py"]))
+
+
 if __name__ == "__main__":
     unittest.main()
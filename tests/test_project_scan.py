@@ -0,0 +1,177 @@
+import os
+import threading
+from collections import Counter
+
+import pytest
+
+from llm_context.context_generator import ContextCollector
+from llm_context.file_selector import FileSelector, GitIgnorer
+from llm_context.overviews import get_focused_overview, get_full_overview
+from llm_context.project_scan import ProjectScan, ScanConfig
+from llm_context.rule import INCLUDE_ALL
+from llm_context.utils import PathConverter
+
+
+def test_listdir_is_sorted_and_classifies_entries(temp_project):
+    scan = ProjectScan.create(temp_project)
+    entries = scan.listdir(str(temp_project))
+    assert [e.name for e in entries] == sorted(e.name for e in entries)
+    assert {e.name for e in entries if e.is_dir} == {"build", "docs", "src"}
+
+
+def test_selectors_share_one_listing_per_directory(temp_project, scandir_calls):
+    scan = ProjectScan.create(temp_project)
+    full = FileSelector.create(temp_project, [".git"], INCLUDE_ALL, [], scan=scan)
+    excerpted = FileSelector.create(temp_project, [".git", "*.md"], ["**/*.py"], [], scan=scan)
+    overview = FileSelector.create_ignorer(temp_project, [".git"], scan)
+    full_files = full.get_relative_files()
+    excerpted_files = excerpted.get_relative_files()
+    overview_files = overview.get_relative_files()
+    assert all(count == 1 for count in scandir_calls.values())
+    name = temp_project.name
+    assert f"/{name}/docs/guide.md" in full_files
+    assert f"/{name}/build/out.js" not in full_files
+    assert excerpted_files == [f"/{name}/src/main.py", f"/{name}/src/pkg/util.py"]
+    assert overview_files == full_files
+
+
+def test_since_filter_uses_scan_stats(temp_project):
+    main_py = temp_project / "src" / "main.py"
+    os.utime(main_py, (2_000_000_000, 2_000_000_000))
+    scan = ProjectScan.create(temp_project)
+    selector = FileSelector.create(temp_project, [".git"], INCLUDE_ALL, [], 1_999_999_999, scan)
+    assert selector.get_files() == [str(main_py)]
+
+
+def test_ignored_directories_are_never_listed(temp_project, scandir_calls):
+    (temp_project / "build" / "nested").mkdir()
+    (temp_project / "build" / "nested" / ".gitignore").write_text("*.js\n")
+    scan = ProjectScan.create(temp_project)
+    ignorer = GitIgnorer.from_git_root(str(temp_project), [".git"], scan)
+    assert str(temp_project / "build") not in scandir_calls
+    assert [prefix for prefix, _ in ignorer.ignorer_data] == ["/", "/"]
+    FileSelector.create(temp_project, [".git"], INCLUDE_ALL, [], scan=scan).get_files()
+    assert str(temp_project / "build") not in scandir_calls
+
+
+def test_limit_to_prunes_unrelated_directories(temp_project, scandir_calls):
+    scan = ProjectScan.create(temp_project)
+    selector = FileSelector.create(
+        temp_project, [".git"], ["src/pkg/**"], ["/docs/*.md"], scan=scan
+    )
+    assert sorted(selector.get_relative_files()) == [
+        f"/{temp_project.name}/docs/guide.md",
+        f"/{temp_project.name}/src/pkg/util.py",
+    ]
+    assert set(scandir_calls) == {
+        str(temp_project),
+        str(temp_project / "src"),
+        str(temp_project / "src" / "pkg"),
+        str(temp_project / "docs"),
+    }
+
+
+def test_parallel_scan_matches_sequential_selection(temp_project):
+    for i in range(5):
+        (temp_project / "src" / f"mod{i}" / "sub").mkdir(parents=True)
+        (temp_project / "src" / f"mod{i}" / "sub" / "code.py").write_text("pass\n")
+        (temp_project / "src" / f"mod{i}" / ".gitignore").write_text("*.tmp\n")
+        (temp_project / "src" / f"mod{i}" / "scratch.tmp").write_text("tmp\n")
+
+    def select(workers):
+        scan = ProjectScan.create(temp_project, ScanConfig.from_config({"workers": workers}))
+        selector = FileSelector.create(
+            temp_project, [".git"], INCLUDE_ALL, ["build/*.js"], scan=scan
+        )
+        return selector.get_relative_files()
+
+    sequential = select(1)
+    assert select(4) == sequential
+    assert f"/{temp_project.name}/build/out.js" in sequential
+    assert not any(path.endswith(".tmp") for path in sequential)
+
+
+def test_prefetch_lists_siblings_on_worker_threads(temp_project, monkeypatch):
+    threads = set()
+    original = os.scandir
+
+    def recording_scandir(path):
+        threads.add(threading.current_thread().name)
+        return original(path)
+
+    monkeypatch.setattr(os, "scandir", recording_scandir)
+    scan = ProjectScan.create(temp_project, ScanConfig.from_config({"workers": 2}))
+    dirs = [str(temp_project / name) for name in ("build", "docs", "src")]
+    scan.prefetch(dirs)
+    assert all(d in scan.listings for d in dirs)
+    assert threading.current_thread().name not in threads
+    assert [e.name for e in scan.listdir(dirs[2])] == ["main.py", "pkg"]
+
+
+def test_scan_config_from_config():
+    assert ScanConfig.from_config({}).workers == 1
+    assert ScanConfig.from_config({"workers": 8}).workers == 8
+    assert ScanConfig.from_config({"workers": 0}).workers == 1
+
+
+class CountingDirEntry:
+    def __init__(self, entry, calls):
+        self._entry = entry
+        self._calls = calls
+        self._stat = None
+        self.name = entry.name
+        self.path = entry.path
+
+    def is_dir(self):
+        return self._entry.is_dir()
+
+    def is_symlink(self):
+        return self._entry.is_symlink()
+
+    def stat(self):
+        if self._stat is None:
+            self._calls[self.path] += 1
+            self._stat = self._entry.stat()
+        return self._stat
+
+
+@pytest.fixture
+def stat_calls(monkeypatch):
+    calls: Counter = Counter()
+    original_scandir, original_stat, original_lstat = os.scandir, os.stat, os.lstat
+
+    class CountingScandir:
+        def __init__(self, path):
+            self._it = original_scandir(path)
+
+        def __enter__(self):
+            return (CountingDirEntry(entry, calls) for entry in self._it)
+
+        def __exit__(self, *exc):
+            self._it.close()
+
+    def counting_stat(path, *args, **kwargs):
+        calls[os.fspath(path)] += 1
+        return original_stat(path, *args, **kwargs)
+
+    def counting_lstat(path, *args, **kwargs):
+        calls[os.fspath(path)] += 1
+        return original_lstat(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "scandir", CountingScandir)
+    monkeypatch.setattr(os, "stat", counting_stat)
+    monkeypatch.setattr(os, "lstat", counting_lstat)
+    return calls
+
+
+def test_one_stat_per_file_across_selection_and_overviews(temp_project, stat_calls):
+    scan = ProjectScan.create(temp_project)
+    since = FileSelector.create(temp_project, [".git"], INCLUDE_ALL, [], 1.0, scan).get_files()
+    full_overview, _ = get_full_overview(temp_project, since, [], [], [".git"], scan)
+    focused_overview, _ = get_focused_overview(temp_project, since, [], [], [".git"], scan)
+    sizes = ContextCollector.create(temp_project, scan).file_stats(
+        PathConverter.create(temp_project).to_relative(since)
+    )
+    assert len(sizes) == len(since) > 0
+    assert "main.py" in full_overview and "main.py" in focused_overview
+    assert {path: stat_calls[path] for path in since} == {path: 1 for path in since}
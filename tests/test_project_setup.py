@@ -0,0 +1,26 @@
+import tempfile
+from pathlib import Path
+
+from llm_context.project_setup import Config, ProjectSetup
+from llm_context.rule import ToolConstants
+from llm_context.utils import ProjectLayout, Yaml
+
+
+def test_upgrade_keeps_user_config_sections():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        layout = ProjectLayout(Path(tmp_dir))
+        layout.project_config_path.mkdir()
+        old_config = Config.create_default().to_dict()
+        old_config["templates"] = {"context": "custom.j2"}
+        old_config["scan"] = {"backend": "git-index", "watch": True}
+        old_config["excerpt-cache"]["enabled"] = True
+        old_config["languages"]["extensions"] = {"mjs": "javascript"}
+        Yaml.save(layout.config_path, old_config)
+        ProjectSetup(layout, ToolConstants.create_null())._update_config_file()
+        config = Yaml.load(layout.config_path)
+        defaults = Config.create_default().to_dict()
+        assert config["templates"] == defaults["templates"]
+        assert config["scan"] == {**defaults["scan"], "backend": "git-index", "watch": True}
+        assert config["excerpt-cache"]["enabled"] is True
+        assert config["excerpt-pool"] == defaults["excerpt-pool"]
+        assert config["languages"] == {**defaults["languages"], "extensions": {"mjs": "javascript"}}
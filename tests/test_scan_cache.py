@@ -0,0 +1,78 @@
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from llm_context.file_selector import FileSelector
+from llm_context.project_scan import ProjectScan, ScanConfig
+from llm_context.rule import INCLUDE_ALL
+from llm_context.utils import ProjectLayout
+
+
+def age_dirs(root: Path, seconds: int) -> None:
+    past = time.time() - seconds
+    for dir_path, _, _ in os.walk(root):
+        os.utime(dir_path, (past, past))
+
+
+@pytest.fixture
+def temp_project(temp_project):
+    ProjectLayout(temp_project).cache_path.mkdir(parents=True)
+    age_dirs(temp_project, 120)
+    return temp_project
+
+
+def select(root: Path) -> list[str]:
+    scan = ProjectScan.create(root, ScanConfig.from_config({"cache": True}))
+    return FileSelector.create(
+        root, [".git", ".llm-context/"], INCLUDE_ALL, [], scan=scan
+    ).get_relative_files()
+
+
+def test_warm_scan_lists_no_unchanged_directories(temp_project, scandir_calls):
+    cold = select(temp_project)
+    assert str(temp_project / "src" / "pkg") in scandir_calls
+    scandir_calls.clear()
+    assert select(temp_project) == cold
+    assert not scandir_calls
+
+
+def test_only_changed_directories_are_relisted(temp_project, scandir_calls):
+    select(temp_project)
+    (temp_project / "src" / "pkg" / "extra.py").write_text("pass\n")
+    age_dirs(temp_project / "src" / "pkg", 60)
+    scandir_calls.clear()
+    files = select(temp_project)
+    assert set(scandir_calls) == {str(temp_project / "src" / "pkg")}
+    assert f"/{temp_project.name}/src/pkg/extra.py" in files
+
+
+def test_recently_modified_directories_are_not_trusted(temp_project, scandir_calls):
+    select(temp_project)
+    (temp_project / "docs" / "new.md").write_text("# New\n")
+    scandir_calls.clear()
+    select(temp_project)
+    select(temp_project)
+    assert scandir_calls[str(temp_project / "docs")] == 2
+
+
+def test_removed_directories_are_dropped_from_cache(temp_project):
+    select(temp_project)
+    (temp_project / "src" / "pkg" / "util.py").unlink()
+    (temp_project / "src" / "pkg").rmdir()
+    age_dirs(temp_project, 60)
+    select(temp_project)
+    cache_path = ProjectLayout(temp_project).cache_path
+    cached_dirs = json.loads((cache_path / "scan.json").read_text())["dirs"]
+    assert os.path.join("src", "pkg") not in cached_dirs
+    assert "src" in cached_dirs
+    assert (cache_path / ".gitignore").read_text() == "*\n"
+
+
+def test_cache_is_disabled_by_default(temp_project):
+    scan = ProjectScan.create(temp_project)
+    FileSelector.create(temp_project, [".git"], INCLUDE_ALL, [], scan=scan).get_files()
+    assert scan.cache is None
+    assert not (ProjectLayout(temp_project).cache_path / "scan.json").exists()
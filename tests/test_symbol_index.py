@@ -0,0 +1,84 @@
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from llm_context.excerpters.parser import ASTFactory, Source
+from llm_context.excerpters.tagger import ASTBasedTagger
+from llm_context.symbol_index import SymbolIndex, SymbolIndexConfig
+
+CODE = "def foo():\n    return 1\n\nclass Bar:\n    def baz(self):\n        pass\n"
+
+
+@pytest.fixture
+def cache_dir():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        yield Path(tmp_dir)
+
+
+@pytest.fixture
+def tagger():
+    return ASTBasedTagger.create("/fake/workspace/path", ASTFactory.create())
+
+
+def definition_texts(tagger, source, name):
+    return [d.text for d in tagger.extract_definitions(source) if d.name and d.name.text == name]
+
+
+def test_find_matches_extracted_definitions(cache_dir, tagger):
+    index = SymbolIndex.load(cache_dir)
+    source = Source("a.py", CODE)
+    for name in ("foo", "Bar", "baz", "missing"):
+        assert index.find(tagger, source, name) == definition_texts(tagger, source, name)
+    assert index.parsed == ["a.py"]
+
+
+def test_unchanged_files_are_not_reparsed(cache_dir, tagger):
+    first = SymbolIndex.load(cache_dir)
+    first.find(tagger, Source("a.py", CODE), "foo")
+    first.save()
+    assert (cache_dir / "symbols.json").exists()
+    second = SymbolIndex.load(cache_dir)
+    assert second.find(tagger, Source("a.py", CODE), "baz") == ["def baz(self):\n        pass"]
+    assert second.parsed == []
+
+
+def test_edited_files_are_reindexed_and_stale_entries_pruned(cache_dir, tagger):
+    first = SymbolIndex.load(cache_dir)
+    first.find(tagger, Source("a.py", CODE), "foo")
+    first.save()
+    edited = CODE.replace("return 1", "return 2")
+    second = SymbolIndex.load(cache_dir)
+    assert second.find(tagger, Source("a.py", edited), "foo") == ["def foo():\n    return 2"]
+    assert second.parsed == ["a.py"]
+    second.save()
+    assert len(SymbolIndex.load(cache_dir).files) == 1
+
+
+def test_unreadable_index_is_ignored(cache_dir, tagger):
+    (cache_dir / "symbols.json").write_text("{not json")
+    index = SymbolIndex.load(cache_dir)
+    assert index.find(tagger, Source("a.py", CODE), "foo") == ["def foo():\n    return 1"]
+
+
+def test_unchanged_index_is_not_rewritten(cache_dir, tagger):
+    first = SymbolIndex.load(cache_dir)
+    first.find(tagger, Source("a.py", CODE), "foo")
+    first.save()
+    index_path = cache_dir / "symbols.json"
+    index_path.write_text(index_path.read_text() + " ")
+    second = SymbolIndex.load(cache_dir)
+    second.find(tagger, Source("a.py", CODE), "foo")
+    second.save()
+    assert index_path.read_text().endswith(" ")
+
+
+def test_index_is_disabled_by_default_and_never_written(cache_dir, tagger):
+    config = SymbolIndexConfig.from_config({})
+    assert config == SymbolIndexConfig.create_default()
+    assert not config.enabled
+    assert SymbolIndexConfig.from_config(config.to_dict()) == config
+    index = SymbolIndex.from_config(config, cache_dir)
+    assert index.find(tagger, Source("a.py", CODE), "foo") == ["def foo():\n    return 1"]
+    index.save()
+    assert not (cache_dir / "symbols.json").exists()
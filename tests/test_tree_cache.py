@@ -0,0 +1,62 @@
+from llm_context.excerpters.parser import ASTFactory, Source
+from llm_context.excerpters.tagger import ASTBasedTagger
+from llm_context.excerpters.tree_cache import ESTIMATED_NODE_BYTES, TreeCache
+
+CODE = "def foo():\n    return 1\n\n\nclass Bar:\n    def baz(self):\n        pass\n"
+EDITED = "def foo():\n    return 1\n\n\ndef qux(x):\n    return x\n\n\nclass Bar:\n    def baz(self):\n        pass\n"
+
+
+def definitions(tagger, source):
+    return [
+        (d.name.text if d.name else None, d.begin, d.end, d.text)
+        for d in tagger.extract_definitions(source)
+    ]
+
+
+def test_reparse_reuses_retained_tree_for_edits():
+    cache = TreeCache.create()
+    tagger = ASTBasedTagger.create("", ASTFactory.create(cache))
+    fresh = ASTBasedTagger.create("", ASTFactory.create())
+    for code in (CODE, EDITED, EDITED, "# emptied\n", CODE):
+        source = Source("mod.py", code)
+        assert definitions(tagger, source) == definitions(fresh, source)
+        assert str(tagger.ast_factory.create_from_code(source).tree.root_node) == str(
+            fresh.ast_factory.create_from_code(source).tree.root_node
+        )
+    assert cache.stats["full"] == 1
+    assert cache.stats["reused"] == 6
+    assert cache.stats["incremental"] == 3
+
+
+def test_multibyte_edit_matches_fresh_parse():
+    cache = TreeCache.create()
+    tagger = ASTBasedTagger.create("", ASTFactory.create(cache))
+    fresh = ASTBasedTagger.create("", ASTFactory.create())
+    tagger.extract_definitions(Source("mod.py", 'def grüß():\n    return "ä"\n'))
+    edited = Source("mod.py", 'def grüß():\n    return "äöü"\n\ndef später():\n    pass\n')
+    assert definitions(tagger, edited) == definitions(fresh, edited)
+    assert cache.stats["incremental"] == 1
+
+
+def test_retained_trees_are_bounded_by_estimated_size():
+    tree = ASTFactory.create().create_from_code(Source("m.py", CODE)).tree
+    entry_size = len(CODE) + tree.root_node.descendant_count * ESTIMATED_NODE_BYTES
+    cache = TreeCache.create(max_bytes=entry_size * 2)
+    ast_factory = ASTFactory.create(cache)
+    for i in range(3):
+        ast_factory.create_from_code(Source(f"m{i}.py", CODE))
+    assert [path for path, _ in cache.trees] == ["m1.py", "m2.py"]
+    assert cache.size == entry_size * 2
+    cache.discard("m1.py")
+    assert [path for path, _ in cache.trees] == ["m2.py"]
+    assert cache.size == entry_size
+
+
+def test_memoryview_sources_are_retained_as_bytes():
+    cache = TreeCache.create()
+    ast_factory = ASTFactory.create(cache)
+    source = Source("mod.py", CODE, memoryview(CODE.encode()))
+    ast_factory.create_from_code(source)
+    ast_factory.create_from_code(source)
+    assert type(cache.trees["mod.py", "python"][0]) is bytes
+    assert cache.stats["reused"] == 1
@@ -0,0 +1,102 @@
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from llm_context.change_log import ChangeLog
+from llm_context.file_selector import FileSelector
+from llm_context.project_scan import ProjectScan, ScanConfig
+from llm_context.rule import INCLUDE_ALL
+from llm_context.watcher import InotifyBackend, PollingBackend, ProjectWatcher
+
+
+def selected(root: Path, scan: ProjectScan) -> list[str]:
+    return FileSelector.create(root, [".git"], INCLUDE_ALL, [], scan=scan).get_relative_files()
+
+
+def test_change_log_answers_only_for_watched_periods():
+    changes = ChangeLog.create()
+    changes.watch("/p/src")
+    since = changes.watched["/p/src"]
+    changes.record("/p/src/a.py", since + 5)
+    assert changes.modified("/p/src/a.py", since + 1) is True
+    assert changes.modified("/p/src/a.py", since + 6) is False
+    assert changes.modified("/p/src/b.py", since + 1) is False
+    assert changes.modified("/p/src/a.py", since - 1) is None
+    assert changes.modified("/p/other/a.py", since + 1) is None
+
+
+def test_invalidate_drops_parent_and_descendant_listings(temp_project):
+    scan = ProjectScan.create(temp_project)
+    selected(temp_project, scan)
+    src = str(temp_project / "src")
+    scan.invalidate(src)
+    assert src not in scan.listings
+    assert str(temp_project) not in scan.listings
+    assert str(temp_project / "src" / "pkg") not in scan.listings
+
+
+@pytest.mark.skipif(not InotifyBackend.available(), reason="inotify is not available")
+def test_inotify_watcher_keeps_selection_live(temp_project, scandir_calls):
+    config = ScanConfig.from_config({"watch": True})
+    watcher = ProjectWatcher.start(str(temp_project), config)
+    try:
+        name = temp_project.name
+        before = selected(temp_project, watcher.snapshot())
+        assert f"/{name}/build/out.js" not in before
+        start = time.time()
+        (temp_project / "src" / "pkg" / "util.py").write_text("def util(): return 1\n")
+        (temp_project / "src" / "extra").mkdir()
+        (temp_project / "src" / "extra" / "new.py").write_text("pass\n")
+        scandir_calls.clear()
+        scan = watcher.snapshot()
+        after = selected(temp_project, scan)
+        assert set(after) - set(before) == {f"/{name}/src/extra/new.py"}
+        assert str(temp_project) not in scandir_calls
+        assert scan.is_modified(str(temp_project / "src" / "pkg" / "util.py"), start)
+        assert not scan.is_modified(str(temp_project / "src" / "main.py"), start)
+    finally:
+        watcher.stop()
+
+
+def test_polling_backend_records_changes(temp_project):
+    changes = ChangeLog.create()
+    backend = PollingBackend.start(str(temp_project), changes, interval=3600)
+    try:
+        src = str(temp_project / "src")
+        assert src in changes.watched
+        assert str(temp_project / "build") not in changes.watched
+        start = time.time() + 1
+        main_py = temp_project / "src" / "main.py"
+        main_py.write_text("print('changed')\n")
+        os.utime(main_py, (start + 1, start + 1))
+        (temp_project / "src" / "pkg" / "util.py").unlink()
+        (temp_project / "src" / "extra").mkdir()
+        backend.poll()
+        pending, watched = changes.take_pending()
+        assert {str(main_py), str(temp_project / "src" / "pkg" / "util.py")} <= pending
+        assert str(temp_project / "src" / "extra") in watched
+        assert changes.modified(str(main_py), start) is True
+    finally:
+        backend.stop()
+
+
+def test_poll_interval_is_configurable(temp_project, monkeypatch):
+    config = ScanConfig.from_config({"watch": True, "poll-interval": 30})
+    assert ScanConfig.from_config(config.to_dict()) == config
+    monkeypatch.setattr(InotifyBackend, "start", staticmethod(lambda root, changes: None))
+    watcher = ProjectWatcher.start(str(temp_project), config)
+    try:
+        assert isinstance(watcher.backend, PollingBackend)
+        assert watcher.backend.interval == 30
+    finally:
+        watcher.stop()
+
+
+@pytest.mark.skipif(not InotifyBackend.available(), reason="inotify is not available")
+def test_inotify_stop_is_idempotent(temp_project):
+    backend = InotifyBackend.start(str(temp_project), ChangeLog.create())
+    assert backend is not None
+    backend.stop()
+    backend.stop()